@@ -26,6 +26,7 @@ __all__ = [
     "filter_list",
     "generate_inputs",
     "get_filtered_ziplist_index",
+    "get_filtered_ziplist_indexer",
     "get_wildcard_constraints",
     "set_bids_spec",
     "write_derivative_json",
@@ -7,6 +7,7 @@ from .core import (
     filter_list,
     generate_inputs,
     get_filtered_ziplist_index,
+    get_filtered_ziplist_indexer,
     get_wildcard_constraints,
     write_derivative_json,
 )
@@ -35,6 +36,7 @@ __all__ = [
     "filter_list",
     "generate_inputs",
     "get_filtered_ziplist_index",
+    "get_filtered_ziplist_indexer",
     "get_wildcard_constraints",
     "set_bids_spec",
     "write_derivative_json",
@@ -18,6 +18,7 @@ __all__ = [
     "filter_list",
     "generate_inputs",
     "get_filtered_ziplist_index",
+    "get_filtered_ziplist_indexer",
     "get_wildcard_constraints",
     "write_derivative_json",
 ]
@@ -8,6 +8,7 @@ from .datasets import (
 from .filtering import (
     filter_list,
     get_filtered_ziplist_index,
+    get_filtered_ziplist_indexer,
 )
 from .input_generation import (
     generate_inputs,
@@ -24,6 +25,7 @@ __all__ = [
     "filter_list",
     "generate_inputs",
     "get_filtered_ziplist_index",
+    "get_filtered_ziplist_indexer",
     "get_wildcard_constraints",
     "write_derivative_json",
 ]
@@ -0,0 +1,410 @@
+"""Expansion of path templates over the entries of a component."""
+
+from __future__ import annotations
+
+import array
+import bisect
+import functools as ft
+import itertools as it
+import re
+import string
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Mapping, Sequence, overload
+
+import attrs
+
+from snakebids.snakemake_compat import WildcardError
+
+_PLAIN_FIELD = re.compile(r"[^{}.\[\]!:]+")
+"""Fields consisting of a single name, without attribute or index access"""
+
+
+@attrs.frozen
+class CompiledTemplate:
+    """Path template split into literal text and the names of its fields.
+
+    ``literals`` has exactly one more item than ``fields``. The template is recovered by
+    interleaving the two, starting and ending with a literal.
+    """
+
+    literals: tuple[str, ...]
+    fields: tuple[str, ...]
+    names: frozenset[str] = attrs.field(init=False)
+    """Unique field names in the template"""
+
+    @names.default  # type: ignore
+    def _get_names(self) -> frozenset[str]:
+        return frozenset(self.fields)
+
+    def format_string(self, positions: Mapping[str, int]) -> str:
+        """Get a format string taking the values of the given fields positionally.
+
+        Fields not found in ``positions`` are preserved as ``{field}`` in the output.
+        """
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(
+                f"{{{positions[field]}}}" if field in positions else f"{{{{{field}}}}}"
+            )
+            parts.append(literal)
+        return "".join(parts)
+
+
+@ft.lru_cache(maxsize=1024)
+def compile_template(template: str) -> CompiledTemplate | None:
+    """Split a path template into literals and fields.
+
+    Returns None if the template uses any formatting features beyond plain
+    ``{field}`` substitution, such as escaped braces, attribute or index access,
+    conversions, or format specifications.
+    """
+    literals: list[str] = []
+    fields: list[str] = []
+    current = ""
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError:
+        return None
+    for literal, field, spec, conversion in parsed:
+        if "{" in literal or "}" in literal:
+            return None
+        current += literal
+        if field is None:
+            continue
+        if spec or conversion is not None or not _is_plain_field(field):
+            return None
+        literals.append(current)
+        fields.append(field)
+        current = ""
+    literals.append(current)
+    return CompiledTemplate(tuple(literals), tuple(fields))
+
+
+def _is_plain_field(field: str) -> bool:
+    return _PLAIN_FIELD.fullmatch(field) is not None and not field.isdigit()
+
+
+def _compile_paths(paths: Iterable[Path | str]) -> list[CompiledTemplate] | None:
+    templates: list[CompiledTemplate] = []
+    for path in paths:
+        # str subclasses, such as snakemake's AnnotatedString, carry extra data
+        if not isinstance(path, Path) and type(path) is not str:
+            return None
+        template = compile_template(str(path))
+        if template is None or "allow_missing" in template.names:
+            return None
+        templates.append(template)
+    return templates
+
+
+def _check_missing(template: CompiledTemplate, available: Iterable[str]) -> None:
+    if missing := template.names.difference(available):
+        field = next(field for field in template.fields if field in missing)
+        msg = f"No values given for wildcard {KeyError(field)}."
+        raise WildcardError(msg)
+
+
+@attrs.frozen
+class _Projection:
+    """Unique rows of the component entities used by a template."""
+
+    columns: tuple[Sequence[str], ...]
+    rows: dict[tuple[str, ...], int]
+    """Each unique row, mapped to the index of a matching entry in the zip_lists"""
+    fields: list[str]
+    """Component entities followed by the extra wildcards used by the template"""
+    combinations: list[tuple[Any, ...]]
+    """Values of the extra wildcards to expand each row over"""
+
+    def has_braces(self) -> bool:
+        return any("{" in val or "}" in val for row in self.rows for val in row)
+
+
+def _project(
+    template: CompiledTemplate,
+    zip_lists: Mapping[str, Sequence[str]],
+    wildcards: Mapping[str, Sequence[Any]],
+) -> _Projection | None:
+    entities = [entity for entity in zip_lists if entity in template.names]
+    if not entities:
+        return None
+    columns = tuple(zip_lists[entity] for entity in entities)
+    # Duplicate rows overwrite the index but keep their first position
+    rows = dict(zip(zip(*columns), it.count()))
+    if not rows:
+        return None
+    extra = [
+        wildcard
+        for wildcard in wildcards
+        if wildcard in template.names and wildcard not in entities
+    ]
+    return _Projection(
+        columns=columns,
+        rows=rows,
+        fields=[*entities, *extra],
+        combinations=list(it.product(*(wildcards[w] for w in extra))),
+    )
+
+
+def _project_paths(
+    paths: Iterable[Path | str],
+    zip_lists: Mapping[str, Sequence[str]],
+    *,
+    allow_missing: bool,
+    wildcards: Mapping[str, Sequence[Any]],
+) -> list[tuple[CompiledTemplate, _Projection]] | None:
+    templates = _compile_paths(paths)
+    if templates is None or any(
+        callable(val) for vals in wildcards.values() for val in vals
+    ):
+        return None
+
+    projections: list[tuple[CompiledTemplate, _Projection]] = []
+    for template in dict.fromkeys(templates):
+        projection = _project(template, zip_lists, wildcards)
+        if projection is None:
+            continue
+        # Braces in entity values would be read as wildcards when expanding over the
+        # extra wildcards
+        if wildcards and projection.has_braces():
+            return None
+        # As with expand, missing wildcards are only an error if a path is formatted
+        if not allow_missing and (projection.combinations or not wildcards):
+            _check_missing(template, projection.fields)
+        projections.append((template, projection))
+    return projections
+
+
+def expand_zip_lists(
+    paths: Iterable[Path | str],
+    zip_lists: Mapping[str, Sequence[str]],
+    *,
+    allow_missing: bool,
+    wildcards: Mapping[str, Sequence[Any]],
+) -> list[str] | None:
+    """Expand paths over the zipped entries of ``zip_lists``, then over ``wildcards``.
+
+    Gives the same result as expanding with snakemake's ``expand`` over ``zip_lists``
+    using ``zip``, removing duplicates, and then expanding the result over the
+    product of ``wildcards``. Each template is compiled once, and only the unique
+    combinations of the entities it uses are formatted.
+
+    Returns None if the expansion cannot be reproduced exactly, in which case
+    snakemake's ``expand`` should be used instead.
+
+    Raises
+    ------
+    WildcardError
+        If a path has a wildcard with no value and ``allow_missing`` is False
+    """
+    projections = _project_paths(
+        paths, zip_lists, allow_missing=allow_missing, wildcards=wildcards
+    )
+    if projections is None:
+        return None
+
+    # Map each path formatted with component entities to the format string and
+    # values used to further expand it over the wildcards
+    expanded: dict[str, tuple[str, tuple[str, ...], list[tuple[Any, ...]]]] = {}
+    for template, projection in projections:
+        n_entities = len(projection.columns)
+        entity_format = template.format_string(
+            dict(zip(projection.fields[:n_entities], it.count()))
+        )
+        full_format = template.format_string(dict(zip(projection.fields, it.count())))
+        for row in projection.rows:
+            expanded.setdefault(
+                entity_format.format(*row),
+                (full_format, row, projection.combinations),
+            )
+
+    if not wildcards:
+        return list(expanded)
+    return [
+        path.format(*row, *combination)
+        for path, row, combinations in expanded.values()
+        for combination in combinations
+    ]
+
+
+@attrs.frozen
+class _Segment:
+    """Paths formatted from one template, indexed without being formatted."""
+
+    template: str
+    columns: tuple[Sequence[str], ...]
+    rows: Sequence[int]
+    combinations: Sequence[tuple[Any, ...]]
+
+    def __len__(self) -> int:
+        return len(self.rows) * len(self.combinations)
+
+    def __getitem__(self, index: int) -> str:
+        row, combination = divmod(index, len(self.combinations))
+        row = self.rows[row]
+        return self.template.format(
+            *(column[row] for column in self.columns), *self.combinations[combination]
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self.rows:
+            values = [column[row] for column in self.columns]
+            for combination in self.combinations:
+                yield self.template.format(*values, *combination)
+
+
+class LazyExpansion(Sequence[str]):
+    """Read-only sequence of expanded paths, each formatted only when accessed.
+
+    Returned by :meth:`BidsComponent.expand() <snakebids.BidsComponent.expand>` when
+    called with ``lazy=True``. Rather than the paths themselves, only the positions of
+    the unique entity combinations in the component are stored, so the length of the
+    expansion is known without formatting any path.
+
+    Indexing and iteration format paths on demand. :meth:`write` streams the paths into
+    a file without holding them in memory. Slicing returns an ordinary list.
+    """
+
+    __slots__ = ("_ends", "_segments")
+
+    def __init__(self, segments: Iterable[_Segment], /):
+        self._segments = tuple(segment for segment in segments if len(segment))
+        self._ends = list(it.accumulate(len(segment) for segment in self._segments))
+
+    @classmethod
+    def from_paths(cls, paths: Sequence[str], /) -> LazyExpansion:
+        """Wrap a list of paths that have already been expanded."""
+        return cls([_Segment("{0}", (paths,), range(len(paths)), [()])])
+
+    def write(self, file: IO[str] | Path | str, /) -> int:
+        """Write each path on its own line to a file.
+
+        Parameters
+        ----------
+        file
+            Path of the file to write, or an open text file
+
+        Returns
+        -------
+        int
+            The number of paths written
+        """
+        if isinstance(file, (str, Path)):
+            with Path(file).open("w") as f:
+                return self.write(f)
+        for path in self:
+            file.write(f"{path}\n")
+        return len(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(<{len(self)} paths>)"
+
+    def __len__(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def __iter__(self) -> Iterator[str]:
+        return it.chain.from_iterable(self._segments)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            msg = f"{self.__class__.__name__} index out of range"
+            raise IndexError(msg)
+        segment = bisect.bisect_right(self._ends, index)
+        start = self._ends[segment - 1] if segment else 0
+        return self._segments[segment][index - start]
+
+    def __eq__(self, value: object, /) -> bool:
+        if not isinstance(value, Sequence) or isinstance(value, str):
+            return NotImplemented
+        return len(self) == len(value) and all(a == b for a, b in zip(self, value))
+
+    __hash__ = None  # type: ignore
+
+
+def _has_unique_paths(template: CompiledTemplate, projection: _Projection) -> bool:
+    """Check if distinct rows of a projection always format into distinct paths.
+
+    Holds if every entity, other than the last in the template, is followed by a
+    character found in none of its values, so that each value ends at the first
+    occurrence of that character. Wildcards not filled by entities are kept as
+    ``{wildcard}``, so are followed by ``{``.
+    """
+    entities = projection.fields[: len(projection.columns)]
+    positions = [i for i, field in enumerate(template.fields) if field in entities]
+    for i in positions[:-1]:
+        literal = template.literals[i + 1]
+        if literal:
+            end = literal[0]
+        elif template.fields[i + 1] not in entities:
+            end = "{"
+        else:
+            return False
+        column = entities.index(template.fields[i])
+        if any(end in row[column] for row in projection.rows):
+            return False
+    return True
+
+
+def _may_share_paths(first: CompiledTemplate, second: CompiledTemplate) -> bool:
+    """Check if two templates could format into the same path."""
+    prefixes = sorted([first.literals[0], second.literals[0]], key=len)
+    suffixes = sorted([first.literals[-1], second.literals[-1]], key=len)
+    return prefixes[1].startswith(prefixes[0]) and suffixes[1].endswith(suffixes[0])
+
+
+def lazy_expand_zip_lists(
+    paths: Iterable[Path | str],
+    zip_lists: Mapping[str, Sequence[str]],
+    *,
+    allow_missing: bool,
+    wildcards: Mapping[str, Sequence[Any]],
+) -> LazyExpansion | None:
+    """Lazily expand paths over the zipped entries of ``zip_lists`` and ``wildcards``.
+
+    Equivalent to :func:`expand_zip_lists`. Duplicates are removed based on the
+    entity values used by each path rather than the formatted paths, so the paths of
+    different templates, or of distinct entity values, must be known to differ.
+
+    Returns None if the expansion cannot be reproduced, including if duplicate paths
+    cannot be ruled out, in which case the expansion should be computed eagerly
+    instead.
+
+    Raises
+    ------
+    WildcardError
+        If a path has a wildcard with no value and ``allow_missing`` is False
+    """
+    projections = _project_paths(
+        paths, zip_lists, allow_missing=allow_missing, wildcards=wildcards
+    )
+    if projections is None:
+        return None
+    if not all(
+        _has_unique_paths(template, projection) for template, projection in projections
+    ) or any(
+        _may_share_paths(first, second)
+        for first, second in it.combinations(
+            (template for template, _ in projections), 2
+        )
+    ):
+        return None
+    return LazyExpansion(
+        _Segment(
+            template.format_string(dict(zip(projection.fields, it.count()))),
+            projection.columns,
+            array.array("q", projection.rows.values()),
+            projection.combinations,
+        )
+        for template, projection in projections
+    )
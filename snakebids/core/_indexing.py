@@ -0,0 +1,514 @@
+"""Native indexing of BIDS datasets without pybids."""
+
+from __future__ import annotations
+
+import functools as ft
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping, Sequence, TypeVar
+
+import attrs
+import more_itertools as itx
+from bids.layout import Query
+from typing_extensions import TypeAlias, TypedDict
+
+from snakebids.utils.utils import BidsEntity, read_bids_tags, walk
+
+_logger = logging.getLogger(__name__)
+
+_K = TypeVar("_K")
+
+_IGNORED_TOP_LEVEL = frozenset(
+    {"code", "derivatives", "models", "sourcedata", "stimuli"}
+)
+"""Top level directories never indexed, matching the pybids defaults"""
+
+
+@attrs.frozen(eq=False)
+class IndexedFile:
+    """A file found in the dataset along with the entities parsed from its path.
+
+    Mirrors the subset of :class:`bids.layout.BIDSFile` used by snakebids.
+    """
+
+    path: str
+    """Absolute path of the file"""
+
+    entities: Mapping[str, str]
+    """Mapping of entity names to the values found in the path"""
+
+
+@attrs.frozen
+class _EntityPattern:
+    entity: str
+    hint: str | None
+    regex: re.Pattern[str]
+
+
+@ft.lru_cache
+def _entity_patterns() -> tuple[_EntityPattern, ...]:
+    """Compile the patterns of all entities defined in ``bids_tags.json``.
+
+    Tagged entities get a ``hint``: a substring that must be present in a path for the
+    entity to match. This lets us skip the regex search for most entities.
+    """
+    patterns: list[_EntityPattern] = []
+    for name, tag in read_bids_tags().items():
+        entity = BidsEntity(name)
+        patterns.append(
+            _EntityPattern(
+                entity=name,
+                hint=f"{entity.tag}-" if "tag" in tag else None,
+                regex=entity.regex,
+            )
+        )
+    return tuple(patterns)
+
+
+def parse_entities(relpath: str) -> dict[str, str]:
+    """Parse all known entities from a path relative to the dataset root.
+
+    Parameters
+    ----------
+    relpath
+        Path of the file relative to the root of its dataset, using ``/`` as
+        separator.
+    """
+    path = f"/{relpath}"
+    entities: dict[str, str] = {}
+    for pattern in _entity_patterns():
+        if pattern.hint is not None and pattern.hint not in path:
+            continue
+        if match := pattern.regex.search(path):
+            entities[pattern.entity] = match.group(2)
+    return entities
+
+
+DirectoryPruner: TypeAlias = "Callable[[Mapping[str, str]], bool]"
+"""Predicate called with the entities of a directory, returning True to skip it"""
+
+
+@ft.lru_cache
+def _entity_dir_regex(entity: str) -> re.Pattern[str]:
+    bids_entity = BidsEntity(entity)
+    return re.compile(f"{bids_entity.tag}-({bids_entity.match})")
+
+
+DIRECTORY_ENTITIES = ("subject", "session")
+"""Entities encoded by the top levels of directories in a dataset"""
+
+
+def get_dir_entities(relpath: str) -> dict[str, str] | None:
+    """Get the entities of a subject or session directory.
+
+    Returns None if the path is not a ``sub-*`` directory at the root of the dataset
+    or a ``ses-*`` directory within one.
+
+    Parameters
+    ----------
+    relpath
+        Path of the directory relative to the root of its dataset, using ``/`` as
+        separator.
+    """
+    entities: dict[str, str] = {}
+    parts = relpath.split("/")
+    if len(parts) > len(DIRECTORY_ENTITIES):
+        return None
+    for entity, part in zip(DIRECTORY_ENTITIES, parts):
+        if not (match := _entity_dir_regex(entity).fullmatch(part)):
+            return None
+        entities[entity] = match.group(1)
+    return entities
+
+
+def _natural_sort_key(path: str) -> list[int | str]:
+    """Sort key equivalent to the one used by pybids to order query results."""
+    return [
+        int(text) if text.isdigit() else text.lower()
+        for text in re.split("([0-9]+)", path)
+    ]
+
+
+def _get_ignore(
+    root: str, prune: DirectoryPruner | None = None
+) -> Callable[[str], bool]:
+    """Get a predicate testing if a directory should be skipped during indexing.
+
+    As in pybids, hidden directories are skipped, as are the top level directories in
+    ``_IGNORED_TOP_LEVEL``. Subject and session directories are additionally skipped
+    if ``prune`` returns True for their entities.
+    """
+    prefix = os.path.join(root, "")
+
+    def ignore(path: str) -> bool:
+        parent, name = os.path.split(path)
+        if name.startswith(".") or (parent == root and name in _IGNORED_TOP_LEVEL):
+            return True
+        if prune is None:
+            return False
+        entities = get_dir_entities(path[len(prefix) :].replace(os.sep, "/"))
+        return entities is not None and prune(entities)
+
+    return ignore
+
+
+def _scan(
+    root: Path, *, workers: int | None, prune: DirectoryPruner | None = None
+) -> Iterator[IndexedFile]:
+    """List and parse the files of a dataset."""
+    root_str = str(root)
+    ignore = _get_ignore(root_str, prune)
+    for dirpath, _, filenames in walk(root, workers=workers, ignore=ignore):
+        for filename in filenames:
+            if filename.startswith("."):
+                continue
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, root_str).replace(os.sep, "/")
+            yield IndexedFile(path=path, entities=parse_entities(relpath))
+
+
+class _DirRecord(TypedDict):
+    mtime: int
+    files: dict[str, dict[str, str]]
+    dirs: dict[str, _DirRecord]
+
+
+INDEX_FILENAME = "snakebids_index.json"
+"""Name of the file used to persist the native index within the database directory"""
+
+_INDEX_VERSION = 1
+
+_MTIME_SLACK = 2_000_000_000
+"""Nanoseconds before the last refresh within which mtimes cannot be trusted
+
+Many filesystems record mtimes with coarse (up to 1s) granularity, so a directory
+modified just after being listed may keep the mtime it had when it was listed.
+Directories modified within this window of the last refresh are always re-listed.
+"""
+
+
+def _refresh_dir(
+    path: str,
+    relpath: str,
+    record: _DirRecord | None,
+    *,
+    ignore: Callable[[str], bool],
+    trusted_before: int,
+    pool: ThreadPoolExecutor | None = None,
+) -> _DirRecord:
+    """Bring the stored record of a directory up to date.
+
+    The directory is only re-listed if its mtime has changed since it was last
+    recorded. Otherwise, its recorded files are reused and only its subdirectories are
+    checked. If ``pool`` is given, the subdirectories are refreshed concurrently.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    if record is not None and record["mtime"] == mtime and mtime < trusted_before:
+        files = record["files"]
+        dirnames = list(record["dirs"])
+    else:
+        old_files = record["files"] if record is not None else {}
+        files: dict[str, dict[str, str]] = {}
+        dirnames: list[str] = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    # like os.walk, don't descend into links to directories
+                    if not entry.is_symlink() and not ignore(entry.path):
+                        dirnames.append(entry.name)
+                    continue
+                files[entry.name] = old_files.get(entry.name) or parse_entities(
+                    f"{relpath}/{entry.name}".lstrip("/")
+                )
+
+    old_dirs = record["dirs"] if record is not None else {}
+
+    def refresh_child(name: str) -> _DirRecord:
+        return _refresh_dir(
+            os.path.join(path, name),
+            f"{relpath}/{name}",
+            old_dirs.get(name),
+            ignore=ignore,
+            trusted_before=trusted_before,
+        )
+
+    children = (
+        pool.map(refresh_child, dirnames)
+        if pool is not None
+        else map(refresh_child, dirnames)
+    )
+    return {"mtime": mtime, "files": files, "dirs": dict(zip(dirnames, children))}
+
+
+def _iter_record(root: str, record: _DirRecord) -> Iterator[IndexedFile]:
+    for name, entities in record["files"].items():
+        yield IndexedFile(path=os.path.join(root, name), entities=entities)
+    for name, child in record["dirs"].items():
+        yield from _iter_record(os.path.join(root, name), child)
+
+
+def _load_records(path: Path) -> tuple[int, dict[str, _DirRecord]]:
+    """Load the persisted index, returning its timestamp and the record of each root.
+
+    Missing, corrupt, or outdated indices are treated as empty.
+    """
+    try:
+        data = json.loads(path.read_text())
+        if data["version"] != _INDEX_VERSION:
+            return 0, {}
+        return data["indexed_at"], data["datasets"]
+    except (OSError, ValueError, KeyError, TypeError):
+        _logger.debug("Could not load index from %s, reindexing", path)
+        return 0, {}
+
+
+def _save_records(path: Path, indexed_at: int, records: dict[str, _DirRecord]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(
+            {"version": _INDEX_VERSION, "indexed_at": indexed_at, "datasets": records}
+        )
+    )
+    tmp.replace(path)
+
+
+def _scan_incremental(
+    roots: Iterable[Path], *, index_path: Path, reset: bool, workers: int | None
+) -> Iterator[IndexedFile]:
+    """List and parse the files of the datasets, using a persisted index if possible.
+
+    The index stores the mtime of each directory alongside its contents. Adding,
+    removing, or renaming an entry updates the mtime of its parent, so only
+    directories with changed mtimes need to be re-listed. The updated index is saved
+    back to ``index_path``.
+    """
+    last_indexed, old_records = (0, {}) if reset else _load_records(index_path)
+    indexed_at = time.time_ns()
+    records: dict[str, _DirRecord] = {}
+    with (
+        ThreadPoolExecutor(workers) if workers and workers > 1 else nullcontext()
+    ) as pool:
+        for root in map(str, roots):
+            records[root] = _refresh_dir(
+                root,
+                "",
+                old_records.get(root),
+                ignore=_get_ignore(root),
+                trusted_before=last_indexed - _MTIME_SLACK,
+                pool=pool,
+            )
+    _save_records(index_path, indexed_at, records)
+    for root, record in records.items():
+        yield from _iter_record(root, record)
+
+
+def _get_derivative_roots(
+    bids_dir: Path, derivatives: bool | Path | str | Iterable[Path | str]
+) -> list[Path]:
+    """Find the derivative datasets to be indexed alongside the main dataset.
+
+    As in pybids, each path may either be a dataset (i.e. contain a
+    ``dataset_description.json``) or a directory containing datasets.
+    """
+    if derivatives is False:
+        return []
+    if derivatives is True:
+        paths = [bids_dir / "derivatives"]
+    else:
+        paths = [
+            Path(p) for p in itx.always_iterable(derivatives, base_type=(str, Path))
+        ]
+
+    roots: list[Path] = []
+    for path in paths:
+        if (path / "dataset_description.json").exists():
+            roots.append(path.absolute())
+        elif path.is_dir():
+            roots.extend(
+                sub.absolute()
+                for sub in sorted(path.iterdir())
+                if (sub / "dataset_description.json").exists()
+            )
+    return roots
+
+
+_Filters: TypeAlias = "Mapping[str, Sequence[str | Query] | str | Query]"
+
+
+@attrs.frozen
+class IndexQuery:
+    """A query of a :class:`BidsIndex`, for use with :meth:`BidsIndex.get_many`.
+
+    Equivalent to requiring a match against both ``get(**filters)`` and
+    ``get(regex_search=True, **search)``.
+    """
+
+    filters: _Filters = attrs.field(factory=dict)
+    """Filters matched by equality"""
+
+    search: _Filters = attrs.field(factory=dict)
+    """Filters matched by regex search"""
+
+    def matches(self, file: IndexedFile) -> bool:
+        """Test if a file satisfies the query."""
+        return _matches(file, self.filters, regex=False) and _matches(
+            file, self.search, regex=True
+        )
+
+
+def _matches_value(
+    entity: str, value: str | None, query: str | Query, *, regex: bool
+) -> bool:
+    if query is Query.ANY:
+        return value is not None
+    if query is Query.NONE:
+        return value is None
+    if value is None:
+        return False
+    if regex:
+        # pybids searches case-insensitively, so we do the same
+        return re.search(str(query), value, re.IGNORECASE) is not None
+    if entity == "extension":
+        return value == "." + str(query).lstrip(".")
+    return value == query
+
+
+def _matches(
+    file: IndexedFile,
+    filters: _Filters,
+    *,
+    regex: bool,
+) -> bool:
+    return all(
+        any(
+            _matches_value(entity, file.entities.get(entity), query, regex=regex)
+            for query in itx.always_iterable(queries)
+        )
+        for entity, queries in filters.items()
+    )
+
+
+@attrs.define
+class BidsIndex:
+    """Table of the files in a BIDS dataset, indexed without pybids.
+
+    Entities are parsed from each path using the definitions in ``bids_tags.json``,
+    the same definitions used by :attr:`BidsEntity.regex
+    <snakebids.utils.utils.BidsEntity.regex>`. Unlike pybids, no metadata is read and
+    no :class:`~bids.layout.BIDSFile` objects are created, making indexing of large
+    datasets considerably faster.
+
+    Instances should be constructed using :meth:`BidsIndex.from_directory`.
+    """
+
+    root: Path
+    """Absolute path of the indexed dataset"""
+
+    files: list[IndexedFile]
+    """All files found in the dataset, sorted by path"""
+
+    @classmethod
+    def from_directory(
+        cls,
+        bids_dir: Path | str,
+        derivatives: bool | Path | str | Iterable[Path | str] = False,
+        workers: int | None = None,
+        index_path: Path | str | None = None,
+        reset: bool = False,
+        *,
+        prune: DirectoryPruner | None = None,
+    ) -> BidsIndex:
+        """Index the dataset found at ``bids_dir``.
+
+        Parameters
+        ----------
+        bids_dir
+            Root of the dataset
+        derivatives
+            If True, index the derivative datasets found in ``bids_dir/derivatives``.
+            Otherwise, path(s) to derivative datasets (or directories containing
+            derivative datasets) to be indexed.
+        workers
+            Number of threads used to list directories. See
+            :func:`~snakebids.utils.utils.walk`
+        index_path
+            File in which to persist the index. If the file already exists, only
+            directories modified since the last indexing are re-listed.
+        reset
+            Ignore any index previously persisted at ``index_path``
+        prune
+            Called with the entities of each ``sub-*`` directory (e.g.
+            ``{"subject": "001"}``) and ``ses-*`` directory (e.g. ``{"subject": "001",
+            "session": "01"}``). Directories for which this returns True are not
+            indexed. Cannot be combined with ``index_path``, as persisted indices must
+            be complete.
+        """
+        if prune is not None and index_path is not None:
+            msg = "prune cannot be used when persisting the index with index_path"
+            raise ValueError(msg)
+        root = Path(bids_dir).absolute()
+        roots = [root, *_get_derivative_roots(root, derivatives)]
+        if index_path is not None:
+            files = list(
+                _scan_incremental(
+                    roots, index_path=Path(index_path), reset=reset, workers=workers
+                )
+            )
+        else:
+            files = [
+                file for r in roots for file in _scan(r, workers=workers, prune=prune)
+            ]
+        files.sort(key=lambda f: _natural_sort_key(f.path))
+        return cls(root=root, files=files)
+
+    def get(
+        self,
+        regex_search: bool = False,
+        **filters: Sequence[str | Query] | str | Query,
+    ) -> list[IndexedFile]:
+        """Query the index for files matching the filters.
+
+        Follows the semantics of :meth:`BIDSLayout.get() <bids.layout.BIDSLayout.get>`,
+        so the index can be used in its place.
+
+        Parameters
+        ----------
+        regex_search
+            Treat filter values as regexes to be searched within entity values
+        filters
+            Each keyword is the name of an entity, set to one or more acceptable values.
+            :attr:`Query.ANY <bids.layout.Query.ANY>` and :attr:`Query.NONE
+            <bids.layout.Query.NONE>` require the entity to be present or absent.
+        """
+        return [
+            file for file in self.files if _matches(file, filters, regex=regex_search)
+        ]
+
+    def get_many(self, queries: Mapping[_K, IndexQuery]) -> dict[_K, list[IndexedFile]]:
+        """Run several queries in a single pass over the index.
+
+        Each file is tested against every query, and routed to the results of each
+        query it satisfies. Files are returned in the same order as :meth:`get`.
+
+        Parameters
+        ----------
+        queries
+            Queries to run, each associated with a key under which its results are
+            returned
+        """
+        results: dict[_K, list[IndexedFile]] = {key: [] for key in queries}
+        items = list(queries.items())
+        for file in self.files:
+            for key, query in items:
+                if query.matches(file):
+                    results[key].append(file)
+        return results
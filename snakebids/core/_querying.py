@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import abc
 import functools as ft
-import re
 from typing import TYPE_CHECKING, Any, Final, Iterable, Mapping, Sequence, cast
 
 import attrs
@@ -11,6 +10,7 @@ from bids.layout import BIDSLayout, Query
 from bids.layout.models import BIDSFile
 from typing_extensions import Self, TypeAlias, override
 
+from snakebids.core._indexing import BidsIndex, IndexedFile
 from snakebids.exceptions import ConfigError, PybidsError
 from snakebids.types import FilterMap, FilterValue, InputConfig
 
@@ -25,7 +25,7 @@ class PostFilter:
 
     def __init__(self):
         self.inclusions: dict[str, Sequence[str] | str] = {}
-        self.exclusions: dict[str, Sequence[str] | str] = {}
+        self.exclusions: dict[str, frozenset[str]] = {}
 
     def add_filter(
         self,
@@ -35,9 +35,10 @@ class PostFilter:
     ):
         """Add entity filter based on inclusion or exclusion criteria.
 
-        Converts a list of values to include or exclude into Pybids compatible filters.
-        Exclusion filters are appropriately formatted as regex. Raises an exception if
-        both include and exclude are stipulated.
+        Converts a list of values to include into Pybids compatible filters. Values to
+        exclude are stored as a set, allowing large numbers of exclusions to be checked
+        in constant time. Raises an exception if both include and exclude are
+        stipulated.
 
         PostFilter is modified in-place.
 
@@ -60,15 +61,7 @@ class PostFilter:
         if inclusions is not None:
             self.inclusions[key] = list(itx.always_iterable(inclusions))
         if exclusions is not None:
-            self.exclusions[key] = self._format_exclusions(exclusions)
-
-    def _format_exclusions(self, exclusions: Iterable[str] | str):
-        # if multiple items to exclude, combine with with item1|item2|...
-        exclude_string = "|".join(
-            re.escape(label) for label in itx.always_iterable(exclusions)
-        )
-        # regex to exclude subjects
-        return [f"^((?!({exclude_string})$).*)$"]
+            self.exclusions[key] = frozenset(itx.always_iterable(exclusions))
 
 
 @attrs.define(slots=False)
@@ -176,7 +169,7 @@ class UnifiedFilter:
         return dict(_compile_filters(self.prefilters, with_regex=True))
 
     @property
-    def post_exclusions(self) -> dict[str, Sequence[str] | str]:
+    def post_exclusions(self) -> dict[str, frozenset[str]]:
         """Dictionary of all post-exclusion filters."""
         return {
             key: val
@@ -196,6 +189,61 @@ class UnifiedFilter:
                 raise ValueError(msg)
         return cast("Mapping[str, str | Sequence[str]]", self.get)
 
+    def may_reject(self, entities: Iterable[str], *, exclusions: bool = True) -> bool:
+        """Check if :meth:`rejects` can return True for some values of the entities.
+
+        ``exclusions`` is as in :meth:`rejects`.
+        """
+        if self.has_empty_prefilter:
+            return True
+        try:
+            allowed = self.get
+        except FilterSpecError:
+            return False
+        excluded = self.post_exclusions if exclusions else {}
+        for entity in entities:
+            if entity in excluded:
+                return True
+            if entity in allowed and not any(
+                isinstance(v, Query) for v in itx.always_iterable(allowed[entity])
+            ):
+                return True
+        return False
+
+    def rejects(self, entities: Mapping[str, str], *, exclusions: bool = True) -> bool:
+        """Check if paths with the given entity values can never match the filters.
+
+        Only exact-match filters (prefilters queried with ``get`` and post-filters) are
+        considered, so a False result does not guarantee a match. Used to skip
+        directories while indexing.
+
+        Parameters
+        ----------
+        entities
+            Mapping of entity names to values shared by all paths under consideration
+        exclusions
+            If False, post-exclusions are not considered. Paths rejected only by
+            post-exclusions are still found by the query, and contribute to the path
+            template of their component.
+        """
+        if self.has_empty_prefilter:
+            return True
+        try:
+            allowed = self.get
+        except FilterSpecError:
+            # Leave the error to be reported when the component is queried
+            return False
+        excluded = self.post_exclusions if exclusions else {}
+        for entity, value in entities.items():
+            if value in excluded.get(entity, ()):
+                return True
+            if entity not in allowed:
+                continue
+            values = list(itx.always_iterable(allowed[entity]))
+            if not any(isinstance(v, Query) for v in values) and value not in values:
+                return True
+        return False
+
     @property
     def has_empty_prefilter(self) -> bool:
         """Returns True if even one prefilter is empty."""
@@ -212,10 +260,10 @@ class UnifiedFilter:
 
 
 def get_matching_files(
-    bids_layout: BIDSLayout,
+    bids_layout: BIDSLayout | BidsIndex,
     filters: UnifiedFilter,
-) -> Iterable[BIDSFile]:
-    """Query pybids layout based on provided filters.
+) -> Iterable[BIDSFile | IndexedFile]:
+    """Query pybids layout (or native index) based on provided filters.
 
     Supports a combination of regular and regex querying.
 
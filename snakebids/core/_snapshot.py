@@ -0,0 +1,191 @@
+"""Snapshots of BidsDatasets, allowing generate_inputs results to be reused."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Container, Iterable, Iterator, Mapping
+
+from snakebids.core._indexing import _IGNORED_TOP_LEVEL
+from snakebids.core.datasets import BidsComponent, BidsDataset
+
+_logger = logging.getLogger(__name__)
+
+_SNAPSHOT_VERSION = 1
+
+SNAPSHOT_DIR_ENV = "SNAKEBIDS_SNAPSHOT_DIR"
+"""Environment variable giving the default snapshot directory of generate_inputs.
+
+Set while snakebids apps run snakemake, so jobs evaluating the Snakefile in their own
+process load the dataset indexed by the main process.
+"""
+
+_FINGERPRINT_DEPTH = 3
+"""Number of directory levels included in the fingerprint.
+
+In a BIDS dataset, this covers the ``sub-*``, ``ses-*``, and datatype directories, the
+last of which are the parents of nearly all files.
+"""
+
+
+def _dir_stamps(
+    path: str, depth: int, ignore: Container[str] = frozenset()
+) -> Iterator[str]:
+    """Yield the path and mtime of each directory in the top levels of a tree.
+
+    If ``ignore`` is given, the listing of ``path`` is used in place of its mtime, so
+    changes to the ignored directories (including their creation) go unnoticed.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = [
+                entry
+                for entry in it
+                if not entry.name.startswith(".") and entry.name not in ignore
+            ]
+        stamp = (
+            "\0".join(sorted(entry.name for entry in entries))
+            if ignore
+            else str(os.stat(path).st_mtime_ns)
+        )
+    except OSError:
+        yield f"{path}\0-1"
+        return
+    yield f"{path}\0{stamp}"
+    if depth == 0:
+        return
+    for subdir in sorted(
+        entry.path for entry in entries if entry.is_dir(follow_symlinks=False)
+    ):
+        yield from _dir_stamps(subdir, depth - 1)
+
+
+def get_fingerprint(roots: Mapping[str, Container[str]]) -> str:
+    """Compute a cheap fingerprint of the contents of one or more directory trees.
+
+    The fingerprint is a hash of the mtimes of every directory in the top few levels of
+    each tree. Adding, removing, or renaming a file changes the mtime of its parent
+    directory, so any such change within these levels alters the fingerprint. Changes
+    in deeper directories are not detected.
+
+    Parameters
+    ----------
+    roots
+        Roots of the directory trees to fingerprint, each mapped to the names of its
+        top level directories to leave out
+    """
+    digest = hashlib.sha256()
+    for root in sorted(roots):
+        for stamp in _dir_stamps(root, _FINGERPRINT_DEPTH, roots[root]):
+            digest.update(f"{stamp}\n".encode())
+    return digest.hexdigest()
+
+
+def get_fingerprint_roots(
+    bids_dir: Path | str,
+    pybids_inputs: Any,
+    derivatives: bool | Path | str | Iterable[Path | str],
+) -> dict[str, frozenset[str]]:
+    """Get the directories whose contents determine the output of generate_inputs.
+
+    Each directory is mapped to the names of its top level directories that are not
+    indexed. As in indexing, ``derivatives``, ``code``, and the like are left out of
+    the dataset root, so outputs written by an app into ``bids_dir/derivatives`` don't
+    change the fingerprint. Derivative datasets are given as separate roots when
+    indexed.
+    """
+    roots: list[tuple[str, frozenset[str]]] = []
+    if not all(comp.get("custom_path") for comp in pybids_inputs.values()):
+        roots.append((str(bids_dir), _IGNORED_TOP_LEVEL))
+    if derivatives is True:
+        roots.append((os.path.join(bids_dir, "derivatives"), frozenset()))
+    elif derivatives:
+        roots.extend(
+            (str(path), frozenset())
+            for path in (
+                [derivatives] if isinstance(derivatives, (str, Path)) else derivatives
+            )
+        )
+    for comp in pybids_inputs.values():
+        if custom_path := comp.get("custom_path"):
+            # Same root as used by glob_wildcards
+            pattern = os.path.normpath(custom_path)
+            first_wildcard = re.search("{[^{]", pattern)
+            root = (
+                os.path.dirname(pattern[: first_wildcard.start()])
+                if first_wildcard
+                else os.path.dirname(pattern)
+            )
+            roots.append((root, frozenset()))
+
+    result: dict[str, frozenset[str]] = {}
+    for root, ignore in roots:
+        path = os.path.abspath(root)
+        # Directories needed by any use of a root are kept
+        result[path] = result[path] & ignore if path in result else ignore
+    return result
+
+
+def get_snapshot_key(**params: Any) -> str:
+    """Hash the parameters determining the content of a dataset into a key."""
+    serialized = json.dumps(
+        {"version": _SNAPSHOT_VERSION, **params}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def load_snapshot(path: Path) -> BidsDataset | None:
+    """Load a dataset snapshot, returning None if it is missing or unreadable.
+
+    The layout of the loaded dataset is always None.
+    """
+    try:
+        data = json.loads(path.read_text())
+        return BidsDataset.from_iterable(
+            BidsComponent(
+                name=comp["name"], path=comp["path"], zip_lists=comp["zip_lists"]
+            )
+            for comp in data["components"]
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        _logger.warning("Could not load dataset snapshot %s, reindexing", path)
+        return None
+
+
+def save_snapshot(path: Path, dataset: BidsDataset) -> None:
+    """Save a snapshot of the components of a dataset.
+
+    Errors writing the snapshot are logged rather than raised, as the dataset can
+    always be indexed again.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(
+            json.dumps(
+                {
+                    "components": [
+                        {
+                            "name": comp.name,
+                            "path": comp.path,
+                            "zip_lists": {
+                                key: list(val) for key, val in comp.zip_lists.items()
+                            },
+                        }
+                        for comp in dataset.values()
+                    ]
+                }
+            )
+        )
+        tmp.replace(path)
+    except OSError as err:
+        _logger.warning("Could not save dataset snapshot %s: %s", path, err)
+        with contextlib.suppress(OSError):
+            tmp.unlink()
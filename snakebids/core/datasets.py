@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import array
 import functools as ft
 import itertools as it
 import textwrap
 import warnings
+from collections import OrderedDict, defaultdict
 from math import inf
 from pathlib import Path
 from string import Formatter
-from typing import Any, Iterable, NoReturn, cast, overload
+from typing import (
+    Any,
+    ClassVar,
+    Hashable,
+    Iterable,
+    Literal,
+    Mapping,
+    NamedTuple,
+    NoReturn,
+    Sequence,
+    cast,
+    overload,
+)
 
 import attr
 import more_itertools as itx
@@ -16,14 +30,33 @@ from pvandyken.deprecated import deprecated
 from typing_extensions import Self, TypedDict
 
 import snakebids.utils.sb_itertools as sb_it
+from snakebids.core._expansion import (
+    LazyExpansion,
+    expand_zip_lists,
+    lazy_expand_zip_lists,
+)
 from snakebids.core.filtering import filter_list
 from snakebids.exceptions import DuplicateComponentError
 from snakebids.io.console import get_console_size
 from snakebids.io.printing import format_zip_lists, quote_wrap
 from snakebids.snakemake_compat import expand as sn_expand
 from snakebids.types import ZipList
-from snakebids.utils.containers import ImmutableList, MultiSelectDict, UserDictPy38
-from snakebids.utils.utils import get_wildcard_dict, property_alias, zip_list_eq
+from snakebids.utils.containers import (
+    CategoricalList,
+    ColumnView,
+    ContainerBag,
+    ImmutableList,
+    MultiSelectDict,
+    RegexContainer,
+    UserDictPy38,
+)
+from snakebids.utils.utils import (
+    get_wildcard_dict,
+    property_alias,
+    trie_regex,
+    zip_list_eq,
+    zip_list_fingerprint,
+)
 
 
 class BidsDatasetDict(TypedDict):
@@ -184,6 +217,15 @@ class BidsComponentRow(ImmutableList[str]):
         return self.__class__(data, entity=entity)
 
 
+class ExpandCacheInfo(NamedTuple):
+    """Statistics on the cache of :meth:`BidsPartialComponent.expand` results."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 @attr.define(kw_only=True)
 class BidsPartialComponent:
     """Primitive representation of a bids data component.
@@ -205,7 +247,8 @@ class BidsPartialComponent:
     - :meth:`~BidsPartialComponent.expand` must be given a path or list of paths as the
       first argument
 
-    ``BidsPartialComponents`` are immutable: their values cannot be altered.
+    ``BidsPartialComponents`` are immutable: their values cannot be altered. They are
+    also hashable, and can be used in sets or as dictionary keys.
     """
 
     _zip_lists: ZipList = attr.field(
@@ -247,7 +290,7 @@ class BidsPartialComponent:
         consistent with :class:`BidsComponentRow`, which always has an entity name
         stored, but may or may not have values.
         """
-        return bool(itx.first(self.zip_lists))
+        return bool(itx.first(self._zip_lists))
 
     def _pformat_body(self) -> None | str | list[str]:
         """Extra properties to be printed within pformat.
@@ -272,7 +315,7 @@ class BidsPartialComponent:
             itx.always_iterable(self._pformat_body() or []),
             [
                 "zip_lists="
-                f"{format_zip_lists(self.zip_lists, width - tabstop, tabstop)},",
+                f"{format_zip_lists(self._zip_lists, width - tabstop, tabstop)},",
             ],
         )
         output = [
@@ -292,6 +335,102 @@ class BidsPartialComponent:
     _entities: list[str] | None = attr.field(
         default=None, init=False, eq=False, repr=False
     )
+    _row_index: dict[str, dict[str, frozenset[int]]] | None = attr.field(
+        default=None, init=False, eq=False, repr=False
+    )
+    _fingerprint: int | None = attr.field(
+        default=None, init=False, eq=False, repr=False
+    )
+    _expand_cache: OrderedDict[Hashable, tuple[str, ...] | LazyExpansion] = attr.field(
+        factory=OrderedDict, init=False, eq=False, repr=False
+    )
+    _expand_cache_hits: int = attr.field(default=0, init=False, eq=False, repr=False)
+    _expand_cache_misses: int = attr.field(default=0, init=False, eq=False, repr=False)
+    _expand_cache_paths: int = attr.field(default=0, init=False, eq=False, repr=False)
+
+    expand_cache_size: ClassVar[int] = 128
+    """Maximum number of results of :meth:`expand` cached on each component"""
+
+    expand_cache_max_paths: ClassVar[int] = 100_000
+    """Maximum total number of paths in the results cached on each component
+
+    Results with more paths are not cached. Set to 0 to disable caching.
+    """
+
+    def expand_cache_info(self) -> ExpandCacheInfo:
+        """Get statistics on the cache of :meth:`expand` results.
+
+        Analogous to the ``cache_info()`` of :func:`functools.lru_cache`.
+        """
+        return ExpandCacheInfo(
+            hits=self._expand_cache_hits,
+            misses=self._expand_cache_misses,
+            maxsize=self.expand_cache_size,
+            currsize=len(self._expand_cache),
+        )
+
+    def _derive(self, zip_lists: dict[str, Sequence[str]]) -> Self:
+        """Copy the component with new zip_lists, skipping conversion and validation.
+
+        Only for zip_lists derived from those of this component, such as by selecting
+        rows, which are known to be valid. Cached values are not copied.
+        """
+        new = object.__new__(self.__class__)
+        for field in attr.fields(self.__class__):
+            if field.init:
+                value = getattr(self, field.name)
+            elif isinstance(field.default, attr.Factory):  # type: ignore
+                value = field.default.factory()
+            else:
+                value = field.default
+            object.__setattr__(new, field.name, value)
+        object.__setattr__(new, "_zip_lists", MultiSelectDict(zip_lists))
+        return new
+
+    def _get_row_index(self) -> dict[str, dict[str, frozenset[int]]]:
+        """Map each entity and value to the rows of the zip_lists containing it.
+
+        Built on first use and cached. Components are immutable, so the index never
+        needs to be updated.
+        """
+        if self._row_index is None:
+            index: dict[str, dict[str, frozenset[int]]] = {}
+            for entity, values in self._zip_lists.items():
+                rows: defaultdict[str, list[int]] = defaultdict(list)
+                for i, value in enumerate(values):
+                    rows[value].append(i)
+                index[entity] = {value: frozenset(r) for value, r in rows.items()}
+            self._row_index = index
+        return self._row_index
+
+    def _select_rows(
+        self, filters: Mapping[str, str | Iterable[str]], *, regex_search: bool
+    ) -> list[int]:
+        """Get the sorted rows matching all filters using the row index."""
+        index = self._get_row_index()
+        selections: list[frozenset[int]] = []
+        for entity, filt in filters.items():
+            if entity not in index:
+                continue
+            values = index[entity]
+            if regex_search:
+                container = ContainerBag(
+                    *(RegexContainer(r) for r in itx.always_iterable(filt))
+                )
+                matched = [rows for value, rows in values.items() if value in container]
+            else:
+                matched = [
+                    values[value]
+                    for value in itx.always_iterable(filt)
+                    if value in values
+                ]
+            selections.append(
+                matched[0] if len(matched) == 1 else frozenset().union(*matched)
+            )
+        if not selections:
+            return list(range(len(itx.first(self._zip_lists.values(), []))))
+        selections.sort(key=len)
+        return sorted(selections[0].intersection(*selections[1:]))
 
     @property
     def zip_lists(self):
@@ -302,6 +441,18 @@ class BidsPartialComponent:
         of images matched for this modality, so they can be zipped together to get a
         list of the wildcard values for each file.
         """
+        # Filtered components hold views of their parent's values until first accessed
+        if any(isinstance(val, ColumnView) for val in self._zip_lists.values()):
+            object.__setattr__(
+                self,
+                "_zip_lists",
+                MultiSelectDict(
+                    {
+                        key: list(val) if isinstance(val, ColumnView) else val
+                        for key, val in self._zip_lists.items()
+                    }
+                ),
+            )
         return self._zip_lists
 
     @property
@@ -313,7 +464,7 @@ class BidsPartialComponent:
         """
         if self._input_lists is None:
             self._input_lists = MultiSelectDict(
-                {entity: list(set(values)) for entity, values in self.zip_lists.items()}
+                {entity: _unique(values) for entity, values in self._zip_lists.items()}
             )
         return self._input_lists
 
@@ -325,7 +476,7 @@ class BidsPartialComponent:
         the Snakemake wildcard used for that entity.
         """
         if self._input_wildcards is None:
-            self._input_wildcards = MultiSelectDict(get_wildcard_dict(self.zip_lists))
+            self._input_wildcards = MultiSelectDict(get_wildcard_dict(self._zip_lists))
         return self._input_wildcards
 
     @property
@@ -351,15 +502,56 @@ class BidsPartialComponent:
         if not isinstance(other, self.__class__):
             return False
 
-        return zip_list_eq(self.zip_lists, other.zip_lists)
+        if self._get_fingerprint() != other._get_fingerprint():
+            return False
+
+        return zip_list_eq(self._zip_lists, other._zip_lists)
+
+    def __hash__(self) -> int:
+        return self._get_fingerprint()
+
+    def _get_fingerprint(self) -> int:
+        """Get a hash of the zip_lists independent of the order of rows and columns.
+
+        Computed on first use and cached. Components with different fingerprints are
+        never equal, so most unequal components are told apart without comparing their
+        rows.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = zip_list_fingerprint(self._zip_lists)
+        return self._fingerprint
+
+    @overload
+    def expand(
+        self,
+        paths: Iterable[Path | str] | Path | str,
+        /,
+        allow_missing: bool | str | Iterable[str] = ...,
+        *,
+        lazy: Literal[False] = ...,
+        **wildcards: str | Iterable[str],
+    ) -> list[str]: ...
+
+    @overload
+    def expand(
+        self,
+        paths: Iterable[Path | str] | Path | str,
+        /,
+        allow_missing: bool | str | Iterable[str] = ...,
+        *,
+        lazy: Literal[True],
+        **wildcards: str | Iterable[str],
+    ) -> LazyExpansion: ...
 
     def expand(
         self,
         paths: Iterable[Path | str] | Path | str,
         /,
         allow_missing: bool | str | Iterable[str] = False,
+        *,
+        lazy: bool = False,
         **wildcards: str | Iterable[str],
-    ) -> list[str]:
+    ) -> list[str] | LazyExpansion:
         """Safely expand over given paths with component wildcards.
 
         Uses the entity-value combinations found in the dataset to expand over the given
@@ -372,6 +564,13 @@ class BidsPartialComponent:
 
         Uses the snakemake :ref:`expand <snakemake:snakefiles_expand>` under the hood.
 
+        Results are cached on the component, so repeated calls with the same arguments
+        don't repeat the expansion (see
+        :meth:`~BidsPartialComponent.expand_cache_info`). Each call returns a new list,
+        which can be freely modified. The cache is bounded by both
+        :attr:`~BidsPartialComponent.expand_cache_size` and
+        :attr:`~BidsPartialComponent.expand_cache_max_paths`.
+
         Parameters
         ----------
         paths:
@@ -380,6 +579,12 @@ class BidsPartialComponent:
             If True, allow ``{wildcards}`` in the provided paths that are not present
             either in the component or in the extra provided ``**wildcards``. These
             wildcards will be preserved in the returned paths.
+        lazy:
+            If True, return a :class:`~snakebids.core.datasets.LazyExpansion`, a
+            read-only sequence formatting each path only when it is accessed, instead
+            of a list. Useful for expansions of very large components. Holds the same
+            paths as the list. If duplicate paths cannot be ruled out without
+            formatting them, the paths are formatted upfront.
         wildcards:
             Each keyword should be the name of an wildcard in the provided paths.
             Keywords not found in the path will be ignored. Keywords take values or
@@ -392,7 +597,76 @@ class BidsPartialComponent:
             return list(itx.always_iterable(item))
 
         allow_missing_seq = sequencify(allow_missing)
-        if self.zip_lists:
+        paths = list(itx.always_iterable(paths))
+        wildcards = {
+            wildcard: list(itx.always_iterable(v)) for wildcard, v in wildcards.items()
+        }
+        key = _expand_cache_key(paths, allow_missing_seq, wildcards, lazy=lazy)
+        if key is None:
+            if lazy:
+                return self._expand_lazy(paths, allow_missing_seq, wildcards)
+            return self._expand(paths, allow_missing_seq, wildcards)
+        cache = self._expand_cache
+        if key in cache:
+            self._expand_cache_hits += 1
+            cache.move_to_end(key)
+            result = cache[key]
+        else:
+            self._expand_cache_misses += 1
+            result = (
+                self._expand_lazy(paths, allow_missing_seq, wildcards)
+                if lazy
+                else tuple(self._expand(paths, allow_missing_seq, wildcards))
+            )
+            if len(result) <= self.expand_cache_max_paths:
+                cache[key] = result
+                self._expand_cache_paths += len(result)
+                while (
+                    len(cache) > self.expand_cache_size
+                    or self._expand_cache_paths > self.expand_cache_max_paths
+                ):
+                    self._expand_cache_paths -= len(cache.popitem(last=False)[1])
+        # Lazy expansions are read-only, so only lists need to be copied
+        return result if isinstance(result, LazyExpansion) else list(result)
+
+    def _expand_lazy(
+        self,
+        paths: list[Path | str],
+        allow_missing_seq: bool | list[str],
+        wildcards: dict[str, list[Any]],
+    ) -> LazyExpansion:
+        if self._zip_lists and isinstance(allow_missing_seq, bool):
+            expanded = lazy_expand_zip_lists(
+                paths,
+                self._zip_lists,
+                allow_missing=allow_missing_seq,
+                wildcards=wildcards,
+            )
+            if expanded is not None:
+                return expanded
+        return LazyExpansion.from_paths(
+            self._expand(paths, allow_missing_seq, wildcards)
+        )
+
+    def _expand(
+        self,
+        paths: Iterable[Path | str] | Path | str,
+        allow_missing_seq: bool | list[str],
+        wildcards: Mapping[str, str | Iterable[str]],
+    ) -> list[str]:
+        if self._zip_lists and isinstance(allow_missing_seq, bool):
+            expanded = expand_zip_lists(
+                itx.always_iterable(paths),
+                self._zip_lists,
+                allow_missing=allow_missing_seq,
+                wildcards={
+                    wildcard: list(itx.always_iterable(v))
+                    for wildcard, v in wildcards.items()
+                },
+            )
+            if expanded is not None:
+                return expanded
+        if self._zip_lists:
             inner_expand = list(
                 # order preserving deduplication
                 dict.fromkeys(
@@ -400,7 +674,7 @@ class BidsPartialComponent:
                         list(itx.always_iterable(paths)),
                         zip,
                         allow_missing=True if wildcards else allow_missing_seq,
-                        **self.zip_lists,
+                        **self._zip_lists,
                     )
                 )
             )
@@ -420,6 +694,28 @@ class BidsPartialComponent:
             },
         )
 
+    def compact(self) -> Self:
+        """Get a copy of the component with dictionary-encoded zip_lists.
+
+        Each entity in :attr:`~snakebids.BidsComponent.zip_lists` is stored as a
+        :class:`~snakebids.utils.containers.CategoricalList`: an array of integer codes
+        indexing a table of the unique values of the entity. Large components, in which
+        most values are repeated many times, take a fraction of their original memory.
+        Filtering and comparison of compact components work on the integer codes.
+
+        The encoded lists behave as immutable sequences of strings and compare equal to
+        the original lists, so the compact component can be used exactly as the
+        original. Components derived from a compact component, such as by
+        :meth:`~snakebids.BidsComponent.filter`, remain compact.
+        """
+        return attr.evolve(
+            self,
+            zip_lists={
+                key: val if isinstance(val, CategoricalList) else CategoricalList(val)
+                for key, val in self._zip_lists.items()
+            },
+        )
+
     def filter(
         self,
         *,
@@ -441,6 +737,15 @@ class BidsPartialComponent:
         Returns a brand new :class:`~snakebids.BidsComponent`. The original component is
         not modified.
 
+        The first call builds an index mapping each entity-value to the rows containing
+        it. Later calls look up the index, so their cost depends on the number of
+        matching rows rather than the size of the component.
+
+        Values are not copied: the returned component refers to the original values
+        and the positions of the matching rows, and is only copied into lists when its
+        :attr:`~snakebids.BidsComponent.zip_lists` are first accessed. Further
+        filtering, expanding, or grouping the component doesn't require a copy.
+
         Parameters
         ----------
         regex_search
@@ -456,10 +761,243 @@ class BidsPartialComponent:
             raise TypeError(msg)
         if not filters:
             return self
-        return attr.evolve(
-            self,
-            zip_lists=filter_list(self.zip_lists, filters, regex_search=regex_search),
+        rows = array.array("q", self._select_rows(filters, regex_search=regex_search))
+        return self._derive(
+            {key: _take(val, rows) for key, val in self._zip_lists.items()}
+        )
+
+    @overload
+    def groupby(self, entity: str, /) -> dict[str, Self]: ...
+
+    @overload
+    def groupby(
+        self, entity: str, entity2: str, /, *entities: str
+    ) -> dict[tuple[str, ...], Self]: ...
+
+    def groupby(self, *entities: str) -> dict[str, Self] | dict[tuple[str, ...], Self]:
+        """Split the component into groups sharing the same values of some entities.
+
+        Equivalent to calling :meth:`~snakebids.BidsComponent.filter` with each unique
+        combination of values of the entities, but walks the
+        :attr:`~snakebids.BidsComponent.zip_lists` only once. As with
+        :meth:`~snakebids.BidsComponent.filter`, each group refers to the values of
+        the original component rather than copying them. For instance, to iterate over
+        the entries of each subject::
+
+            for subject, component in inputs["bold"].groupby("subject").items():
+                ...
+
+        Parameters
+        ----------
+        entities
+            Names of the entities to group by
+
+        Returns
+        -------
+        dict
+            Maps each combination of values to the component of the matching entries,
+            in order of first appearance. With a single entity, keys are the values of
+            the entity. With several entities, keys are tuples of values, in the order
+            the entities were given.
+
+        Raises
+        ------
+        KeyError
+            If any of the entities are not in the component
+        """
+        columns = [self._zip_lists[entity] for entity in entities]
+        groups: defaultdict[tuple[str, ...], array.array[int]] = defaultdict(
+            lambda: array.array("q")
         )
+        for i, key in enumerate(zip(*columns)):
+            groups[key].append(i)
+        return {
+            key[0] if len(entities) == 1 else key: self._derive(
+                {entity: _take(val, rows) for entity, val in self._zip_lists.items()}
+            )
+            for key, rows in groups.items()
+        }
+
+    def join(
+        self,
+        other: BidsPartialComponent,
+        /,
+        on: str | Iterable[str],
+        *,
+        how: Literal["inner", "left"] = "inner",
+        lsuffix: str = "",
+        rsuffix: str = "",
+    ) -> BidsPartialComponent:
+        """Pair the entries of two components sharing the same values of some entities.
+
+        For instance, each functional run can be paired with the anatomical image of
+        its subject and session::
+
+            inputs["bold"].join(inputs["t1w"], on=["subject", "session"])
+
+        A hash table is built on the smaller component, so the cost of joining is
+        linear in the size of the two components and of the result.
+
+        Parameters
+        ----------
+        other
+            Component to join with this component
+        on
+            Entities to match. Must be present in both components
+        how
+            If ``"inner"``, only pairs of matching entries are kept. If ``"left"``,
+            entries of this component with no match in ``other`` are also kept, with
+            the entities from ``other`` set to an empty string.
+        lsuffix, rsuffix
+            Suffixes added to the names of entities found in both components but not
+            listed in ``on``, to tell apart the entities of this component and
+            ``other``.
+
+        Returns
+        -------
+        BidsPartialComponent
+            Component with the entities in ``on``, followed by the remaining entities
+            of this component and of ``other``. Entries are ordered as in this
+            component, each followed by its matches in ``other`` in their original
+            order.
+
+        Raises
+        ------
+        ValueError
+            If ``how`` is invalid, if ``on`` is empty or contains entities missing
+            from either component, or if the two components share entities not in
+            ``on`` and no distinct suffixes are given.
+        """
+        if how not in {"inner", "left"}:
+            msg = f"how must be 'inner' or 'left', not {how!r}"
+            raise ValueError(msg)
+        on = list(dict.fromkeys(itx.always_iterable(on)))
+        if not on:
+            msg = "At least one entity must be given to join on"
+            raise ValueError(msg)
+        if missing := [
+            entity
+            for entity in on
+            if entity not in self._zip_lists or entity not in other._zip_lists
+        ]:
+            msg = f"Entities to join on must be in both components: {missing}"
+            raise ValueError(msg)
+        left = {e: col for e, col in self._zip_lists.items() if e not in on}
+        right = {e: col for e, col in other._zip_lists.items() if e not in on}
+        if overlap := left.keys() & right.keys():
+            if lsuffix == rsuffix:
+                msg = (
+                    f"Entities {sorted(overlap)} are in both components but not in "
+                    "'on'. Specify distinct lsuffix and rsuffix to tell them apart"
+                )
+                raise ValueError(msg)
+            left = {e + lsuffix if e in overlap else e: col for e, col in left.items()}
+            right = {
+                e + rsuffix if e in overlap else e: col for e, col in right.items()
+            }
+
+        left_rows, right_rows = _join_rows(
+            list(zip(*(self._zip_lists[e] for e in on))),
+            list(zip(*(other._zip_lists[e] for e in on))),
+            keep_unmatched=how == "left",
+        )
+        zip_lists: dict[str, Sequence[str]] = {
+            entity: _take(self._zip_lists[entity], left_rows) for entity in on
+        }
+        zip_lists.update(
+            (entity, _take(col, left_rows)) for entity, col in left.items()
+        )
+        if -1 in right_rows:
+            zip_lists.update(
+                (entity, [col[r] if r >= 0 else "" for r in right_rows])
+                for entity, col in right.items()
+            )
+        else:
+            zip_lists.update(
+                (entity, _take(col, right_rows)) for entity, col in right.items()
+            )
+        return BidsPartialComponent(zip_lists=zip_lists)
+
+
+def _join_rows(
+    left: Sequence[Hashable], right: Sequence[Hashable], *, keep_unmatched: bool
+) -> tuple[array.array[int], array.array[int]]:
+    """Get the positions of each pair of rows with equal keys.
+
+    Pairs are ordered by their left row, then by their right row. If
+    ``keep_unmatched``, left rows with no match are paired with -1.
+    """
+    matches: Iterable[Sequence[int]]
+    if len(right) <= len(left):
+        table: defaultdict[Hashable, list[int]] = defaultdict(list)
+        for i, key in enumerate(right):
+            table[key].append(i)
+        matches = (table.get(key, ()) for key in left)
+    else:
+        table = defaultdict(list)
+        for i, key in enumerate(left):
+            table[key].append(i)
+        by_left: list[list[int]] = [[] for _ in left]
+        for i, key in enumerate(right):
+            for j in table.get(key, ()):
+                by_left[j].append(i)
+        matches = by_left
+
+    left_rows = array.array("q")
+    right_rows = array.array("q")
+    for i, rows in enumerate(matches):
+        if rows:
+            left_rows.extend([i] * len(rows))
+            right_rows.extend(rows)
+        elif keep_unmatched:
+            left_rows.append(i)
+            right_rows.append(-1)
+    return left_rows, right_rows
+
+
+def _expand_cache_key(
+    paths: list[Path | str],
+    allow_missing: bool | list[str],
+    wildcards: dict[str, list[Any]],
+    *,
+    lazy: bool,
+) -> Hashable | None:
+    """Get a key identifying the result of an expansion.
+
+    Returns None if the result should not be cached, as when any of the paths or values
+    is of a type that may format differently from equal values of other types (e.g.
+    snakemake's annotated strings) or is not hashable.
+    """
+    if not all(type(path) is str or isinstance(path, Path) for path in paths):
+        return None
+    if not all(
+        type(val) in _CACHEABLE_TYPES for vals in wildcards.values() for val in vals
+    ):
+        return None
+    return (
+        tuple(paths),
+        allow_missing if isinstance(allow_missing, bool) else tuple(allow_missing),
+        tuple(
+            (wildcard, tuple((type(val), val) for val in vals))
+            for wildcard, vals in wildcards.items()
+        ),
+        lazy,
+    )
+
+
+_CACHEABLE_TYPES = frozenset({str, int, float, bool})
+
+
+def _take(values: Sequence[str], rows: Sequence[int]) -> Sequence[str]:
+    if isinstance(values, (CategoricalList, ColumnView)):
+        return values.take(rows)
+    return ColumnView(values, rows)
+
+
+def _unique(values: Sequence[str]) -> list[str]:
+    if isinstance(values, CategoricalList):
+        return [values.categories[code] for code in set(values.codes)]
+    return list(set(values))
 
 
 @attr.define(kw_only=True)
@@ -494,7 +1032,8 @@ class BidsComponent(BidsPartialComponent):
     entity values saved in the table, giving you a list of paths the same length as the
     number of entries in the component.
 
-    BidsComponents are immutable: their values cannot be altered.
+    BidsComponents are immutable: their values cannot be altered. They are also
+    hashable, and can be used in sets or as dictionary keys.
     """
 
     name: str = attr.field(on_setattr=attr.setters.frozen)
@@ -542,13 +1081,40 @@ class BidsComponent(BidsPartialComponent):
 
         return super().__eq__(other)
 
+    def __hash__(self) -> int:
+        return hash((self.name, self.path, self._get_fingerprint()))
+
+    @overload
+    def expand(
+        self,
+        paths: Iterable[Path | str] | Path | str | None = ...,
+        /,
+        allow_missing: bool | str | Iterable[str] = ...,
+        *,
+        lazy: Literal[False] = ...,
+        **wildcards: str | Iterable[str],
+    ) -> list[str]: ...
+
+    @overload
+    def expand(
+        self,
+        paths: Iterable[Path | str] | Path | str | None = ...,
+        /,
+        allow_missing: bool | str | Iterable[str] = ...,
+        *,
+        lazy: Literal[True],
+        **wildcards: str | Iterable[str],
+    ) -> LazyExpansion: ...
+
     def expand(
         self,
         paths: Iterable[Path | str] | Path | str | None = None,
         /,
         allow_missing: bool | str | Iterable[str] = False,
+        *,
+        lazy: bool = False,
         **wildcards: str | Iterable[str],
-    ) -> list[str]:
+    ) -> list[str] | LazyExpansion:
         """Safely expand over given paths with component wildcards.
 
         Uses the entity-value combinations found in the dataset to expand over the given
@@ -563,6 +1129,13 @@ class BidsComponent(BidsPartialComponent):
 
         Uses the snakemake :ref:`expand <snakemake:snakefiles_expand>` under the hood.
 
+        Results are cached on the component, so repeated calls with the same arguments
+        don't repeat the expansion (see
+        :meth:`~BidsPartialComponent.expand_cache_info`). Each call returns a new list,
+        which can be freely modified. The cache is bounded by both
+        :attr:`~BidsPartialComponent.expand_cache_size` and
+        :attr:`~BidsPartialComponent.expand_cache_max_paths`.
+
         Parameters
         ----------
         paths:
@@ -572,12 +1145,20 @@ class BidsComponent(BidsPartialComponent):
             If True, allow ``{wildcards}`` in the provided paths that are not present
             either in the component or in the extra provided ``**wildcards``. These
             wildcards will be preserved in the returned paths.
+        lazy:
+            If True, return a :class:`~snakebids.core.datasets.LazyExpansion`, a
+            read-only sequence formatting each path only when it is accessed, instead
+            of a list. Useful for expansions of very large components. Holds the same
+            paths as the list. If duplicate paths cannot be ruled out without
+            formatting them, the paths are formatted upfront.
         wildcards:
             Each keyword should be the name of an wildcard in the provided paths.
             Keywords not found in the path will be ignored. Keywords take values or
             lists of values to be expanded over the provided paths.
         """
         paths = paths or self.path
+        if lazy:
+            return super().expand(paths, allow_missing, lazy=True, **wildcards)
         return super().expand(paths, allow_missing, **wildcards)
 
     @property
@@ -615,7 +1196,10 @@ class BidsDataset(UserDictPy38[str, BidsComponent]):
     layout: BIDSLayout | None
     """
     Underlying layout generated from pybids. Note that this will be set to None if
-    custom paths are used to generate every :class:`component <BidsComponent>`
+    custom paths are used to generate every :class:`component <BidsComponent>`, or if
+    the dataset was indexed using the ``"native"`` engine. Subject and session
+    directories not needed by any component (e.g. those of participants not in
+    ``participant_label``) are left out of the layout.
     """
 
     def __init__(self, data: Any, layout: BIDSLayout | None = None) -> None:
@@ -771,6 +1355,62 @@ class BidsDataset(UserDictPy38[str, BidsComponent]):
             "session": "{session}",
         }
 
+    def wildcard_constraints(
+        self,
+        *entities: str,
+        max_length: int = 2048,
+        default: str = "[a-zA-Z0-9]+",
+    ) -> dict[str, str]:
+        """Get snakemake wildcard constraints matching the values in the dataset.
+
+        For each entity, the values found across all components are merged into a
+        regex matching exactly those values (e.g. ``0(?:0[1-9]|1[0-2])`` for subjects
+        ``001`` to ``012``). Tight constraints let snakemake rule out output patterns
+        quickly, and avoid ambiguity between rules.
+
+        Because constraints apply to every rule using a wildcard, only entities whose
+        values all come from the dataset should be constrained. Entities such as
+        ``desc``, which often take new values in derivatives, are best left out.
+
+        Parameters
+        ----------
+        *entities
+            Entities to constrain. By default, every entity in the dataset is
+            constrained. Entities not found in any component are left out.
+        max_length
+            Longest regex to generate. Entities needing a longer regex are given
+            ``default`` instead.
+        default
+            Constraint used for entities with too many distinct values, and for
+            entities with no values at all (as in components emptied by
+            ``--participant-label``), which would otherwise match nothing
+
+        Returns
+        -------
+        dict[str, str]
+            Mapping of each entity to its constraint, for use in
+            ``wildcard_constraints``
+
+        Examples
+        --------
+        Constraints can be applied to the whole workflow in the Snakefile::
+
+            wildcard_constraints:
+                **inputs.wildcard_constraints("subject", "session")
+        """
+        values: defaultdict[str, set[str]] = defaultdict(set)
+        for component in self.values():
+            for entity, column in component.zip_lists.items():
+                if not entities or entity in entities:
+                    values[entity].update(_unique(column))
+        constraints: dict[str, str] = {}
+        for entity, unique in values.items():
+            regex = trie_regex(unique)
+            constraints[entity] = (
+                regex if regex and len(regex) <= max_length else default
+            )
+        return constraints
+
     @property_alias(path, "path", "snakebids.BidsDataset.path")
     def input_path(self) -> dict[str, str]:
         return self.path
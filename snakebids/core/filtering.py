@@ -1,12 +1,27 @@
 from __future__ import annotations
 
-from collections.abc import Iterator, Mapping
-from typing import Iterable, List, Literal, TypeVar, Union, overload
+import functools as ft
+import itertools as it
+import operator as op
+from collections import defaultdict
+from collections.abc import Container, Mapping, Sequence
+from typing import Callable, Iterable, List, Literal, TypeVar, Union, overload
 
 import more_itertools as itx
+from typing_extensions import TypeAlias
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
 
 from snakebids.types import ZipList, ZipListLike
-from snakebids.utils.containers import ContainerBag, MultiSelectDict, RegexContainer
+from snakebids.utils.containers import (
+    CategoricalList,
+    ContainerBag,
+    MultiSelectDict,
+    RegexContainer,
+)
 
 T_co = TypeVar("T_co", bound=Union[List[str], str], covariant=True)
 
@@ -17,6 +32,8 @@ def filter_list(
     filters: Mapping[str, Iterable[str] | str],
     return_indices_only: Literal[False] = ...,
     regex_search: bool = ...,
+    *,
+    exclude: bool = ...,
 ) -> ZipList: ...
 
 
@@ -26,6 +43,8 @@ def filter_list(
     filters: Mapping[str, Iterable[str] | str],
     return_indices_only: Literal[True],
     regex_search: bool = ...,
+    *,
+    exclude: bool = ...,
 ) -> list[int]: ...
 
 
@@ -34,6 +53,8 @@ def filter_list(
     filters: Mapping[str, Iterable[str] | str],
     return_indices_only: bool = False,
     regex_search: bool = False,
+    *,
+    exclude: bool = False,
 ) -> ZipList | list[int]:
     """Filter zip_list, including only entries with provided entity values.
 
@@ -51,6 +72,9 @@ def filter_list(
     regex_search
         Use regex matching to filter instead of the default equality check.
 
+    exclude
+        Invert the filters, removing entries matching any of the provided entity values
+        and keeping all others.
 
     Examples
     --------
@@ -121,6 +145,23 @@ def filter_list(
         ...     'subject': []
         ... }
         True
+
+    Filtering to remove all ``subject='01'`` scans::
+
+        >>> snakebids.filter_list(
+        ...     {
+        ...         'dir': ['AP','PA','AP','PA', 'AP','PA','AP','PA'],
+        ...         'acq': ['98','98','98','98','99','99','99','99'],
+        ...         'subject': ['01','01','02','02','01','01','02','02' ]
+        ...     },
+        ...     {'subject': '01'},
+        ...     exclude=True,
+        ... ) == {
+        ...     'dir': ['AP', 'PA', 'AP', 'PA'],
+        ...     'acq': ['98', '98', '99', '99'],
+        ...     'subject': ['02', '02', '02', '02']
+        ... }
+        True
     """
     # Save filters into memory as sets for quick access later
     if regex_search:
@@ -133,22 +174,63 @@ def filter_list(
             key: set(itx.always_iterable(vals)) for key, vals in filters.items()
         }
 
-    # Get a set {0,1,2,3...n-1} where n is the length of any one of the lists in
-    # zip_list
-    keep_indices = set(_get_zip_list_indices(zip_list)).intersection(
-        *(
-            {i for i, v in enumerate(zip_list[key]) if v in container}
+    # All lists have the same length, so we can use the first to count the rows
+    n_rows = len(itx.first(zip_list.values(), ()))
+    mask = _combine_masks(
+        [
+            _get_mask(zip_list[key], container, exclude=exclude)
             for key, container in filter_sets.items()
             if key in zip_list
-        )
+        ],
+        n_rows,
     )
 
-    # Now we have the indices, so filter the lists
+    # Now we have the mask, so filter the lists
     if return_indices_only:
-        return list(keep_indices)
-    return MultiSelectDict(
-        {key: [val[i] for i in keep_indices] for key, val in zip_list.items()}
-    )
+        return list(it.compress(range(n_rows), mask))
+    return MultiSelectDict({key: _select(val, mask) for key, val in zip_list.items()})
+
+
+def _get_mask(
+    column: Sequence[str], container: Container[str], *, exclude: bool
+) -> bytes:
+    """Get a mask with 1 for each row of the column to keep and 0 for the others.
+
+    Each unique value is only tested against the container once.
+    """
+    if isinstance(column, CategoricalList):
+        keep = bytes((value in container) != exclude for value in column.categories)
+        if np is not None:
+            codes = np.frombuffer(column.codes, dtype=column.codes.typecode)
+            return np.frombuffer(keep, dtype=bool)[codes].tobytes()
+        return bytes(map(keep.__getitem__, column.codes))
+    lookup = {value: (value in container) != exclude for value in set(column)}
+    return bytes(map(lookup.__getitem__, column))
+
+
+def _combine_masks(masks: Sequence[bytes], n_rows: int) -> bytes:
+    """Intersect masks, returning a mask keeping every row if none are given."""
+    if not masks:
+        return b"\x01" * n_rows
+    if len(masks) == 1:
+        return masks[0]
+    if np is not None:
+        return np.logical_and.reduce(
+            [np.frombuffer(mask, dtype=bool) for mask in masks]
+        ).tobytes()
+    # Each byte of the mask is 0 or 1, so the masks can be intersected as big
+    # integers with a single bitwise and
+    combined = ft.reduce(op.and_, (int.from_bytes(mask, "little") for mask in masks))
+    return combined.to_bytes(n_rows, "little")
+
+
+def _select(column: Sequence[str], mask: bytes) -> list[str]:
+    """Select the rows of a column in the mask, keeping encoded columns encoded."""
+    if isinstance(column, CategoricalList):
+        return column.from_codes(  # type: ignore
+            it.compress(column.codes, mask), column.categories
+        )
+    return list(it.compress(column, mask))
 
 
 def get_filtered_ziplist_index(
@@ -235,6 +317,10 @@ def get_filtered_ziplist_index(
         ...     {'subject': '{subject}' }
         ... )
         3
+
+    Each call filters the entire ``zip_list``. When looking up many sets of wildcards
+    in the same ``zip_list``, such as from the input function of a rule, use
+    :func:`get_filtered_ziplist_indexer` instead.
     """
     # get the subject/(session) dict:
     subj_dict = {key: wildcards[key] for key in subj_wildcards}
@@ -249,38 +335,93 @@ def get_filtered_ziplist_index(
     return indices
 
 
-def _get_zip_list_indices(zip_list: ZipListLike) -> Iterator[int]:
-    """Convert a zip_list into its indices.
-
-    Generates a sequence of numbers from 0 up to the length of the zip_lists. For
-    example, the zip list:
-
-    zip_list = {
-        "subject": ["001", "002", "001", "002"],
-        "contrast": ["T1w", "T1w", "T2w", "T2w"]
-    }
+def get_filtered_ziplist_indexer(
+    zip_list: ZipListLike,
+    subj_wildcards: Mapping[str, str],
+) -> Callable[[Mapping[str, str]], int | list[int]]:
+    """Prepare a fast equivalent of :func:`get_filtered_ziplist_index`.
 
-    would lead to:
+    Returns a function taking ``wildcards`` and returning the same result as
+    ``get_filtered_ziplist_index(zip_list, wildcards, subj_wildcards)``. The first
+    call builds a lookup table from the wildcard values of each entry to its index, so
+    that each subsequent call takes constant time, regardless of the size of the
+    ``zip_list``. A new table is built for each distinct set of wildcard names looked
+    up, so the function is best reused for the wildcards of a single rule.
 
-    (0, 1, 2, 3)
+    The ``zip_list`` must not be modified once the indexer is created.
 
     Parameters
     ----------
-    zip_list : dict[str, list[str]]
-        Zip_list to be converted
+    zip_list
+        lists for scans in a dataset, zipped to get each instance
+    subj_wildcards
+        keys of this dictionary are used to pick out the subject/(session)
+        from the wildcards
 
-    Yields
-    ------
-    integers
-        The indices of the zip_list
+    Examples
+    --------
+    >>> import snakebids
+
+    Using the dataset described in :func:`get_filtered_ziplist_index`::
+
+        >>> index_of = snakebids.get_filtered_ziplist_indexer(
+        ...     {
+        ...         'dir': ['AP','PA','AP','PA', 'AP','PA','AP','PA'],
+        ...         'acq': ['98','98','98','98','99','99','99','99'],
+        ...         'subject': ['01','01','02','02','01','01','02','02' ]
+        ...     },
+        ...     {'subject': '{subject}' }
+        ... )
+        >>> index_of({'dir': 'PA', 'acq': '99', 'subject': '01'})
+        3
+        >>> index_of({'dir': 'AP', 'acq': '98', 'subject': '02'})
+        0
     """
-    if not zip_list:
-        return
+    return _ZipListIndexer(zip_list, tuple(subj_wildcards))
+
+
+_IndexTable: TypeAlias = "dict[tuple[tuple[str, ...], tuple[str, ...]], list[int]]"
 
-    # Retrieve the first zip_list (all zip_lists should be the same, so it doesn't
-    # matter which one we take)
-    sample_zip_list = zip_list[itx.first(zip_list)]
 
-    # Return a sequence of numbers 0, 1, 2, 3, ... n-1 where n is the length of the
-    # zip list
-    yield from range(len(sample_zip_list))
+class _ZipListIndexer:
+    """Callable implementing :func:`get_filtered_ziplist_indexer`."""
+
+    def __init__(self, zip_list: ZipListLike, subj_keys: tuple[str, ...]):
+        self._zip_list = zip_list
+        self._subj_keys = subj_keys
+        self._group_keys = tuple(key for key in subj_keys if key in zip_list)
+        self._tables: dict[tuple[str, ...], _IndexTable] = {}
+
+    def _get_table(self, keys: tuple[str, ...]) -> _IndexTable:
+        """Map subject group and wildcard values to indices within the group."""
+        if (table := self._tables.get(keys)) is not None:
+            return table
+        n_rows = len(itx.first(self._zip_list.values(), ()))
+
+        def rows(columns: tuple[str, ...]) -> Iterable[tuple[str, ...]]:
+            if not columns:
+                return it.repeat((), n_rows)
+            return zip(*(self._zip_list[key] for key in columns))
+
+        group_sizes: dict[tuple[str, ...], int] = defaultdict(int)
+        table: defaultdict[tuple[tuple[str, ...], tuple[str, ...]], list[int]] = (
+            defaultdict(list)
+        )
+        for group, values in zip(rows(self._group_keys), rows(keys)):
+            table[group, values].append(group_sizes[group])
+            group_sizes[group] += 1
+        self._tables[keys] = table = dict(table)
+        return table
+
+    def __call__(self, wildcards: Mapping[str, str]) -> int | list[int]:
+        wildcards = dict(wildcards.items())
+        # Like get_filtered_ziplist_index, every subject wildcard must be given
+        subj_dict = {key: wildcards[key] for key in self._subj_keys}
+        group = tuple(subj_dict[key] for key in self._group_keys)
+        keys = tuple(key for key in self._zip_list if key in wildcards)
+        indices = self._get_table(keys).get(
+            (group, tuple(wildcards[key] for key in keys)), []
+        )
+        if len(indices) == 1:
+            return indices[0]
+        return list(indices)
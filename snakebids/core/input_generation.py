@@ -13,18 +13,40 @@ from typing import (
     Any,
     Iterable,
     Literal,
+    Mapping,
     overload,
 )
 
+import attrs
 import more_itertools as itx
 from bids import BIDSLayout, BIDSLayoutIndexer
-
+from bids.layout.models import BIDSFile
+from bids.layout.validation import DEFAULT_LOCATIONS_TO_IGNORE
+from typing_extensions import Self
+
+from snakebids.core._indexing import (
+    DIRECTORY_ENTITIES,
+    INDEX_FILENAME,
+    BidsIndex,
+    DirectoryPruner,
+    IndexedFile,
+    IndexQuery,
+    get_dir_entities,
+)
 from snakebids.core._querying import (
     FilterSpecError,
     PostFilter,
     UnifiedFilter,
     get_matching_files,
 )
+from snakebids.core._snapshot import (
+    SNAPSHOT_DIR_ENV,
+    get_fingerprint,
+    get_fingerprint_roots,
+    get_snapshot_key,
+    load_snapshot,
+    save_snapshot,
+)
 from snakebids.core.datasets import BidsComponent, BidsDataset, BidsDatasetDict
 from snakebids.core.filtering import filter_list
 from snakebids.exceptions import (
@@ -34,7 +56,8 @@ from snakebids.exceptions import (
 )
 from snakebids.snakemake_compat import Snakemake
 from snakebids.types import InputConfig, InputsConfig, ZipList
-from snakebids.utils.snakemake_io import glob_wildcards
+from snakebids.utils.containers import MultiSelectDict
+from snakebids.utils.snakemake_io import glob_wildcards, regex
 from snakebids.utils.utils import (
     DEPRECATION_FLAG,
     BidsEntity,
@@ -61,6 +84,9 @@ def generate_inputs(
     validate: bool = ...,
     pybids_database_dir: Path | str | None = ...,
     pybids_reset_database: bool = ...,
+    engine: Literal["pybids", "native"] = ...,
+    index_workers: int | None = ...,
+    snapshot_dir: Path | str | None = ...,
 ) -> BidsDataset: ...
 
 
@@ -80,6 +106,9 @@ def generate_inputs(
     validate: bool = ...,
     pybids_database_dir: Path | str | None = ...,
     pybids_reset_database: bool = ...,
+    engine: Literal["pybids", "native"] = ...,
+    index_workers: int | None = ...,
+    snapshot_dir: Path | str | None = ...,
 ) -> BidsDatasetDict: ...
 
 
@@ -98,6 +127,9 @@ def generate_inputs(
     validate: bool = False,
     pybids_database_dir: Path | str | None = None,
     pybids_reset_database: bool | None = None,
+    engine: Literal["pybids", "native"] = "pybids",
+    index_workers: int | None = None,
+    snapshot_dir: Path | str | None = None,
 ) -> BidsDataset | BidsDatasetDict:
     """Dynamically generate snakemake inputs using pybids_inputs.
 
@@ -129,7 +161,9 @@ def generate_inputs(
 
         * ``"custom_path"``: Custom path to be parsed with wildcards wrapped in braces,
           as in ``/path/to/sub-{subject}/{wildcard_1}-{wildcard_2}``. This path will be
-          parsed without pybids, allowing the use of non-bids-compliant paths.
+          parsed without pybids, allowing the use of non-bids-compliant paths. Only
+          directories matching the corresponding directory of the path are searched,
+          so each wildcard in a directory name matches a single directory level.
 
     pybidsdb_dir
         Path to database directory. If None is provided, database
@@ -155,6 +189,12 @@ def generate_inputs(
         cause errors if subject filters are also specified in pybids_inputs. It may not
         be specified if exclude_participant_label is specified
 
+        Subject and session directories rejected by the filters of every component,
+        including by ``participant_label``, are skipped while indexing. The
+        :attr:`~BidsDataset.layout` of the returned dataset thus only holds the
+        directories of included participants. Nothing is skipped when ``pybidsdb_dir``
+        is set, so saved indices remain complete.
+
     exclude_participant_label
         Indicate one or more participants to be excluded from input parsing. This may
         cause errors if subject filters are also specified in pybids_inputs. It may not
@@ -173,6 +213,42 @@ def generate_inputs(
         If True performs validation of BIDS directory using pybids, otherwise
         skips validation.
 
+    engine
+        Backend used to index ``bids_dir``. ``"pybids"`` (the default) indexes the
+        dataset with a :class:`BIDSLayout <bids.layout.BIDSLayout>`. ``"native"``
+        walks the directory tree directly, parsing entities from filenames using the
+        same definitions as the :func:`~snakebids.bids` function. This is much faster
+        and lighter on memory for large datasets, but does not support
+        ``pybids_config``, ``index_metadata``, or validation, and sets
+        :attr:`BidsDataset.layout` to ``None``. If ``pybidsdb_dir`` is set, the native
+        index is saved there, and later calls only re-list directories whose
+        modification time has changed. Use ``pybidsdb_reset`` to rebuild it from
+        scratch.
+
+    index_workers
+        Number of threads used to list directories when indexing with the ``"native"``
+        engine or globbing ``custom_path`` components. Work is split at the subject
+        and session directory levels. Values above 1 mostly benefit filesystems with
+        high metadata latency, such as network filesystems. Has no effect on the
+        ``"pybids"`` engine.
+
+    snapshot_dir
+        Directory in which to save snapshots of the returned dataset. Each snapshot is
+        keyed on the arguments of this function and a fingerprint of the dataset,
+        computed from the modification times of its top-level directories (down to
+        the datatype level). When a call matches an existing snapshot, the snapshot is
+        loaded instead of indexing the dataset. This is useful when the Snakefile is
+        evaluated repeatedly, as in every job submitted to a cluster. Loaded datasets
+        have no :attr:`~BidsDataset.layout`. Snapshots are not loaded when
+        ``pybidsdb_reset`` is True.
+
+        When the dataset has no layout (i.e. when using the ``"native"`` engine or
+        when every component has a ``custom_path``), defaults to the
+        ``SNAKEBIDS_SNAPSHOT_DIR`` environment variable, which snakebids apps set to
+        a fresh directory for each run of snakemake. The dataset indexed when the
+        workflow is first evaluated is thus reused by its jobs, which inherit the
+        variable. Failing to save a snapshot is logged, but is otherwise ignored.
+
     Returns
     -------
     BidsDataset | BidsDatasetDict
@@ -270,14 +346,79 @@ ses-{session}_run-{run}_T1w.nii.gz",
     """
     postfilters = PostFilter()
     postfilters.add_filter("subject", participant_label, exclude_participant_label)
+    # limit_to is read several times, so one-shot iterables must be consumed once
+    limit_to = None if limit_to is None else list(limit_to)
 
     pybidsdb_dir, pybidsdb_reset = _normalize_database_args(
         pybidsdb_dir, pybidsdb_reset, pybids_database_dir, pybids_reset_database
     )
 
-    # Generates a BIDSLayout
-    layout = (
-        _gen_bids_layout(
+    if engine not in ("pybids", "native"):
+        msg = f"engine must be one of 'pybids' or 'native', got {engine!r}"
+        raise ValueError(msg)
+    if engine == "native" and (pybids_config is not None or index_metadata or validate):
+        msg = (
+            "pybids_config, index_metadata, and validate are only supported by the "
+            "'pybids' engine"
+        )
+        raise ValueError(msg)
+
+    if use_bids_inputs is True:
+        _logger.warning(
+            "The parameter `use_bids_inputs` in generate_inputs() is now set, by "
+            "default, to True. Manually setting it to True is deprecated as of version "
+            "0.8. "
+        )
+    elif use_bids_inputs is None:
+        use_bids_inputs = True
+
+    all_custom_paths = _all_custom_paths(pybids_inputs)
+    # Snapshots have no layout, so they are only shared with jobs by default when the
+    # dataset would not have one anyway
+    if snapshot_dir is None and (engine == "native" or all_custom_paths):
+        snapshot_dir = os.environ.get(SNAPSHOT_DIR_ENV) or None
+    snapshot_path = (
+        Path(
+            snapshot_dir,
+            get_snapshot_key(
+                bids_dir=os.path.abspath(bids_dir),
+                pybids_inputs=pybids_inputs,
+                derivatives=derivatives,
+                pybids_config=pybids_config,
+                limit_to=limit_to,
+                participant_label=participant_label,
+                exclude_participant_label=exclude_participant_label,
+                validate=validate,
+                engine=engine,
+                fingerprint=get_fingerprint(
+                    get_fingerprint_roots(bids_dir, pybids_inputs, derivatives)
+                ),
+            )
+            + ".json",
+        )
+        if snapshot_dir is not None
+        else None
+    )
+    if snapshot_path is not None and not pybidsdb_reset:
+        dataset = load_snapshot(snapshot_path)
+        if dataset is not None:
+            _logger.debug("Loaded dataset snapshot from %s", snapshot_path)
+            return dataset if use_bids_inputs else dataset.as_dict
+
+    # Persisted indices must be complete, so directories are only skipped without one
+    pruner = (
+        _IndexPruner.from_config(
+            pybids_inputs, limit_to=limit_to, postfilters=postfilters
+        )
+        if _check_database_dir(pybidsdb_dir) is None and not all_custom_paths
+        else None
+    )
+
+    index = (
+        None
+        if all_custom_paths
+        else _gen_index(
+            engine=engine,
             bids_dir=bids_dir,
             derivatives=derivatives,
             pybids_config=pybids_config,
@@ -285,26 +426,19 @@ ses-{session}_run-{run}_T1w.nii.gz",
             pybidsdb_reset=pybidsdb_reset,
             index_metadata=index_metadata,
             validate=validate,
+            workers=index_workers,
+            prune=pruner,
         )
-        if not _all_custom_paths(pybids_inputs)
-        else None
     )
 
     bids_inputs = _get_components(
-        bids_layout=layout,
+        bids_layout=index,
         inputs_config=pybids_inputs,
         limit_to=limit_to,
         postfilters=postfilters,
+        workers=index_workers,
     )
-
-    if use_bids_inputs is True:
-        _logger.warning(
-            "The parameter `use_bids_inputs` in generate_inputs() is now set, by "
-            "default, to True. Manually setting it to True is deprecated as of version "
-            "0.8. "
-        )
-    elif use_bids_inputs is None:
-        use_bids_inputs = True
+    layout = index if isinstance(index, BIDSLayout) else None
 
     try:
         dataset = BidsDataset.from_iterable(bids_inputs, layout)
@@ -314,6 +448,9 @@ ses-{session}_run-{run}_T1w.nii.gz",
         )
         raise ConfigError(msg) from err
 
+    if snapshot_path is not None:
+        save_snapshot(snapshot_path, dataset)
+
     if use_bids_inputs:
         return dataset
     return dataset.as_dict
@@ -410,6 +547,98 @@ def _is_local_relative(path: Path | str):
     return not is_doubleslash_schemed and not os.path.isabs(path_str)
 
 
+@attrs.define
+class _IndexPruner:
+    """Tests if a directory is rejected by every indexed component.
+
+    Components with a ``custom_path`` don't use the index, and so are not considered.
+    Post-exclusions are ignored: components are returned even when all of their files
+    are excluded, and those files are still needed to find the path of the component.
+    """
+
+    filters: dict[str, UnifiedFilter]
+
+    @classmethod
+    def from_config(
+        cls,
+        inputs_config: InputsConfig,
+        *,
+        limit_to: Iterable[str] | None,
+        postfilters: PostFilter,
+    ) -> Self | None:
+        """Get the pruner for a configuration, or None if nothing could be pruned."""
+        filters = {
+            name: UnifiedFilter(inputs_config[name], postfilters)
+            for name in limit_to or inputs_config
+            if not inputs_config[name].get("custom_path")
+        }
+        if not all(
+            filt.may_reject(DIRECTORY_ENTITIES, exclusions=False)
+            for filt in filters.values()
+        ):
+            return None
+        return cls(filters)
+
+    def __call__(self, entities: Mapping[str, str]) -> bool:
+        return all(
+            filt.rejects(entities, exclusions=False) for filt in self.filters.values()
+        )
+
+
+@attrs.frozen
+class _PybidsDirectoryPruner:
+    """Skips subject and session directories while indexing with pybids.
+
+    Passed to :class:`~bids.layout.BIDSLayoutIndexer` in its list of ``ignore``
+    patterns, which pybids only requires to have a ``search()`` method. Paths are given
+    relative to the root of the layout, with a leading slash.
+    """
+
+    prune: DirectoryPruner
+
+    def search(self, path: str) -> bool:
+        entities = get_dir_entities(path.lstrip("/"))
+        return entities is not None and self.prune(entities)
+
+
+def _gen_index(
+    *,
+    engine: Literal["pybids", "native"],
+    bids_dir: Path | str,
+    derivatives: Path | str | bool,
+    pybidsdb_dir: Path | str | None,
+    pybidsdb_reset: bool,
+    pybids_config: Path | str | None,
+    index_metadata: bool,
+    validate: bool,
+    workers: int | None,
+    prune: DirectoryPruner | None,
+) -> BIDSLayout | BidsIndex:
+    """Index the dataset using the requested engine.
+
+    See :func:`_gen_bids_layout` and :func:`_gen_bids_index`
+    """
+    if engine == "native":
+        return _gen_bids_index(
+            bids_dir=bids_dir,
+            derivatives=derivatives,
+            pybidsdb_dir=pybidsdb_dir,
+            pybidsdb_reset=pybidsdb_reset,
+            workers=workers,
+            prune=prune,
+        )
+    return _gen_bids_layout(
+        bids_dir=bids_dir,
+        derivatives=derivatives,
+        pybids_config=pybids_config,
+        pybidsdb_dir=pybidsdb_dir,
+        pybidsdb_reset=pybidsdb_reset,
+        index_metadata=index_metadata,
+        validate=validate,
+        prune=prune,
+    )
+
+
 def _gen_bids_layout(
     *,
     bids_dir: Path | str,
@@ -419,6 +648,7 @@ def _gen_bids_layout(
     pybids_config: Path | str | None = None,
     index_metadata: bool = False,
     validate: bool = False,
+    prune: DirectoryPruner | None = None,
 ) -> BIDSLayout:
     """Create (or reindex) the BIDSLayout.
 
@@ -446,31 +676,107 @@ def _gen_bids_layout(
     validate
         A boolean that determines whether to validate the bids dataset
 
+    prune
+        Called with the entities of each subject and session directory. Directories
+        for which this returns True are not indexed.
+
     Returns
     -------
     layout : BIDSLayout
         Layout from pybids for accessing the BIDS dataset to grab paths
     """
-    # Check for database_dir
-    # If blank, assume db not to be used
-    if not pybidsdb_dir:
-        pybidsdb_dir = None
-    # Otherwise check for relative path and update
-    elif not Path(pybidsdb_dir).is_absolute():
-        pybidsdb_dir = None
-        _logger.warning("Absolute path must be provided, database will not be used")
-
     return BIDSLayout(
         str(bids_dir),
         derivatives=derivatives,
         validate=validate,
         config=pybids_config,
-        database_path=pybidsdb_dir,
+        database_path=_check_database_dir(pybidsdb_dir),
         reset_database=pybidsdb_reset,
-        indexer=BIDSLayoutIndexer(validate=False, index_metadata=index_metadata),
+        indexer=BIDSLayoutIndexer(
+            validate=False,
+            index_metadata=index_metadata,
+            # Passing ignore overrides the defaults, so they must be included
+            **(
+                {
+                    "ignore": [
+                        *DEFAULT_LOCATIONS_TO_IGNORE,
+                        _PybidsDirectoryPruner(prune),
+                    ]
+                }
+                if prune is not None
+                else {}
+            ),
+        ),
     )
 
 
+def _gen_bids_index(
+    *,
+    bids_dir: Path | str,
+    derivatives: Path | str | bool,
+    pybidsdb_dir: Path | str | None,
+    pybidsdb_reset: bool,
+    workers: int | None = None,
+    prune: DirectoryPruner | None = None,
+) -> BidsIndex:
+    """Create (or refresh) the native BidsIndex.
+
+    Parameters
+    ----------
+    bids_dir
+        Path to bids directory
+
+    derivatives
+        A boolean (or path(s) to derivatives datasets) that
+        determines whether snakebids will search in the
+        derivatives subdirectory of the input dataset.
+
+    pybidsdb_dir
+        Path to database directory. If provided, the index is saved in this directory
+        and refreshed incrementally on subsequent calls. If None is provided, the
+        dataset is fully indexed.
+
+    pybidsdb_reset
+        A boolean that determines whether to discard the existing saved index.
+
+    workers
+        Number of threads used to list directories
+
+    prune
+        Called with the entities of each subject and session directory. Directories
+        for which this returns True are not indexed. Only used if no database
+        directory is given.
+
+    Returns
+    -------
+    index : BidsIndex
+        Native index for accessing the BIDS dataset to grab paths
+    """
+    database_dir = _check_database_dir(pybidsdb_dir)
+    return BidsIndex.from_directory(
+        bids_dir,
+        derivatives=derivatives,
+        workers=workers,
+        index_path=(
+            Path(database_dir, INDEX_FILENAME) if database_dir is not None else None
+        ),
+        reset=pybidsdb_reset,
+        prune=prune if database_dir is None else None,
+    )
+
+
+def _check_database_dir(pybidsdb_dir: Path | str | None) -> Path | str | None:
+    """Return the database directory, or None if it shouldn't be used."""
+    # If blank, assume db not to be used
+    if not pybidsdb_dir:
+        return None
+    # Otherwise check for relative path
+    if not Path(pybidsdb_dir).is_absolute():
+        _logger.warning("Absolute path must be provided, database will not be used")
+        return None
+    return pybidsdb_dir
+
+
 def write_derivative_json(snakemake: Snakemake, **kwargs: dict[str, Any]) -> None:
     """Update sidecar file with provided sources and parameters.
 
@@ -500,17 +806,19 @@ def write_derivative_json(snakemake: Snakemake, **kwargs: dict[str, Any]) -> Non
 
 def _get_components(
     *,
-    bids_layout: BIDSLayout | None,
+    bids_layout: BIDSLayout | BidsIndex | None,
     inputs_config: InputsConfig,
     postfilters: PostFilter,
     limit_to: Iterable[str] | None = None,
+    workers: int | None = None,
 ):
     """Generate components based on components config and a bids layout.
 
     Parameters
     ----------
-    bids_layout : BIDSLayout
-        Layout from pybids for accessing the BIDS dataset to grab paths.
+    bids_layout : BIDSLayout | BidsIndex
+        Layout from pybids (or native index) for accessing the BIDS dataset to grab
+        paths.
 
     inputs_config
         Dictionary indexed by modality name, specifying the filters and
@@ -523,6 +831,9 @@ def _get_components(
     postfilters
         Filters to all components after delineation.
 
+    workers
+        Number of threads used to glob custom paths.
+
     Yields
     ------
     BidsComponent:
@@ -533,30 +844,75 @@ def _get_components(
     ConfigError
         In response to invalid configuration, missing components, or parsing errors.
     """
-    for name in limit_to or inputs_config:
+    names = list(limit_to or inputs_config)
+    # The native index can route its files to every component in a single pass, rather
+    # than being queried once per component
+    matching_files = (
+        _query_index(
+            bids_layout,
+            {
+                name: inputs_config[name]
+                for name in names
+                if "custom_path" not in inputs_config[name]
+            },
+            postfilters=postfilters,
+        )
+        if isinstance(bids_layout, BidsIndex)
+        else {}
+    )
+    for name in names:
         comp = _get_component(
             bids_layout=bids_layout,
             component=inputs_config[name],
             input_name=name,
             postfilters=postfilters,
+            workers=workers,
+            matching_files=matching_files.get(name),
         )
         if comp is not None:
             yield comp
 
 
+def _query_index(
+    index: BidsIndex, components: Mapping[str, InputConfig], *, postfilters: PostFilter
+) -> dict[str, list[IndexedFile]]:
+    """Find the files matching each component in a single pass over the index.
+
+    Components with an empty prefilter match no files, and are left out of the result.
+
+    Raises
+    ------
+    ConfigError
+        In response to invalid filter configuration.
+    """
+    queries: dict[str, IndexQuery] = {}
+    for name, component in components.items():
+        filters = UnifiedFilter(component, postfilters)
+        if filters.has_empty_prefilter:
+            continue
+        try:
+            queries[name] = IndexQuery(filters=filters.get, search=filters.search)
+        except FilterSpecError as err:
+            raise err.get_config_error(name) from err
+    return index.get_many(queries)
+
+
 def _get_component(
-    bids_layout: BIDSLayout | None,
+    bids_layout: BIDSLayout | BidsIndex | None,
     component: InputConfig,
     *,
     input_name: str,
     postfilters: PostFilter,
+    workers: int | None = None,
+    matching_files: Iterable[BIDSFile | IndexedFile] | None = None,
 ) -> BidsComponent | None:
     """Create component based on provided config.
 
     Parameters
     ----------
     bids_layout
-        Layout from pybids for accessing the BIDS dataset to grab paths
+        Layout from pybids (or native index) for accessing the BIDS dataset to grab
+        paths
 
     component
         Dictionary indexed by modality name, specifying the filters and
@@ -568,6 +924,12 @@ def _get_component(
     postfilters
         Filters to component after delineation
 
+    workers
+        Number of threads used to glob custom paths
+
+    matching_files
+        Files matching the component filters, if already queried from the layout
+
     Raises
     ------
     ConfigError
@@ -579,7 +941,7 @@ def _get_component(
 
     if "custom_path" in component:
         path = component["custom_path"]
-        zip_lists = _parse_custom_path(path, filters=filters)
+        zip_lists = _parse_custom_path(path, filters=filters, workers=workers)
         return BidsComponent(name=input_name, path=path, zip_lists=zip_lists)
 
     if bids_layout is None:
@@ -591,10 +953,12 @@ def _get_component(
 
     zip_lists: dict[str, list[str]] = defaultdict(list)
     paths: set[str] = set()
-    try:
-        matching_files = get_matching_files(bids_layout, filters)
-    except FilterSpecError as err:
-        raise err.get_config_error(input_name) from err
+    parser = _BidsPathParser()
+    if matching_files is None:
+        try:
+            matching_files = get_matching_files(bids_layout, filters)
+        except FilterSpecError as err:
+            raise err.get_config_error(input_name) from err
 
     for img in matching_files:
         wildcards: list[str] = [
@@ -605,16 +969,20 @@ def _get_component(
         _logger.debug("Wildcards %s found entities for %s", wildcards, img.path)
 
         try:
-            path, parsed_wildcards = _parse_bids_path(img.path, wildcards)
+            path, parsed_wildcards = parser.parse(img.path, wildcards)
         except BidsParseError as err:
+            indexer, pattern = (
+                ("The native index", err.entity.regex)
+                if isinstance(bids_layout, BidsIndex)
+                else ("Pybids", bids_layout.entities[err.entity.entity].regex)
+            )
             msg = (
                 "Parsing failed:\n"
                 f"  Entity: {err.entity.entity}\n"
                 f"  Pattern: {err.entity.regex}\n"
                 f"  Path: {img.path}\n"
                 "\n"
-                "Pybids parsed this path using the pattern: "
-                f"{bids_layout.entities[err.entity.entity].regex}\n"
+                f"{indexer} parsed this path using the pattern: {pattern}\n"
                 "\n"
                 "Snakebids is not currently able to handle this entity. If it is a "
                 "custom entity, its `tag-` must be configured to be the same as "
@@ -666,14 +1034,17 @@ def _get_component(
             name=input_name, path=path, zip_lists={key: [] for key in zip_lists}
         )
 
-    return BidsComponent(name=input_name, path=path, zip_lists=zip_lists).filter(
-        regex_search=True, **filters.post_exclusions
+    return BidsComponent(
+        name=input_name,
+        path=path,
+        zip_lists=filter_list(zip_lists, filters.post_exclusions, exclude=True),
     )
 
 
 def _parse_custom_path(
     input_path: Path | str,
     filters: UnifiedFilter,
+    workers: int | None = None,
 ) -> ZipList:
     """Glob wildcards from a custom path and apply filters.
 
@@ -694,16 +1065,24 @@ def _parse_custom_path(
         If True, use regex matching for filtering rather than simple equality
     **filters : str or list of str
         Values to keep. Each argument is the name of the entity to search
+    workers : int, optional
+        Number of threads used to walk the filesystem
 
     Returns
     -------
     input_zip_list, input_list, input_wildcards
     """
-    if not (wildcards := glob_wildcards(input_path)):
-        _logger.warning("No wildcards defined in %s", input_path)
+    wildcards = glob_wildcards(input_path, workers=workers, prune=filters.rejects)
+    if not wildcards:
+        # Nothing was globbed, either because every directory was pruned by the
+        # filters or because no files matched. Either way, keep every wildcard
+        names = re.compile(regex(os.path.normpath(input_path))).groupindex
+        if not names:
+            _logger.warning("No wildcards defined in %s", input_path)
+        wildcards = MultiSelectDict({name: [] for name in names})
 
     # Log an error if no matches found
-    if len(itx.first(wildcards.values())) == 0:
+    if len(itx.first(wildcards.values(), [])) == 0:
         _logger.error("No matching files for %s", input_path)
         return wildcards
 
@@ -716,7 +1095,7 @@ def _parse_custom_path(
     if not filters.post_exclusions:
         return result
 
-    return filter_list(result, filters.post_exclusions, regex_search=True)
+    return filter_list(result, filters.post_exclusions, exclude=True)
 
 
 def _parse_bids_path(path: str, entities: Iterable[str]) -> tuple[str, dict[str, str]]:
@@ -779,6 +1158,63 @@ def _parse_bids_path(path: str, entities: Iterable[str]) -> tuple[str, dict[str,
     return "".join(new_path), wildcard_values
 
 
+def _compile_bids_template(
+    template: str, entities: Iterable[str]
+) -> re.Pattern[str] | None:
+    """Compile a template returned by _parse_bids_path into a regex.
+
+    Each wildcard is constrained to the value pattern of its entity. Returns None if
+    the template cannot be safely compiled.
+    """
+    # Escaped braces in the template would be read as wildcards by ``regex()``
+    if "{{" in template or "}}" in template:
+        return None
+    constraints = {
+        entity.wildcard: entity.match for entity in map(BidsEntity, entities)
+    }
+    if not all(wildcard.isidentifier() for wildcard in constraints):
+        return None
+    # regex() only accepts a constraint on the first appearance of each wildcard
+    for wildcard, constraint in constraints.items():
+        template = template.replace(
+            f"{{{wildcard}}}", f"{{{wildcard},{constraint}}}", 1
+        )
+    return re.compile(regex(template))
+
+
+@attrs.define
+class _BidsPathParser:
+    """Parse bids paths, learning the template of each set of entities.
+
+    The first path parsed with a given set of entities is parsed with
+    :func:`_parse_bids_path`, and the resulting template is compiled into a single
+    anchored regex. Subsequent paths with the same entities are parsed with one
+    ``match`` call, falling back to :func:`_parse_bids_path` if they don't fit the
+    template.
+    """
+
+    _templates: dict[frozenset[str], tuple[str, re.Pattern[str] | None]] = attrs.field(
+        factory=dict
+    )
+
+    def parse(self, path: str, entities: Iterable[str]) -> tuple[str, dict[str, str]]:
+        """Replace parameters in a bids path with the given wildcard {tags}.
+
+        See :func:`_parse_bids_path`
+        """
+        entities = list(entities)
+        key = frozenset(entities)
+        if key in self._templates:
+            template, pattern = self._templates[key]
+            if pattern is not None and (match := pattern.match(path)):
+                return template, match.groupdict()
+            return _parse_bids_path(path, entities)
+
+        template, wildcard_values = _parse_bids_path(path, entities)
+        self._templates[key] = (template, _compile_bids_template(template, entities))
+        return template, wildcard_values
+
+
 def get_wildcard_constraints(image_types: InputsConfig) -> dict[str, str]:
     """Return a wildcard_constraints dict for use in snakemake.
 
@@ -797,7 +1233,7 @@ def get_wildcard_constraints(image_types: InputsConfig) -> dict[str, str]:
     """
     bids_constraints = "[a-zA-Z0-9]+"
     return {
-        entity: bids_constraints
-        for imgtype in image_types
-        for entity in image_types[imgtype]
+        BidsEntity(entity).wildcard: bids_constraints
+        for component in image_types.values()
+        for entity in component.get("wildcards", [])
     }
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
+import functools as ft
 import itertools as it
 import os
-import sys
 import warnings
 from pathlib import Path
-from typing import Protocol
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Protocol, Sequence
 
 import more_itertools as itx
 
 from snakebids.io.console import in_interactive_session
 from snakebids.paths import specs
+from snakebids.paths._parser import parser_factory
 from snakebids.paths._utils import BidsPathSpec, find_entity
 
+if TYPE_CHECKING:
+    from snakebids.core.datasets import BidsPartialComponent
+
 
 class BidsFunction(Protocol):
     """Signature for functions returned by ``bids_factory``.
@@ -31,6 +35,84 @@ class BidsFunction(Protocol):
         **entities: str | bool,
     ) -> str: ...
 
+    def many(
+        self,
+        zip_lists: Mapping[str, Sequence[str]] | BidsPartialComponent | None = None,
+        /,
+        root: str | Path | None = None,
+        *,
+        datatype: str | Sequence[str] | None = None,
+        prefix: str | Sequence[str] | None = None,
+        suffix: str | Sequence[str] | None = None,
+        extension: str | Sequence[str] | None = None,
+        **entities: str | bool | Sequence[str],
+    ) -> list[str]:
+        """Generate a path for each row of entity values.
+
+        Equivalent to calling the function once per row, but the layout of the path
+        is only worked out once.
+
+        Parameters
+        ----------
+        zip_lists
+            Component or mapping of entities to equal-length lists of values. Entries
+            named ``datatype``, ``suffix``, or ``extension`` are used as those
+            arguments.
+        root, datatype, prefix, suffix, extension, entities
+            As for a single path. Each may be given either a single value, used for
+            every path, or a sequence with one value per path. These take
+            precedence over the entries of ``zip_lists``.
+
+        Returns
+        -------
+        list[str]
+            One path for each row. If no sequences are given, a single path is
+            returned.
+        """
+        ...
+
+    def parse(self, path: str, /) -> dict[str, str] | None:
+        """Get the entities of a path built by this function.
+
+        Only the filename is parsed, using a regex compiled from the spec. Entities in
+        the spec are returned under their full names (e.g. ``subject``), and other
+        entities under the name found in the path. The last part of the filename is
+        returned as ``suffix`` if it has no ``-``, and anything after its first ``.``
+        as ``extension``. Extensions without a leading ``.`` cannot be told apart
+        from the preceding part and are not recovered. The datatype and any prefix
+        are not recovered either.
+
+        Parameters
+        ----------
+        path
+            Path to parse
+
+        Returns
+        -------
+        dict[str, str] | None
+            Entities of the path, or None if the filename could not have been built
+            using the spec. Passing the entities back to this function gives the
+            original filename.
+        """
+        ...
+
+    def parse_many(self, paths: Iterable[str], /) -> list[dict[str, str] | None]:
+        """Get the entities of many paths built by this function.
+
+        See :meth:`parse` for details.
+
+        Parameters
+        ----------
+        paths
+            Paths to parse
+
+        Returns
+        -------
+        list[dict[str, str] | None]
+            Entities of each path, in the same order as ``paths``
+        """
+        ...
+
 
 def _handle_subses_dir(
     root: str | Path | None = None,
@@ -107,9 +189,231 @@ def _get_entity_parser(aliases: dict[str, str]):
     return parse_entities
 
 
+def _missing_name_error(*, datatype: str | None, prefix: str | None) -> ValueError:
+    return ValueError(
+        "At least one of suffix, extension, or an entity must be "
+        "supplied.\n\tGot only: "
+        + " and ".join(
+            filter(
+                None,
+                (
+                    f"datatype='{datatype}'" if datatype else None,
+                    f"prefix='{prefix}'" if prefix else None,
+                ),
+            )
+        )
+    )
+
+
+def _warn_implicit_spec(path: str, custom_parts: list[str], *, stacklevel: int):
+    wrn_msg = (
+        f"Path generated with unrecognized entities, and a snakebids spec has "
+        "not been explicitly declared. This could break in future snakebids "
+        "versions, as the default spec can be changed without warning.\n"
+        f"\tpath = {path!r}\n"
+        f"\tentities = {custom_parts!r}\n\n"
+        "Please declare a spec using:\n"
+        "\tfrom snakebids import set_bids_spec\n"
+        f'\tset_bids_spec("{specs.LATEST}")\n'
+    ).expandtabs(4)
+    warnings.warn(wrn_msg, stacklevel=stacklevel)
+
+
+def _build_path(
+    position: dict[str, int],
+    split: int,
+    dirs: set[str],
+    parse_entities: Callable[[dict[str, str | bool]], dict[str, str]],
+    /,
+    *,
+    root: str | Path | None,
+    datatype: str | None,
+    prefix: str | None,
+    suffix: str | None,
+    extension: str | None,
+    **entities: str | bool,
+) -> tuple[str, list[str]]:
+    """Build a path, returning it with any entities not found in the spec.
+
+    ``position`` gives the order of each entity in the spec. Custom entities are placed
+    after the spec entities before ``split``.
+    """
+    if not any([entities, suffix, extension]) and any([datatype, prefix]):
+        raise _missing_name_error(datatype=datatype, prefix=prefix)
+
+    spec_entities: list[tuple[int, str, str]] = []
+    custom_parts: list[str] = []
+    for entity, value in parse_entities(entities).items():
+        if entity not in position:
+            custom_parts.append(f"{entity}-{value}")
+        # Spec entities without a value are left out
+        elif value:
+            spec_entities.append((position[entity], entity, value))
+    spec_entities.sort()
+
+    path_parts: list[str] = [str(root)] if root else []
+    name_parts: list[str] = [prefix] if prefix else []
+    custom_added = False
+    for i, entity, value in spec_entities:
+        if i > split and not custom_added:
+            name_parts.extend(custom_parts)
+            custom_added = True
+        name_parts.append(f"{entity}-{value}")
+        if entity in dirs:
+            path_parts.append(f"{entity}-{value}")
+    if not custom_added:
+        name_parts.extend(custom_parts)
+
+    if datatype:
+        path_parts.append(datatype)
+    if suffix is not None:
+        name_parts.append(suffix)
+    path_parts.append("_".join(name_parts))
+    result = os.path.join(*path_parts)
+    if extension is not None:
+        result += extension
+    return result, custom_parts
+
+
+_NON_ENTITY_ARGS = ("root", "datatype", "prefix", "suffix", "extension")
+
+
+def _broadcast(
+    values: Iterable[Any],
+) -> tuple[list[Iterable[Any]], int | None]:
+    """Repeat single values alongside the sequences in ``values``.
+
+    Returns the sequences and repeated values, and the length shared by the
+    sequences, or None if there were none.
+    """
+    length: int | None = None
+    columns: list[Iterable[Any]] = []
+    for value in values:
+        if isinstance(value, Sequence) and not isinstance(value, str):
+            if length is None:
+                length = len(value)
+            elif len(value) != length:
+                msg = (
+                    "All sequences given to bids.many() must have the same length: "
+                    f"got lengths {length} and {len(value)}"
+                )
+                raise ValueError(msg)
+            columns.append(value)
+        else:
+            columns.append(it.repeat(value))
+    return columns, length
+
+
+def _build_many(
+    position: dict[str, int],
+    split: int,
+    dirs: set[str],
+    parse_entities: Callable[[dict[str, str | bool]], dict[str, str]],
+    entities: dict[str, Any],
+    /,
+) -> tuple[list[str], list[str]]:
+    """Build a path for each row of ``entities``.
+
+    Each value of ``entities`` is either a sequence with one item per path, or a
+    single value used for every path. The order of the entities is worked out once
+    for all the paths, which otherwise match those given by :func:`_build_path`.
+
+    Returns the paths along with the entities of the first path not found in the
+    spec.
+    """
+    fixed = [entities.pop(key, None) for key in _NON_ENTITY_ARGS]
+    # Map each tag to the argument holding its values
+    tags = parse_entities(dict(zip(entities, entities)))
+    custom = [tag for tag in tags if tag not in position]
+    layout: list[tuple[str, bool]] = []
+    for tag in sorted(position.keys() & tags.keys(), key=position.__getitem__):
+        if position[tag] > split and custom:
+            layout.extend((tag, True) for tag in custom)
+            custom = []
+        layout.append((tag, False))
+    layout.extend((tag, True) for tag in custom)
+
+    columns, length = _broadcast([*fixed, *(entities[tags[tag]] for tag, _ in layout)])
+    rows = list(it.islice(zip(*columns), 1 if length is None else length))
+    n_fixed = len(fixed)
+    dir_columns = [n_fixed + i for i, (tag, _) in enumerate(layout) if tag in dirs]
+    seps = tuple(filter(None, (os.sep, os.altsep)))
+    if all(isinstance(column, it.repeat) for column in columns[:n_fixed]) and not any(
+        # Joining directories ending in a separator doesn't add another
+        str(row[i]).endswith(seps)
+        for row in rows
+        for i in dir_columns
+    ):
+        # With only the entities varying, most paths can be formatted from a single
+        # template. Rows with empty entities need their own layout.
+        template = _join_row(
+            [(_escape_braces(tag), is_custom) for tag, is_custom in layout],
+            dirs,
+            [_escape_braces(arg) for arg in fixed],
+            [f"{{{i}}}" for i in range(len(layout))],
+        )
+        paths = [
+            template.format(*row[n_fixed:])
+            if "" not in row[n_fixed:]
+            else _join_row(layout, dirs, row[:n_fixed], row[n_fixed:])
+            for row in rows
+        ]
+    else:
+        paths = [_join_row(layout, dirs, row[:n_fixed], row[n_fixed:]) for row in rows]
+
+    custom_parts = [
+        f"{tag}-{value}"
+        for (tag, is_custom), value in zip(
+            layout, rows[0][len(fixed) :] if rows else []
+        )
+        if is_custom
+    ]
+    return paths, custom_parts
+
+
+def _escape_braces(arg: Any) -> Any:
+    if isinstance(arg, (str, Path)):
+        return str(arg).replace("{", "{{").replace("}", "}}")
+    return arg
+
+
+def _join_row(
+    layout: Sequence[tuple[str, bool]],
+    dirs: set[str],
+    fixed: Sequence[Any],
+    values: Sequence[Any],
+) -> str:
+    root, datatype, prefix, suffix, extension = fixed
+    if not (layout or suffix or extension) and (datatype or prefix):
+        raise _missing_name_error(datatype=datatype, prefix=prefix)
+    path_parts: list[str] = [str(root)] if root else []
+    name_parts: list[str] = [prefix] if prefix else []
+    for (tag, is_custom), value in zip(layout, map(str, values)):
+        # Spec entities without a value are left out
+        if is_custom or value:
+            name_parts.append(f"{tag}-{value}")
+            if tag in dirs:
+                path_parts.append(f"{tag}-{value}")
+    if datatype:
+        path_parts.append(datatype)
+    if suffix is not None:
+        name_parts.append(suffix)
+    path_parts.append("_".join(name_parts))
+    path = os.path.join(*path_parts)
+    return path if extension is None else path + extension
+
+
+BIDS_CACHE_SIZE = 4096
+"""Maximum number of paths cached by each function made by :func:`bids_factory`"""
+
+
 def bids_factory(spec: BidsPathSpec, *, _implicit: bool = False) -> BidsFunction:
     """Generate bids functions according to the supplied spec.
 
+    The position of each entity in the spec is computed once, when the function is
+    generated. Paths returned by the function are cached, so repeated calls with the
+    same arguments are nearly free.
+
     Parameters
     ----------
         spec
@@ -118,20 +422,27 @@ def bids_factory(spec: BidsPathSpec, *, _implicit: bool = False) -> BidsFunction
             Flag used internally to mark the default generated bids function. The
             resulting builder will warn when custom entities are used
     """
-    order: list[str] = []
+    position: dict[str, int] = {}
     dirs: set[str] = set()
     aliases: dict[str, str] = {}
 
     subject_dir_default = find_entity(spec, "subject").get("dir", False)
     session_dir_default = find_entity(spec, "session").get("dir", False)
-    for entry in spec:
+    for i, entry in enumerate(spec):
         tag = entry.get("tag", entry["entity"])
-        order.append(tag)
+        position.setdefault(tag, i)
         aliases[entry["entity"]] = tag
         if entry.get("dir"):
             dirs.add(tag)
+    # Custom entities go in place of `*`, or after all the spec entities
+    split = position.pop("*", len(spec))
 
-    parse_entities = _get_entity_parser(aliases)
+    build = ft.partial(_build_path, position, split, dirs, _get_entity_parser(aliases))
+    # Values of different types may be equal but give different paths, e.g. 1 and True
+    cached_build = ft.lru_cache(maxsize=BIDS_CACHE_SIZE, typed=True)(build)
+    build_many = ft.partial(
+        _build_many, position, split, dirs, _get_entity_parser(aliases)
+    )
 
     def bids(
         root: str | Path | None = None,
@@ -170,14 +481,17 @@ def bids_factory(spec: BidsPathSpec, *, _implicit: bool = False) -> BidsFunction
             bids entities as keyword arguments paired with values (e.g. ``space="T1w"``
             for ``space-T1w``)
         """
-        if (
+        sub_dir = entities.pop("include_subject_dir", None)
+        ses_dir = entities.pop("include_session_dir", None)
+        # Only calls with the deprecated arguments need the slower path
+        if (sub_dir is not None or ses_dir is not None) and (
             result := _handle_subses_dir(
                 root,
                 spec=spec,
                 sub_dir_default=subject_dir_default,
                 ses_dir_default=session_dir_default,
-                sub_dir=entities.pop("include_subject_dir", None),
-                ses_dir=entities.pop("include_session_dir", None),
+                sub_dir=sub_dir,
+                ses_dir=ses_dir,
                 datatype=datatype,
                 prefix=prefix,
                 suffix=suffix,
@@ -187,74 +501,71 @@ def bids_factory(spec: BidsPathSpec, *, _implicit: bool = False) -> BidsFunction
         ) is not None:
             return result
 
-        if not any([entities, suffix, extension]) and any([datatype, prefix]):
-            raise ValueError(
-                "At least one of suffix, extension, or an entity must be "
-                "supplied.\n\tGot only: "
-                + " and ".join(
-                    filter(
-                        None,
-                        (
-                            f"datatype='{datatype}'" if datatype else None,
-                            f"prefix='{prefix}'" if prefix else None,
-                        ),
-                    )
-                )
+        try:
+            result, custom_parts = cached_build(
+                root=root,
+                datatype=datatype,
+                prefix=prefix,
+                suffix=suffix,
+                extension=extension,
+                **entities,
             )
-
-        parsed = parse_entities(entities)
-
-        spec_parts: list[str] = []
-        custom_parts: list[str] = []
-        split: int = sys.maxsize + 1
-        path_parts: list[str] = []
-
-        if root:
-            path_parts.append(str(root))
-        if prefix:
-            spec_parts.append(prefix)
-        for entity in order:
-            # Check for `*` first so that if user specifies an entity called `*` we
-            # don't skip setting the split
-            if entity == "*":
-                split = len(spec_parts)
-            elif value := parsed.pop(entity, None):
-                spec_parts.append(f"{entity}-{value}")
-                if entity in dirs:
-                    path_parts.append(f"{entity}-{value}")
-        for key, value in parsed.items():
-            custom_parts.append(f"{key}-{value}")
-
-        if datatype:
-            path_parts.append(datatype)
-        tail = [suffix] if suffix is not None else []
-        path_parts.append(
-            "_".join(
-                it.chain(
-                    spec_parts[:split],
-                    custom_parts,
-                    spec_parts[split:],
-                    tail,
-                )
+        except TypeError:
+            # Unhashable arguments
+            result, custom_parts = build(
+                root=root,
+                datatype=datatype,
+                prefix=prefix,
+                suffix=suffix,
+                extension=extension,
+                **entities,
             )
-        )
-        result = os.path.join(*path_parts)
-        if extension is not None:
-            result += extension
 
         if custom_parts and _implicit and not in_interactive_session():
-            wrn_msg = (
-                f"Path generated with unrecognized entities, and a snakebids spec has "
-                "not been explicitly declared. This could break in future snakebids "
-                "versions, as the default spec can be changed without warning.\n"
-                f"\tpath = {result!r}\n"
-                f"\tentities = {custom_parts!r}\n\n"
-                "Please declare a spec using:\n"
-                "\tfrom snakebids import set_bids_spec\n"
-                f'\tset_bids_spec("{specs.LATEST}")\n'
-            ).expandtabs(4)
-            warnings.warn(wrn_msg, stacklevel=3)
+            _warn_implicit_spec(result, custom_parts, stacklevel=4)
 
         return result
 
-    return bids
+    def many(
+        zip_lists: Mapping[str, Sequence[str]] | BidsPartialComponent | None = None,
+        /,
+        root: str | Path | None = None,
+        *,
+        datatype: str | Sequence[str] | None = None,
+        prefix: str | Sequence[str] | None = None,
+        suffix: str | Sequence[str] | None = None,
+        extension: str | Sequence[str] | None = None,
+        **entities: str | bool | Sequence[str],
+    ) -> list[str]:
+        args: dict[str, Any] = dict(getattr(zip_lists, "zip_lists", zip_lists) or {})
+        for key, value in zip(
+            _NON_ENTITY_ARGS, (root, datatype, prefix, suffix, extension)
+        ):
+            if value is not None:
+                args[key] = value
+        args.update(entities)
+        if {"include_subject_dir", "include_session_dir"} & args.keys():
+            msg = (
+                "include_subject_dir and include_session_dir are not supported by "
+                "bids.many(). Use bids_factory() with a spec without directories "
+                "instead"
+            )
+            raise ValueError(msg)
+
+        paths, custom_parts = build_many(args)
+        if custom_parts and _implicit and not in_interactive_session():
+            _warn_implicit_spec(paths[0], custom_parts, stacklevel=4)
+        return paths
+
+    parse = parser_factory(spec)
+
+    def parse_many(paths: Iterable[str], /) -> list[dict[str, str] | None]:
+        return list(map(parse, paths))
+
+    many.__doc__ = BidsFunction.many.__doc__
+    parse.__doc__ = BidsFunction.parse.__doc__
+    parse_many.__doc__ = BidsFunction.parse_many.__doc__
+    bids.many = many  # type: ignore
+    bids.parse = parse  # type: ignore
+    bids.parse_many = parse_many  # type: ignore
+    return bids  # type: ignore
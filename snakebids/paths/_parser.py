@@ -0,0 +1,79 @@
+"""Parsing of paths made by bids functions back into their entities."""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Callable
+
+from snakebids.paths._utils import BidsPathSpec
+
+
+def _compile_spec(spec: BidsPathSpec) -> tuple[re.Pattern[str], dict[str, str]]:
+    """Compile a regex matching the entities of a filename, ordered by ``spec``.
+
+    The regex is matched against the entity parts of the filename, each followed by an
+    underscore. Returns the regex along with the entity name captured by each group.
+    """
+    groups: dict[str, str] = {}
+    parts: list[str] = []
+    seen: set[str] = set()
+    tags = [entry.get("tag", entry["entity"]) for entry in spec]
+    # Unrecognized entities never share a tag with the spec
+    custom = rf"(?P<custom>(?:(?!(?:{'|'.join(map(re.escape, tags))})-)[^_-]+-[^_]*_)*)"
+    for entry, tag in zip(spec, tags):
+        # Only the first position of a repeated tag is used
+        if tag in seen:
+            continue
+        seen.add(tag)
+        if tag == "*":
+            parts.append(custom)
+        else:
+            group = f"e{len(groups)}"
+            groups[group] = entry["entity"]
+            parts.append(rf"(?:{re.escape(tag)}-(?P<{group}>[^_]+)_)?")
+    if "*" not in tags:
+        parts.append(custom)
+    return re.compile("".join(parts)), groups
+
+
+def parser_factory(spec: BidsPathSpec) -> Callable[[str], dict[str, str] | None]:
+    """Generate a function parsing the filenames of paths built according to a spec.
+
+    See :meth:`BidsFunction.parse() <snakebids.BidsFunction.parse>`.
+    """
+    pattern, groups = _compile_spec(spec)
+    match = pattern.fullmatch
+    group_names = list(groups.items())
+
+    def parse(path: str) -> dict[str, str] | None:
+        name = os.path.basename(path)
+        stem, _, last = name.rpartition("_")
+        base, dot, extension = last.partition(".")
+        if "-" in base:
+            stem = f"{stem}_{base}_" if stem else f"{base}_"
+            suffix = None
+        elif not (stem or base or dot):
+            # Paths need at least one entity, a suffix, or an extension
+            return None
+        else:
+            stem = f"{stem}_" if stem else ""
+            suffix = base
+
+        if (parsed := match(stem)) is None:
+            return None
+        result = {
+            entity: value
+            for group, entity in group_names
+            if (value := parsed[group]) is not None
+        }
+        for part in parsed["custom"].split("_")[:-1]:
+            tag, _, value = part.partition("-")
+            result[tag] = value
+        if suffix is not None:
+            result["suffix"] = suffix
+        if dot:
+            result["extension"] = dot + extension
+        return result
+
+    return parse
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
 
 from snakebids.paths._config import get_bids_func
+from snakebids.paths._factory import BidsFunction
 from snakebids.paths.specs import LATEST
 
+if TYPE_CHECKING:
+    from snakebids.core.datasets import BidsPartialComponent
+
 
 def bids(
     root: str | Path | None = None,
@@ -27,6 +32,11 @@ def bids(
     Datatype and prefix may not be used in isolation, but must be given with
     another entity.
 
+    Paths for every entry of a component, or for any other set of entity columns, can
+    be built in a single call with ``bids.many()``. See
+    :meth:`BidsFunction.many() <snakebids.BidsFunction.many>`. Paths can be parsed
+    back into their entities with ``bids.parse()`` and ``bids.parse_many()``.
+
     BIDS paths are built based on specs, which are versioned for long-term stability.
     The latest version is ``<version>``. Information on its spec can be found at
     :func:`~snakebids.paths.specs.<version>`.
@@ -127,5 +137,42 @@ def bids(
     )
 
 
+def _many(
+    zip_lists: Mapping[str, Sequence[str]] | BidsPartialComponent | None = None,
+    /,
+    root: str | Path | None = None,
+    *,
+    datatype: str | Sequence[str] | None = None,
+    prefix: str | Sequence[str] | None = None,
+    suffix: str | Sequence[str] | None = None,
+    extension: str | Sequence[str] | None = None,
+    **entities: str | bool | Sequence[str],
+) -> list[str]:
+    return get_bids_func().many(
+        zip_lists,
+        root,
+        datatype=datatype,
+        prefix=prefix,
+        suffix=suffix,
+        extension=extension,
+        **entities,
+    )
+
+
+def _parse(path: str, /) -> dict[str, str] | None:
+    return get_bids_func().parse(path)
+
+
+def _parse_many(paths: Iterable[str], /) -> list[dict[str, str] | None]:
+    return get_bids_func().parse_many(paths)
+
+
+_many.__doc__ = BidsFunction.many.__doc__
+_parse.__doc__ = BidsFunction.parse.__doc__
+_parse_many.__doc__ = BidsFunction.parse_many.__doc__
+bids.many = _many  # type: ignore
+bids.parse = _parse  # type: ignore
+bids.parse_many = _parse_many  # type: ignore
+
 assert bids.__doc__  # noqa: S101
 bids.__doc__ = bids.__doc__.replace("<version>", LATEST)
@@ -17,6 +17,18 @@ def _list_or_none(arg: str | Iterable[str] | None) -> list[str] | None:
     return arg if arg is None else list(itx.always_iterable(arg))
 
 
+def _read_labels(path: Path) -> list[str]:
+    """Read whitespace separated labels from a file, ignoring ``#`` comments."""
+    try:
+        text = path.read_text()
+    except OSError as err:
+        msg = f"Could not read participant labels from {path}: {err}"
+        raise ConfigError(msg) from err
+    return [
+        label for line in text.splitlines() for label in line.split("#", 1)[0].split()
+    ]
+
+
 class _Derivative(argparse.Action):
     def __call__(
         self,
@@ -60,8 +72,8 @@ class BidsArgs(PluginBase):
         Indicate if ``participant_label`` should be defined. Used to filter specific
         subjects for processesing
     exclude_participant_label
-        Indicate if ``exclude_participant_label`` should be defined. Used to excluded
-        specific subjects from processesing
+        Indicate if ``exclude_participant_label`` and ``exclude_participant_label_file``
+        should be defined. Used to excluded specific subjects from processesing
     derivatives
         Indicate if ``derivatives`` should be defined. Used to allow automatic
         derivative indexing or specify paths to derivatives.
@@ -80,6 +92,9 @@ class BidsArgs(PluginBase):
     - ``participant_label``: Collection of subject labels to include in analysis
     - ``exclude_participant_label``: Collection of subject labels to exclude from
       analysis
+    - ``exclude_participant_label_file``: Path to a file listing subject labels to
+      exclude from analysis. Labels in the file are added to
+      ``exclude_participant_label``
     - ``derivatives``: Collection of derivative folder paths to include in bids
       indexing.
 
@@ -197,6 +212,19 @@ class BidsArgs(PluginBase):
                 dest="exclude_participant_label",
                 nargs="+",
             )
+            self.try_add_argument(
+                group,
+                "--exclude-participant-label-file",
+                "--exclude_participant_label_file",
+                help="Path to a file listing the label(s) of participant(s) that "
+                "should be excluded, separated by whitespace. Text following a '#' "
+                "is ignored. Labels are combined with any given to "
+                "--exclude-participant-label. Useful for excluding too many "
+                "participants to list on the command line.",
+                metavar="FILE",
+                dest="exclude_participant_label_file",
+                type=Path,
+            )
         if self.derivatives:
             self.try_add_argument(
                 group,
@@ -209,3 +237,15 @@ class BidsArgs(PluginBase):
                 action=_Derivative,
                 default=False,
             )
+
+    @bidsapp.hookimpl
+    def update_cli_namespace(self, namespace: dict[str, Any], config: dict[str, Any]):
+        """Add labels from ``--exclude-participant-label-file`` to the exclusions."""
+        path: Path | None = self.pop(namespace, "exclude_participant_label_file", None)
+        if path is None:
+            return
+        labels = _read_labels(path)
+        namespace["exclude_participant_label"] = [
+            *(namespace.get("exclude_participant_label") or []),
+            *labels,
+        ]
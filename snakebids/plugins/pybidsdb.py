@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 
 @attrs.define
 class Pybidsdb(PluginBase):
-    """Add CLI parameters to specify and reset a pybids database.
+    """Add CLI parameters to configure indexing, including a pybids database.
 
     Parameters
     ----------
@@ -27,18 +27,21 @@ class Pybidsdb(PluginBase):
 
     CLI Arguments
     ~~~~~~~~~~~~~
-    Two arguments are added to the CLI. These can be overridden by adding arguments
+    Three arguments are added to the CLI. These can be overridden by adding arguments
     with corresponding ``dests`` before this plugin is run:
 
     - ``plugins.pybidsdb.dir``: (:class:`~pathlib.Path`) Path of the database
     - ``plugins.pybidsdb.reset``: (:class:`bool`) Boolean indicating the database should
       be reset.
+    - ``plugins.pybidsdb.index_workers``: (:class:`int`) Number of threads used to list
+      directories while indexing.
 
     After parsing, the above dests will be moved into ``config`` under the following
     names:
 
     - ``plugins.pybidsdb.dir`` → ``pybidsdb_dir``
     - ``plugins.pybidsdb.reset`` → ``pybidsdb_reset``
+    - ``plugins.pybidsdb.index_workers`` → ``index_workers``
 
     This plugin only handles the CLI arguments, it does not do any actions with the
     database. The above config entries can be consumed by downstream processes.
@@ -72,7 +75,9 @@ class Pybidsdb(PluginBase):
             help=(
                 "Optional path to directory of SQLite databasefile for PyBIDS. "
                 "If directory is passed and folder exists, indexing is skipped. "
-                "If pybidsdb_reset is called, indexing will persist"
+                "If pybidsdb_reset is called, indexing will persist. With the native "
+                "indexing engine, a snakebids index is saved here instead, and only "
+                "directories modified since the last run are re-indexed"
             ),
         )
 
@@ -82,7 +87,22 @@ class Pybidsdb(PluginBase):
             "--pybidsdb_reset",
             action="store_true",
             dest="reset",
-            help="Reindex existing PyBIDS SQLite database",
+            help="Reindex existing PyBIDS SQLite database (or snakebids index)",
+        )
+
+        self.try_add_argument(
+            group,
+            "--index-workers",
+            "--index_workers",
+            action="store",
+            type=int,
+            dest="index_workers",
+            metavar="N",
+            help=(
+                "Number of threads used to list directories when indexing the dataset "
+                "with the native engine or globbing custom paths. Speeds up indexing "
+                "on network filesystems. Has no effect on indexing with PyBIDS"
+            ),
         )
 
         # To be deprecated
@@ -107,6 +127,7 @@ class Pybidsdb(PluginBase):
                 "reset the pybids database, use the new --pybidsdb-reset flag instead."
             )
         config["pybidsdb_reset"] = reset or reset_db
+        config["index_workers"] = self.pop(namespace, "index_workers", None)
         pybidsdb_dir = self.pop(namespace, "dir")
 
         config["pybidsdb_dir"] = (
@@ -3,6 +3,8 @@ from __future__ import annotations
 import argparse
 import importlib.metadata as impm
 import logging
+import os
+import shutil
 import sys
 from pathlib import Path
 from typing import Any, Callable, Sequence, TypeVar
@@ -12,6 +14,7 @@ import more_itertools as itx
 from typing_extensions import overload, override
 
 from snakebids import bidsapp
+from snakebids.core._snapshot import SNAPSHOT_DIR_ENV
 from snakebids.exceptions import ConfigError, RunError
 from snakebids.io.config import write_config
 from snakebids.plugins.bidsargs import BidsArgs
@@ -327,21 +330,37 @@ class SnakemakeBidsApp:
 
     @bidsapp.hookimpl
     def run(self, config: dict[str, Any]):
-        """Run snakemake with the given config, after applying plugins."""
-        snakemake_main(  # type: ignore
-            [
-                *filter(
-                    None,
-                    [
-                        *itx.always_iterable(config["snakemake_target"]),
-                        "--snakefile",
-                        str(self.snakefile_path),
-                        "--directory",
-                        str(self.cwd),
-                        "--configfile",
-                        str(self.configfile_outpath),
-                        *config["snakemake_args"],
-                    ],
-                )
-            ]
-        )
+        """Run snakemake with the given config, after applying plugins.
+
+        While snakemake runs, :func:`~snakebids.generate_inputs` saves datasets
+        without a :attr:`~snakebids.BidsDataset.layout` to a snapshot directory that
+        is cleared at the start of each run. Jobs evaluating the Snakefile in
+        subprocesses load the snapshot rather than indexing the dataset again.
+        """
+        snapshot_dir = self.cwd / ".snakemake" / "snakebids" / "snapshots"
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        previous = os.environ.get(SNAPSHOT_DIR_ENV)
+        os.environ[SNAPSHOT_DIR_ENV] = str(snapshot_dir.resolve())
+        try:
+            snakemake_main(  # type: ignore
+                [
+                    *filter(
+                        None,
+                        [
+                            *itx.always_iterable(config["snakemake_target"]),
+                            "--snakefile",
+                            str(self.snakefile_path),
+                            "--directory",
+                            str(self.cwd),
+                            "--configfile",
+                            str(self.configfile_outpath),
+                            *config["snakemake_args"],
+                        ],
+                    )
+                ]
+            )
+        finally:
+            if previous is None:
+                del os.environ[SNAPSHOT_DIR_ENV]
+            else:
+                os.environ[SNAPSHOT_DIR_ENV] = previous
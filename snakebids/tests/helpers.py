@@ -14,6 +14,7 @@ from typing import (
     Dict,
     Iterable,
     List,
+    Literal,
     Mapping,
     Protocol,
     Sequence,
@@ -218,6 +219,7 @@ def reindex_dataset(
     use_custom_paths: bool = False,
     participant_label: str | Sequence[str] | None = None,
     exclude_participant_label: str | Sequence[str] | None = None,
+    engine: Literal["pybids", "native"] = "pybids",
 ) -> BidsDataset:
     """Create BidsDataset on the filesystem and reindex
 
@@ -238,6 +240,7 @@ def reindex_dataset(
         config,
         participant_label=participant_label,
         exclude_participant_label=exclude_participant_label,
+        engine=engine,
     )
 
 
@@ -1,24 +1,31 @@
 from __future__ import annotations
 
+import contextlib
 import copy
 import itertools as it
+import json
 import re
 import string
 import warnings
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
+from unittest import mock
 
+import attr
 import more_itertools as itx
 import pytest
 from hypothesis import assume, given
 from hypothesis import strategies as st
 
+from snakebids.core import datasets
+from snakebids.core._expansion import LazyExpansion, expand_zip_lists
 from snakebids.core.datasets import (
     BidsComponent,
     BidsComponentRow,
     BidsDataset,
     BidsPartialComponent,
 )
+from snakebids.core.filtering import filter_list
 from snakebids.exceptions import DuplicateComponentError
 from snakebids.paths._presets import bids
 from snakebids.snakemake_compat import WildcardError
@@ -26,6 +33,7 @@ from snakebids.tests import strategies as sb_st
 from snakebids.tests.helpers import expand_zip_list, get_bids_path, get_zip_list, setify
 from snakebids.types import Expandable, ZipList
 from snakebids.utils import sb_itertools as sb_it
+from snakebids.utils.containers import CategoricalList, ColumnView
 from snakebids.utils.snakemake_io import glob_wildcards
 from snakebids.utils.utils import BidsEntity, get_wildcard_dict, zip_list_eq
 
@@ -139,6 +147,38 @@ class TestBidsComponentEq:
             cp.zip_lists[list_].reverse()
         assert cp == comp
 
+    @given(sb_st.bids_components())
+    def test_equal_components_have_equal_hashes(self, comp: BidsComponent):
+        cp = copy.deepcopy(comp)
+        for list_ in cp.zip_lists:
+            cp.zip_lists[list_].reverse()
+        reordered = BidsComponent(
+            name=comp.name,
+            path=comp.path,
+            zip_lists=dict(reversed(list(cp.zip_lists.items()))),
+        )
+        assert reordered == comp
+        assert hash(reordered) == hash(comp)
+        assert hash(comp.compact()) == hash(comp)
+        assert len({comp, reordered, comp.compact()}) == 1
+
+    def test_number_of_duplicate_rows_affects_equality(self):
+        comp1 = BidsPartialComponent(zip_lists={"subject": ["01", "01", "02"]})
+        comp2 = BidsPartialComponent(zip_lists={"subject": ["01", "02", "02"]})
+        assert comp1 != comp2
+        assert comp1._get_fingerprint() != comp2._get_fingerprint()
+
+    def test_fingerprint_is_cached(self):
+        comp = BidsPartialComponent(zip_lists={"subject": ["01", "02"]})
+        assert comp._fingerprint is None
+        assert comp == BidsPartialComponent(zip_lists={"subject": ["02", "01"]})
+        fingerprint = comp._fingerprint
+        assert fingerprint is not None
+        with mock.patch.object(
+            datasets, "zip_list_fingerprint", side_effect=AssertionError
+        ):
+            assert hash(comp) == fingerprint
+
     @given(sb_st.bids_components())
     def test_paths_must_be_identical(self, comp: BidsComponent):
         cp = BidsComponent(
@@ -149,6 +189,44 @@ class TestBidsComponentEq:
         assert cp != comp
 
 
+class TestBidsComponentCompact:
+    @given(sb_st.bids_components())
+    def test_compact_component_equals_original(self, comp: BidsComponent):
+        compact = comp.compact()
+        assert compact == comp
+        assert comp == compact
+        assert compact.zip_lists == comp.zip_lists
+        assert all(
+            isinstance(val, CategoricalList) for val in compact.zip_lists.values()
+        )
+
+    @given(sb_st.bids_components())
+    def test_compact_components_compare_equal(self, comp: BidsComponent):
+        cp = copy.deepcopy(comp)
+        for list_ in cp.zip_lists:
+            cp.zip_lists[list_].reverse()
+        assert cp.compact() == comp.compact()
+
+    @given(sb_st.bids_components(), st.data())
+    def test_filter_matches_original_and_stays_compact(
+        self, comp: BidsComponent, data: st.DataObject
+    ):
+        entity = data.draw(st.sampled_from(list(comp.zip_lists)))
+        values = data.draw(st.lists(st.sampled_from(comp.zip_lists[entity])))
+        filtered = comp.compact().filter(**{entity: values})
+        assert filtered == comp.filter(**{entity: values})
+        assert all(
+            isinstance(val, CategoricalList) for val in filtered.zip_lists.values()
+        )
+
+    @given(sb_st.bids_components())
+    def test_properties_match_original(self, comp: BidsComponent):
+        compact = comp.compact()
+        assert setify(compact.entities) == setify(comp.entities)
+        assert compact.wildcards == comp.wildcards
+        assert compact.expand() == comp.expand()
+
+
 class TestBidsComponentProperties:
     @given(st.data(), st.integers(min_value=1, max_value=2))
     def test_input_lists_derives_from_zip_lists(
@@ -237,6 +315,74 @@ class TestBidsDatasetLegacyAccess:
         assert isinstance(dataset[name], BidsComponent)
 
 
+class TestWildcardConstraints:
+    @given(dataset=sb_st.datasets())
+    def test_constraints_match_every_value_in_dataset(self, dataset: BidsDataset):
+        constraints = dataset.wildcard_constraints()
+        for component in dataset.values():
+            for entity, values in component.zip_lists.items():
+                regex = re.compile(constraints[entity])
+                assert all(regex.fullmatch(value) for value in values)
+
+    @given(dataset=sb_st.datasets(), value=st.text())
+    def test_constraints_only_match_values_in_dataset(
+        self, dataset: BidsDataset, value: str
+    ):
+        for entity, constraint in dataset.wildcard_constraints().items():
+            found = {
+                val
+                for component in dataset.values()
+                for val in component.zip_lists.get(entity, [])
+            }
+            if found:
+                assert bool(re.fullmatch(constraint, value)) == (value in found)
+
+    def test_selected_entities_are_constrained(self):
+        dataset = BidsDataset.from_iterable(
+            [
+                BidsComponent(
+                    name="t1",
+                    path="sub-{subject}_run-{run}_T1w.nii.gz",
+                    zip_lists={"subject": ["001", "002"], "run": ["1", "2"]},
+                ),
+                BidsComponent(
+                    name="bold",
+                    path="sub-{subject}_bold.nii.gz",
+                    zip_lists={"subject": ["003"]},
+                ),
+            ]
+        )
+        assert dataset.wildcard_constraints("subject", "session") == {
+            "subject": "00[1-3]"
+        }
+
+    def test_long_constraints_fall_back_to_default(self):
+        dataset = BidsDataset.from_iterable(
+            [
+                BidsComponent(
+                    name="t1",
+                    path="sub-{subject}_T1w.nii.gz",
+                    zip_lists={"subject": [f"{i:04}" for i in range(0, 1000, 7)]},
+                )
+            ]
+        )
+        assert dataset.wildcard_constraints(max_length=20, default=".+") == {
+            "subject": ".+"
+        }
+
+    def test_entities_without_values_get_default(self):
+        dataset = BidsDataset.from_iterable(
+            [
+                BidsComponent(
+                    name="t1",
+                    path="sub-{subject}_T1w.nii.gz",
+                    zip_lists={"subject": ["001"]},
+                ).filter(subject=[])
+            ]
+        )
+        assert dataset.wildcard_constraints(default=".+") == {"subject": ".+"}
+
+
 def _get_novel_path(prefix: str, component: Expandable):
     # use the "comp-" prefix to give a constant part to the novel template,
     # otherwise the trivial template "{foo}" globs everything
@@ -387,6 +533,264 @@ class TestBidsComponentExpand:
         assert not glob_wildcards(component.path, paths)
 
 
+class TestCompiledExpansion:
+    """The compiled expander gives the same output as snakemake's expand."""
+
+    @staticmethod
+    def _expand(
+        component: BidsPartialComponent, compiled: bool, *args: Any, **kwargs: Any
+    ) -> list[str] | type[Exception]:
+        with contextlib.ExitStack() as stack:
+            if not compiled:
+                stack.enter_context(
+                    mock.patch.object(datasets, "expand_zip_lists", return_value=None)
+                )
+            try:
+                # Expand a fresh copy so results are not taken from the cache
+                return attr.evolve(component).expand(*args, **kwargs)
+            except Exception as err:  # noqa: BLE001
+                return type(err)
+
+    @given(
+        component=sb_st.bids_components(min_values=2, max_values=4),
+        data=st.data(),
+        allow_missing=st.booleans(),
+    )
+    def test_matches_snakemake_expand(
+        self, component: BidsComponent, data: st.DataObject, allow_missing: bool
+    ):
+        entities = list(component.zip_lists)
+        extras = data.draw(
+            st.dictionaries(
+                st.sampled_from(["foo", "bar", entities[0]]),
+                st.lists(sb_st.bids_value(), max_size=3, unique=True),
+                max_size=2,
+            )
+        )
+        fields = st.sampled_from([*entities, "foo", "bar", "missing"])
+        paths = data.draw(
+            st.lists(
+                st.lists(
+                    st.one_of(fields.map(lambda f: f"{{{f}}}"), st.sampled_from("_/-")),
+                    max_size=6,
+                ).map("".join),
+                min_size=1,
+                max_size=3,
+            )
+        )
+        assert self._expand(
+            component, True, paths, allow_missing=allow_missing, **extras
+        ) == self._expand(
+            component, False, paths, allow_missing=allow_missing, **extras
+        )
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "{{escaped}}_{subject}",
+            "{subject!r}",
+            "{subject:>4}",
+            "{subject.upper}",
+            "{0}_{subject}",
+        ],
+    )
+    def test_unsupported_templates_fall_back_to_snakemake(self, path: str):
+        component = BidsComponent(
+            name="comp", path="sub-{subject}", zip_lists={"subject": ["01", "02"]}
+        )
+        assert (
+            expand_zip_lists(
+                [path], component.zip_lists, allow_missing=True, wildcards={}
+            )
+            is None
+        )
+        assert self._expand(component, True, path, allow_missing=True) == self._expand(
+            component, False, path, allow_missing=True
+        )
+
+    def test_values_with_braces_fall_back_when_expanding_extra_wildcards(self):
+        zip_lists = {"subject": ["{run}"]}
+        assert (
+            expand_zip_lists(
+                ["{subject}"], zip_lists, allow_missing=False, wildcards={"run": ["1"]}
+            )
+            is None
+        )
+        assert expand_zip_lists(
+            ["{subject}"], zip_lists, allow_missing=False, wildcards={}
+        ) == ["{run}"]
+
+
+class TestExpandCache:
+    @pytest.fixture
+    def component(self):
+        return BidsComponent(
+            name="comp",
+            path="sub-{subject}_run-{run}",
+            zip_lists={"subject": ["01", "01", "02"], "run": ["1", "2", "1"]},
+        )
+
+    def test_repeated_expansion_returns_cached_result(self, component: BidsComponent):
+        first = component.expand("{subject}_{foo}", foo=["a", "b"])
+        second = component.expand(["{subject}_{foo}"], foo=("a", "b"))
+        assert first == second == ["01_a", "01_b", "02_a", "02_b"]
+        assert component.expand_cache_info() == (1, 1, 128, 1)
+
+    def test_different_arguments_are_cached_separately(self, component: BidsComponent):
+        assert component.expand() != component.expand("{subject}")
+        assert component.expand("{subject}", allow_missing=True) == component.expand(
+            "{subject}", allow_missing="foo"
+        )
+        assert component.expand("{subject}_{foo}", foo=1) != component.expand(
+            "{subject}_{foo}", foo=True
+        )
+        assert component.expand_cache_info().hits == 0
+
+    def test_modifying_result_does_not_change_cache(self, component: BidsComponent):
+        result = component.expand()
+        assert type(result) is list
+        result += component.expand("{subject}")
+        result.append("foo")
+        assert component.expand() == [
+            "sub-01_run-1",
+            "sub-01_run-2",
+            "sub-02_run-1",
+        ]
+
+    def test_least_recently_used_result_is_evicted(
+        self, component: BidsComponent, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(BidsComponent, "expand_cache_size", 2)
+        component.expand("{subject}")
+        component.expand("{run}")
+        component.expand("{subject}")
+        component.expand("{subject}{run}")
+        component.expand("{subject}")
+        assert component.expand_cache_info() == (2, 3, 2, 2)
+        component.expand("{run}")
+        assert component.expand_cache_info() == (2, 4, 2, 2)
+
+    def test_results_evicted_to_bound_cached_paths(
+        self, component: BidsComponent, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(BidsComponent, "expand_cache_max_paths", 4)
+        component.expand()
+        component.expand("{subject}")
+        assert component.expand_cache_info().currsize == 1
+        component.expand("{subject}")
+        component.expand()
+        assert component.expand_cache_info() == (1, 3, 128, 1)
+
+    def test_results_with_too_many_paths_are_not_cached(
+        self, component: BidsComponent, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(BidsComponent, "expand_cache_max_paths", 2)
+        assert component.expand() == component.expand()
+        assert component.expand_cache_info() == (0, 2, 128, 0)
+
+    def test_derived_components_have_own_cache(self, component: BidsComponent):
+        component.expand()
+        filtered = component.filter(subject="01")
+        assert filtered.expand() == ["sub-01_run-1", "sub-01_run-2"]
+        assert filtered.expand_cache_info() == (0, 1, 128, 1)
+
+    def test_uncacheable_values_are_not_cached(self, component: BidsComponent):
+        component.expand("{subject}_{foo}", foo=[Path("a")])
+        assert component.expand_cache_info() == (0, 0, 128, 0)
+
+
+class TestLazyExpansion:
+    @given(
+        component=sb_st.bids_components(max_values=3),
+        foo=st.lists(sb_st.bids_value(), max_size=3, unique=True),
+    )
+    def test_matches_expand(self, component: BidsComponent, foo: list[str]):
+        # Values with braces cannot be expanded over extra wildcards
+        assume(
+            not any(
+                "{" in v or "}" in v for val in component.entities.values() for v in val
+            )
+        )
+        # Neither can paths with escaped braces, even with snakemake's expand
+        assume("{{" not in component.path and "}}" not in component.path)
+        path = component.path + "_{foo}"
+        lazy = component.expand(path, foo=foo, lazy=True)
+        expanded = component.expand(path, foo=foo)
+        assert lazy == expanded
+        assert len(lazy) == len(expanded)
+        assert [lazy[i] for i in range(len(lazy))] == expanded
+        assert [lazy[-i] for i in range(1, len(lazy) + 1)] == expanded[::-1]
+        assert lazy[1::2] == expanded[1::2]
+
+    @given(component=sb_st.bids_components(max_values=3))
+    def test_matches_expand_over_several_templates(self, component: BidsComponent):
+        paths = [component.path, *(f"{{{entity}}}" for entity in component.zip_lists)]
+        assert component.expand(paths, lazy=True) == component.expand(paths)
+
+    def test_duplicates_across_templates_are_removed(self):
+        component = BidsComponent(
+            name="comp",
+            path="sub-{subject}_run-{run}",
+            zip_lists={"subject": ["1", "2", "3"], "run": ["1", "2", "1"]},
+        )
+        lazy = component.expand(["{subject}", "{run}"], lazy=True)
+        assert list(lazy) == ["1", "2", "3"]
+        assert len(lazy) == len(component.expand(["{subject}", "{run}"]))
+
+    def test_distinct_values_formatting_into_same_path_are_removed(self):
+        component = BidsComponent(
+            name="comp",
+            path="{subject}{run}",
+            zip_lists={"subject": ["0", "01"], "run": ["12", "2"]},
+        )
+        lazy = component.expand(lazy=True)
+        assert lazy == component.expand() == ["012"]
+
+    def test_templates_with_distinct_suffixes_are_not_formatted(self):
+        component = BidsComponent(
+            name="comp", path="sub-{subject}", zip_lists={"subject": ["01", "02"]}
+        )
+        paths = ["sub-{subject}_T1w", "sub-{subject}_bold"]
+        lazy = component.expand(paths, lazy=True)
+        assert len(lazy._segments) == len(paths)
+        assert lazy == ["sub-01_T1w", "sub-02_T1w", "sub-01_bold", "sub-02_bold"]
+
+    def test_unsupported_templates_are_expanded_eagerly(self):
+        component = BidsComponent(
+            name="comp", path="sub-{subject}", zip_lists={"subject": ["01", "02"]}
+        )
+        lazy = component.expand("{subject!r}", lazy=True)
+        assert isinstance(lazy, LazyExpansion)
+        assert lazy == component.expand("{subject!r}")
+
+    def test_missing_wildcards_raise_immediately(self):
+        component = BidsComponent(
+            name="comp", path="sub-{subject}", zip_lists={"subject": ["01", "02"]}
+        )
+        with pytest.raises(WildcardError):
+            component.expand("{subject}{foo}", lazy=True)
+
+    def test_index_out_of_range(self):
+        component = BidsComponent(
+            name="comp", path="sub-{subject}", zip_lists={"subject": ["01", "02"]}
+        )
+        lazy = component.expand(lazy=True)
+        with pytest.raises(IndexError):
+            lazy[2]
+        with pytest.raises(IndexError):
+            lazy[-3]
+
+    def test_write_streams_paths_to_file(self, tmp_path: Path):
+        component = BidsComponent(
+            name="comp",
+            path="sub-{subject}_run-{run}",
+            zip_lists={"subject": ["01", "01", "02"], "run": ["1", "2", "1"]},
+        )
+        lazy = component.expand(lazy=True)
+        assert lazy.write(tmp_path / "targets.txt") == len(lazy)
+        assert (tmp_path / "targets.txt").read_text().splitlines() == list(lazy)
+
+
 class TestFiltering:
     def get_filter_dict(
         self,
@@ -519,6 +923,181 @@ class TestFiltering:
             if should_be_present:
                 assert col in result
 
+    @given(
+        component=sb_st.bids_components(max_values=4, restrict_patterns=True),
+        data=st.data(),
+    )
+    def test_filter_gives_same_rows_as_filter_list(
+        self, component: BidsComponent, data: st.DataObject
+    ):
+        filter_dict = self.get_filter_dict(data, component, allow_extra_filters=True)
+        filtered = component.filter(**filter_dict)
+        assert filtered.zip_lists == filter_list(component.zip_lists, filter_dict)
+
+    @given(component=sb_st.bids_components(max_values=4), data=st.data())
+    def test_row_index_built_once(self, component: BidsComponent, data: st.DataObject):
+        assert component._row_index is None
+        entity = data.draw(st.sampled_from(list(component.zip_lists)))
+        component.filter(**{entity: component.zip_lists[entity][0]})
+        index = component._row_index
+        assert index is not None
+        filtered = component.filter(**{entity: component.zip_lists[entity][-1]})
+        assert component._row_index is index
+        assert filtered._row_index is None
+
+    @given(component=sb_st.bids_components(max_values=4), data=st.data())
+    def test_chained_filters_are_views_of_original(
+        self, component: BidsComponent, data: st.DataObject
+    ):
+        first = self.get_filter_dict(data, component)
+        second = self.get_filter_dict(data, component)
+        assume(first or second)
+        filtered = component.filter(**first).filter(**second)
+        for entity, values in filtered._zip_lists.items():
+            assert isinstance(values, ColumnView)
+            assert values.source is component.zip_lists[entity]
+        assert filtered == BidsComponent(
+            name=component.name,
+            path=component.path,
+            zip_lists=filter_list(filter_list(component.zip_lists, first), second),
+        )
+
+    def test_filtered_zip_lists_are_lists(self):
+        component = BidsComponent(
+            name="comp",
+            path="sub-{subject}_ses-{session}",
+            zip_lists={"subject": ["01", "01", "02"], "session": ["1", "2", "1"]},
+        )
+        filtered = component.filter(subject="01")
+        assert filtered.expand() == ["sub-01_ses-1", "sub-01_ses-2"]
+        assert json.loads(json.dumps(filtered.zip_lists)) == {
+            "subject": ["01", "01"],
+            "session": ["1", "2"],
+        }
+        assert filtered.zip_lists["subject"] + ["03"] == ["01", "01", "03"]
+        dataset = BidsDataset.from_iterable([filtered])
+        assert all(
+            type(values) is list
+            for zip_lists in dataset.as_dict["input_zip_lists"].values()
+            for values in zip_lists.values()
+        )
+
+    def test_filtered_components_are_not_revalidated(self):
+        component = BidsComponent(
+            name="comp", path="sub-{subject}", zip_lists={"subject": ["01", "02"]}
+        )
+        with mock.patch.object(
+            BidsComponent, "__init__", side_effect=AssertionError
+        ) as init:
+            filtered = component.filter(subject="02")
+        init.assert_not_called()
+        assert filtered.expand() == ["sub-02"]
+
+
+class TestGroupby:
+    @given(component=sb_st.bids_components(max_values=4), data=st.data())
+    def test_groups_match_filter(self, component: BidsComponent, data: st.DataObject):
+        entities = data.draw(
+            st.lists(st.sampled_from(list(component.zip_lists)), min_size=2)
+        )
+        groups = component.groupby(*entities)
+        assert list(groups) == list(
+            dict.fromkeys(zip(*(component.zip_lists[e] for e in entities)))
+        )
+        for key, group in groups.items():
+            assert group == component.filter(**dict(zip(entities, key)))
+
+    @given(component=sb_st.bids_components(max_values=4), data=st.data())
+    def test_single_entity_keys_are_values(
+        self, component: BidsComponent, data: st.DataObject
+    ):
+        entity = data.draw(st.sampled_from(list(component.zip_lists)))
+        groups = component.groupby(entity)
+        for group in groups.values():
+            for name, values in group._zip_lists.items():
+                assert isinstance(values, ColumnView)
+                assert values.source is component.zip_lists[name]
+        assert list(groups) == list(dict.fromkeys(component.zip_lists[entity]))
+        assert sum(len(itx.first(g.zip_lists.values())) for g in groups.values()) == (
+            len(component.zip_lists[entity])
+        )
+        for value, group in groups.items():
+            assert group.entities[entity] == [value]
+
+    def test_missing_entity_raises_key_error(self):
+        component = BidsPartialComponent(zip_lists={"subject": ["01", "02"]})
+        with pytest.raises(KeyError):
+            component.groupby("session")
+
+
+class TestJoin:
+    @staticmethod
+    def brute_force_join(
+        left: ZipList, right: ZipList, on: list[str], keep_unmatched: bool
+    ) -> list[tuple[str, ...]]:
+        left_rows = list(zip(*left.values()))
+        right_rows = list(zip(*right.values()))
+        left_on = [list(left).index(e) for e in on]
+        right_on = [list(right).index(e) for e in on]
+        pairs: list[tuple[str, ...]] = []
+        for lrow in left_rows:
+            matches = [
+                rrow
+                for rrow in right_rows
+                if [lrow[i] for i in left_on] == [rrow[i] for i in right_on]
+            ]
+            if not matches and keep_unmatched:
+                matches = [tuple("" for _ in right)]
+            pairs.extend(
+                (
+                    *(lrow[i] for i in left_on),
+                    *(v for e, v in zip(left, lrow) if e not in on),
+                    *(v for e, v in zip(right, rrow) if e not in on),
+                )
+                for rrow in matches
+            )
+        return pairs
+
+    @given(
+        values=st.lists(st.sampled_from(["1", "2", "3"]), min_size=1, max_size=8),
+        right_values=st.lists(st.sampled_from(["1", "2", "4"]), max_size=8),
+        how=st.sampled_from(["inner", "left"]),
+    )
+    def test_matches_brute_force_join(
+        self, values: list[str], right_values: list[str], how: Literal["inner", "left"]
+    ):
+        left = BidsPartialComponent(
+            zip_lists={"subject": values, "run": [str(i) for i in range(len(values))]}
+        )
+        right = BidsPartialComponent(
+            zip_lists={
+                "acq": [f"a{i}" for i in range(len(right_values))],
+                "subject": right_values,
+            }
+        )
+        joined = left.join(right, on="subject", how=how)
+        assert list(joined.zip_lists) == ["subject", "run", "acq"]
+        assert list(zip(*joined.zip_lists.values())) == self.brute_force_join(
+            left.zip_lists, right.zip_lists, ["subject"], how == "left"
+        )
+
+    def test_shared_entities_need_suffixes(self):
+        left = BidsPartialComponent(zip_lists={"subject": ["01"], "run": ["1"]})
+        right = BidsPartialComponent(zip_lists={"subject": ["01"], "run": ["2"]})
+        with pytest.raises(ValueError, match="lsuffix and rsuffix"):
+            left.join(right, on="subject")
+        joined = left.join(right, on="subject", rsuffix="_right")
+        assert joined.zip_lists == {"subject": ["01"], "run": ["1"], "run_right": ["2"]}
+
+    @pytest.mark.parametrize(
+        ("on", "how"), [([], "inner"), (["session"], "inner"), (["subject"], "outer")]
+    )
+    def test_invalid_arguments(self, on: list[str], how: Any):
+        left = BidsPartialComponent(zip_lists={"subject": ["01"], "session": ["1"]})
+        right = BidsPartialComponent(zip_lists={"subject": ["01"]})
+        with pytest.raises(ValueError):  # noqa: PT011
+            left.join(right, on=on, how=how)
+
 
 class TestFilteringBidsComponentRowWithSpec:
     def get_filter_spec(
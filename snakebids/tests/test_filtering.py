@@ -1,9 +1,26 @@
 from __future__ import annotations
 
+import itertools as it
+from typing import ClassVar
+
 import pytest
 
-from snakebids.core.filtering import filter_list
+from snakebids.core import filtering
+from snakebids.core.filtering import (
+    filter_list,
+    get_filtered_ziplist_index,
+    get_filtered_ziplist_indexer,
+)
 from snakebids.types import ZipList
+from snakebids.utils.containers import CategoricalList
+
+
+@pytest.fixture(params=["numpy", "python"], autouse=True)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run each test with and without numpy."""
+    if request.param == "python":
+        monkeypatch.setattr(filtering, "np", None)
+    return request.param
 
 
 @pytest.mark.parametrize(
@@ -90,3 +107,126 @@ def test_filter_list(
     output: dict[str, dict[str, list[str]]],
 ):
     assert filter_list(zip_list, filters) == output
+
+
+@pytest.mark.parametrize(
+    ("filters", "output"),
+    [
+        (
+            {"subject": ["01", "03"]},
+            {"dir": ["AP", "PA", "AP", "PA"], "subject": ["02", "02", "04", "04"]},
+        ),
+        (
+            {"subject": "01", "dir": "AP"},
+            {"dir": ["PA", "PA", "PA"], "subject": ["02", "03", "04"]},
+        ),
+        (
+            {"subject": []},
+            {
+                "dir": ["AP", "PA", "AP", "PA", "AP", "PA", "AP", "PA"],
+                "subject": ["01", "01", "02", "02", "03", "03", "04", "04"],
+            },
+        ),
+    ],
+)
+def test_filter_list_exclude(
+    filters: dict[str, list[str] | str], output: dict[str, list[str]]
+):
+    zip_list = {
+        "dir": ["AP", "PA", "AP", "PA", "AP", "PA", "AP", "PA"],
+        "subject": ["01", "01", "02", "02", "03", "03", "04", "04"],
+    }
+    assert filter_list(zip_list, filters, exclude=True) == output
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("exclude", [False, True])
+def test_filter_list_with_multiple_filters_and_regex(compact: bool, exclude: bool):
+    zip_list = {
+        "dir": ["AP", "PA", "AP", "PA", "AP", "PA", "AP", "PA"],
+        "acq": ["98", "98", "98", "98", "99", "99", "99", "99"],
+        "subject": ["01", "01", "02", "02", "01", "01", "02", "02"],
+    }
+    if compact:
+        zip_list = {key: CategoricalList(val) for key, val in zip_list.items()}
+    result = filter_list(
+        zip_list, {"dir": "A.*", "acq": ["9[8]"]}, regex_search=True, exclude=exclude
+    )
+    if exclude:
+        assert result == {
+            "dir": ["PA", "PA"],
+            "acq": ["99", "99"],
+            "subject": ["01", "02"],
+        }
+    else:
+        assert result == {
+            "dir": ["AP", "AP"],
+            "acq": ["98", "98"],
+            "subject": ["01", "02"],
+        }
+    assert all(isinstance(val, CategoricalList) == compact for val in result.values())
+
+
+def test_filter_list_returns_sorted_indices():
+    zip_list = {
+        "dir": ["AP", "PA", "AP", "PA", "AP", "PA", "AP", "PA"],
+        "subject": ["01", "01", "02", "02", "03", "03", "04", "04"],
+    }
+    assert filter_list(
+        zip_list, {"subject": ["04", "01"], "dir": "PA"}, return_indices_only=True
+    ) == [1, 7]
+    assert filter_list(zip_list, {}, return_indices_only=True) == list(range(8))
+
+
+def test_filter_list_with_no_rows():
+    assert filter_list({"subject": []}, {"subject": "01"}) == {"subject": []}
+    assert filter_list({}, {"subject": "01"}) == {}
+
+
+class TestGetFilteredZiplistIndexer:
+    zip_list: ClassVar[dict[str, list[str]]] = {
+        "dir": ["AP", "PA", "AP", "PA", "AP", "PA", "AP", "PA", "AP"],
+        "acq": ["98", "98", "98", "98", "99", "99", "99", "99", "99"],
+        "subject": ["01", "01", "02", "02", "01", "01", "02", "02", "01"],
+        "session": ["1", "1", "1", "1", "1", "1", "1", "1", "2"],
+    }
+
+    @pytest.mark.parametrize(
+        "subj_wildcards",
+        [
+            {"subject": "{subject}"},
+            {"subject": "{subject}", "session": "{session}"},
+            {},
+        ],
+    )
+    def test_matches_get_filtered_ziplist_index(self, subj_wildcards: dict[str, str]):
+        index_of = get_filtered_ziplist_indexer(self.zip_list, subj_wildcards)
+        rows = list(zip(*self.zip_list.values()))
+        for n_keys in range(len(self.zip_list) + 1):
+            for keys in it.combinations(self.zip_list, n_keys):
+                if not set(subj_wildcards) <= set(keys):
+                    continue
+                for row in [*rows, ("LR", "98", "03", "1")]:
+                    wildcards = {
+                        key: val for key, val in zip(self.zip_list, row) if key in keys
+                    }
+                    assert index_of(wildcards) == get_filtered_ziplist_index(
+                        self.zip_list, wildcards, subj_wildcards
+                    )
+
+    def test_extra_wildcards_are_ignored(self):
+        index_of = get_filtered_ziplist_indexer(self.zip_list, {"subject": "{subject}"})
+        wildcards = {"subject": "02", "dir": "PA", "acq": "99"}
+        assert index_of({**wildcards, "foo": "bar"}) == index_of(wildcards)
+        assert index_of(wildcards) == get_filtered_ziplist_index(
+            self.zip_list, wildcards, {"subject": "{subject}"}
+        )
+
+    def test_missing_subject_wildcard_raises_key_error(self):
+        index_of = get_filtered_ziplist_indexer(self.zip_list, {"subject": "{subject}"})
+        with pytest.raises(KeyError):
+            index_of({"dir": "PA"})
+
+    def test_empty_zip_list(self):
+        index_of = get_filtered_ziplist_indexer({}, {"subject": "{subject}"})
+        assert index_of({"subject": "01"}) == []
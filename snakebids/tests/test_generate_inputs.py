@@ -13,7 +13,17 @@ import tempfile
 import warnings
 from collections import defaultdict
 from pathlib import Path, PosixPath
-from typing import Any, Iterable, Literal, NamedTuple, TypedDict, TypeVar, cast
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Iterable,
+    Literal,
+    NamedTuple,
+    TypedDict,
+    TypeVar,
+    cast,
+)
 
 import attrs
 import more_itertools as itx
@@ -24,10 +34,14 @@ from hypothesis import strategies as st
 from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
 
+from snakebids.core import input_generation
+from snakebids.core._indexing import INDEX_FILENAME, BidsIndex
 from snakebids.core._querying import PostFilter, UnifiedFilter, get_matching_files
+from snakebids.core._snapshot import SNAPSHOT_DIR_ENV
 from snakebids.core.datasets import BidsComponent, BidsDataset
 from snakebids.core.input_generation import (
     _all_custom_paths,
+    _BidsPathParser,
     _gen_bids_layout,
     _get_components,
     _is_local_relative,
@@ -35,6 +49,7 @@ from snakebids.core.input_generation import (
     _parse_bids_path,
     _parse_custom_path,
     generate_inputs,
+    get_wildcard_constraints,
 )
 from snakebids.exceptions import ConfigError, PybidsError, RunError
 from snakebids.paths._presets import bids
@@ -190,6 +205,53 @@ def test_get_matching_files_skips_get_when_empty_prefilter(filters: dict[str, An
     )
 
 
+class TestUnifiedFilterRejects:
+    def test_rejects_values_missing_from_exact_filters(self):
+        filters = UnifiedFilter.from_filter_dict({"subject": ["001", "002"]})
+        assert filters.rejects({"subject": "003"})
+        assert not filters.rejects({"subject": "001"})
+        assert not filters.rejects({"session": "01"})
+
+    def test_regex_and_boolean_filters_reject_nothing(self):
+        for filt in [{"match": "00[12]"}, {"search": "1"}, True, False, ["001", False]]:
+            filters = UnifiedFilter.from_filter_dict({"subject": filt})
+            assert not filters.rejects({"subject": "003"})
+
+    def test_empty_prefilter_rejects_everything(self):
+        filters = UnifiedFilter.from_filter_dict({"suffix": []})
+        assert filters.rejects({"subject": "001"})
+
+    @pytest.mark.parametrize(
+        ("inclusions", "exclusions"), [(["001"], None), (None, ["002", "003"])]
+    )
+    def test_rejects_values_filtered_by_postfilters(
+        self, inclusions: list[str] | None, exclusions: list[str] | None
+    ):
+        postfilter = PostFilter()
+        postfilter.add_filter("subject", inclusions, exclusions)
+        filters = UnifiedFilter.from_filter_dict({}, postfilter)
+        assert filters.rejects({"subject": "003"})
+        assert not filters.rejects({"subject": "001"})
+
+    def test_post_exclusions_can_be_ignored(self):
+        postfilter = PostFilter()
+        postfilter.add_filter("subject", None, ["002"])
+        filters = UnifiedFilter.from_filter_dict({"session": "01"}, postfilter)
+        assert not filters.rejects({"subject": "002"}, exclusions=False)
+        assert filters.rejects({"subject": "002", "session": "02"}, exclusions=False)
+
+    def test_post_exclusions_can_be_ignored_when_checking_for_rejections(self):
+        postfilter = PostFilter()
+        postfilter.add_filter("subject", None, ["002"])
+        filters = UnifiedFilter.from_filter_dict({}, postfilter)
+        assert filters.may_reject(["subject"])
+        assert not filters.may_reject(["subject"], exclusions=False)
+
+    def test_invalid_filters_reject_nothing(self):
+        filters = UnifiedFilter.from_filter_dict({"subject": {}})  # type: ignore
+        assert not filters.rejects({"subject": "001"})
+
+
 def test_attribute_errors_from_pybids_qualified_and_raised():
     with pytest.raises(PybidsError, match="Pybids has encountered a problem"):
         get_matching_files(..., UnifiedFilter.from_filter_dict({}))  # type: ignore
@@ -947,38 +1009,13 @@ class TestPostfilter:
             assert filters.inclusions == {key: label}
         assert filters.exclusions == {}
 
-    @given(
-        st.text(),
-        st_lists_or_text,
-        st.lists(st.text(valid_chars, min_size=1), min_size=1),
-        st.text(valid_chars, min_size=1, max_size=3),
-    )
-    def test_exclude_gives_regex_that_matches_anything_except_exclude(
-        self, key: str, excluded: list[str] | str, dummy_values: list[str], padding: str
+    @given(st.text(), st_lists_or_text)
+    def test_exclude_gives_set_of_excluded_values(
+        self, key: str, excluded: list[str] | str
     ):
         filters = PostFilter()
-        # Make sure the dummy_values and padding we'll be testing against are different
-        # from our test values
-        for value in dummy_values:
-            assume(value not in itx.always_iterable(excluded))
-        assume(padding not in itx.always_iterable(excluded))
-
         filters.add_filter(key, None, excluded)
-        assert isinstance(filters.exclusions[key], list)
-        assert len(filters.exclusions[key]) == 1
-
-        # We match any value that isn't the exclude string
-        for value in dummy_values:
-            assert re.match(filters.exclusions[key][0], value)
-
-        for exclude in itx.always_iterable(excluded):
-            # We don't match the exclude string
-            assert re.match(filters.exclusions[key][0], exclude) is None
-
-            # Addition of random strings before and/or after lets the match occur again
-            assert re.match(filters.exclusions[key][0], padding + exclude)
-            assert re.match(filters.exclusions[key][0], exclude + padding)
-            assert re.match(filters.exclusions[key][0], padding + exclude + padding)
+        assert filters.exclusions == {key: frozenset(itx.always_iterable(excluded))}
         assert filters.inclusions == {}
 
 
@@ -1718,6 +1755,526 @@ def test_generate_inputs(dataset: BidsDataset, bids_fs: Path, fakefs_tmpdir: Pat
     assert reindexed.layout is not None
 
 
+@settings(
+    deadline=800,
+    suppress_health_check=[
+        HealthCheck.function_scoped_fixture,
+        HealthCheck.too_slow,
+    ],
+)
+@given(dataset=sb_st.datasets(unique=True))
+def test_generate_inputs_with_native_engine(
+    dataset: BidsDataset, bids_fs: Path, fakefs_tmpdir: Path
+):
+    root = tempfile.mkdtemp(dir=fakefs_tmpdir)
+    rooted = BidsDataset.from_iterable(
+        attrs.evolve(comp, path=os.path.join(root, comp.path))
+        for comp in dataset.values()
+    )
+    reindexed = reindex_dataset(root, rooted, engine="native")
+    assert reindexed == rooted
+    assert reindexed.layout is None
+
+
+class TestNativeEngine:
+    def test_invalid_engine_raises_error(self, tmpdir: Path):
+        with pytest.raises(ValueError, match="engine must be one of"):
+            generate_inputs(tmpdir, {}, engine="foo")  # type: ignore
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"pybids_config": "config.json"},
+            {"index_metadata": True},
+            {"validate": True},
+        ],
+    )
+    def test_pybids_only_args_raise_error(self, tmpdir: Path, kwargs: dict[str, Any]):
+        with pytest.raises(ValueError, match="only supported by the 'pybids' engine"):
+            generate_inputs(tmpdir, {}, engine="native", **kwargs)
+
+    def test_ignores_hidden_and_excluded_directories(self, tmpdir: Path):
+        tmpdir = Path(tmpdir)
+        for path in [
+            "sub-001/anat/sub-001_T1w.nii.gz",
+            "sub-001/.hidden/sub-002_T1w.nii.gz",
+            "sourcedata/sub-003/anat/sub-003_T1w.nii.gz",
+            "derivatives/sub-004/anat/sub-004_T1w.nii.gz",
+        ]:
+            (tmpdir / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmpdir / path).touch()
+        dataset = generate_inputs(
+            tmpdir,
+            {"t1w": {"filters": {"suffix": "T1w"}, "wildcards": ["subject"]}},
+            engine="native",
+        )
+        assert dataset["t1w"].zip_lists == {"subject": ["001"]}
+
+    def test_indexes_derivatives(self, tmpdir: Path):
+        tmpdir = Path(tmpdir)
+        deriv = tmpdir / "derivatives" / "pipeline"
+        deriv.mkdir(parents=True)
+        (deriv / "dataset_description.json").write_text("{}")
+        for path in [
+            tmpdir / "sub-001/anat/sub-001_T1w.nii.gz",
+            deriv / "sub-002/anat/sub-002_desc-brain_T1w.nii.gz",
+        ]:
+            path.parent.mkdir(parents=True)
+            path.touch()
+        config: InputsConfig = {
+            "t1w": {"filters": {"desc": "brain"}, "wildcards": ["subject"]}
+        }
+        assert "t1w" not in generate_inputs(tmpdir, config, engine="native")
+        dataset = generate_inputs(tmpdir, config, derivatives=True, engine="native")
+        assert dataset["t1w"].zip_lists == {"subject": ["002"]}
+
+    @pytest.mark.parametrize("index_workers", [1, 4])
+    def test_index_workers_give_same_results(self, tmpdir: Path, index_workers: int):
+        tmpdir = Path(tmpdir)
+        for sub, ses in it.product(range(5), range(3)):
+            path = tmpdir / f"sub-{sub}/ses-{ses}/anat/sub-{sub}_ses-{ses}_T1w.nii.gz"
+            path.parent.mkdir(parents=True)
+            path.touch()
+        config: InputsConfig = {
+            "t1w": {"filters": {"suffix": "T1w"}, "wildcards": ["subject", "session"]}
+        }
+        serial = generate_inputs(tmpdir, config, engine="native")
+        parallel = generate_inputs(
+            tmpdir, config, engine="native", index_workers=index_workers
+        )
+        assert parallel["t1w"].zip_lists == serial["t1w"].zip_lists
+
+    def test_components_queried_in_single_pass(
+        self, tmpdir: Path, mocker: MockerFixture
+    ):
+        tmpdir = Path(tmpdir)
+        for suffix in ["T1w", "T2w"]:
+            path = tmpdir / f"sub-001/anat/sub-001_{suffix}.nii.gz"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        get = mocker.spy(BidsIndex, "get")
+        get_many = mocker.spy(BidsIndex, "get_many")
+        dataset = generate_inputs(
+            tmpdir,
+            {
+                "t1w": {"filters": {"suffix": "T1w"}, "wildcards": ["subject"]},
+                "t2w": {"filters": {"suffix": "T2w"}, "wildcards": ["subject"]},
+                "bold": {"filters": {"suffix": "bold"}, "wildcards": ["subject"]},
+                "empty": {"filters": {"suffix": []}, "wildcards": ["subject"]},
+            },
+            engine="native",
+        )
+        get.assert_not_called()
+        get_many.assert_called_once()
+        assert set(dataset) == {"t1w", "t2w"}
+        assert dataset["t2w"].path.endswith("sub-{subject}_T2w.nii.gz")
+
+    def test_invalid_filter_in_batch_names_component(self, tmpdir: Path):
+        with pytest.raises(ConfigError, match="component 'bad'"):
+            generate_inputs(
+                tmpdir,
+                {
+                    "good": {"filters": {"suffix": "T1w"}},
+                    "bad": {"filters": {"suffix": {}}},  # type: ignore
+                },
+                engine="native",
+            )
+
+
+class TestDirectoryPruning:
+    @pytest.fixture
+    def bids_dir(self, tmp_path: Path):
+        (tmp_path / "dataset_description.json").write_text(
+            '{"Name": "test", "BIDSVersion": "1.8.0"}'
+        )
+        for sub in ["001", "002", "003"]:
+            for ses in ["01", "02"]:
+                path = tmp_path / f"sub-{sub}/ses-{ses}/anat"
+                path.mkdir(parents=True)
+                (path / f"sub-{sub}_ses-{ses}_T1w.nii.gz").touch()
+        return tmp_path
+
+    @pytest.fixture
+    def scanned(self, mocker: MockerFixture):
+        spy = mocker.spy(os, "scandir")
+
+        def get_scanned():
+            return {Path(call.args[0]).name for call in spy.call_args_list}
+
+        return get_scanned
+
+    CONFIG: ClassVar[InputsConfig] = {
+        "t1w": {"filters": {"suffix": "T1w"}, "wildcards": ["subject", "session"]}
+    }
+
+    def test_native_index_skips_excluded_directories(
+        self, bids_dir: Path, scanned: Callable[[], set[str]]
+    ):
+        dataset = generate_inputs(
+            bids_dir,
+            {
+                "t1w": {
+                    "filters": {"suffix": "T1w", "session": "01"},
+                    "wildcards": ["subject", "session"],
+                }
+            },
+            participant_label=["001", "002"],
+            engine="native",
+        )
+        assert set(dataset["t1w"].entities["subject"]) == {"001", "002"}
+        assert set(dataset["t1w"].entities["session"]) == {"01"}
+        assert "sub-003" not in scanned()
+        assert "ses-02" not in scanned()
+
+    def test_pybids_skips_excluded_directories(self, bids_dir: Path):
+        dataset = generate_inputs(
+            bids_dir, self.CONFIG, participant_label=["001", "003"]
+        )
+        assert set(dataset["t1w"].entities["subject"]) == {"001", "003"}
+        assert dataset.layout is not None
+        assert set(dataset.layout.get_subjects()) == {"001", "003"}
+
+    @pytest.mark.parametrize("engine", ["pybids", "native"])
+    def test_excluded_participants_are_indexed(
+        self,
+        bids_dir: Path,
+        engine: Literal["pybids", "native"],
+        scanned: Callable[[], set[str]],
+    ):
+        dataset = generate_inputs(
+            bids_dir, self.CONFIG, exclude_participant_label="002", engine=engine
+        )
+        assert set(dataset["t1w"].entities["subject"]) == {"001", "003"}
+        assert "sub-002" in scanned()
+        if engine == "pybids":
+            assert dataset.layout is not None
+            assert set(dataset.layout.get_subjects()) == {"001", "002", "003"}
+
+    def test_directories_kept_if_any_component_accepts_them(
+        self, bids_dir: Path, scanned: Callable[[], set[str]]
+    ):
+        dataset = generate_inputs(
+            bids_dir,
+            {
+                "first": {
+                    "filters": {"subject": "001"},
+                    "wildcards": ["subject", "session"],
+                },
+                "second": {
+                    "filters": {"subject": "002"},
+                    "wildcards": ["subject", "session"],
+                },
+            },
+            engine="native",
+        )
+        assert dataset["first"].entities["subject"] == ["001"]
+        assert dataset["second"].entities["subject"] == ["002"]
+        assert {"sub-001", "sub-002"} <= scanned()
+        assert "sub-003" not in scanned()
+
+    @pytest.mark.parametrize("engine", ["pybids", "native"])
+    def test_component_found_when_all_directories_excluded(
+        self, bids_dir: Path, engine: Literal["pybids", "native"]
+    ):
+        dataset = generate_inputs(
+            bids_dir,
+            self.CONFIG,
+            exclude_participant_label=["001", "002", "003"],
+            engine=engine,
+        )
+        assert dataset["t1w"].zip_lists == {"subject": [], "session": []}
+
+    @pytest.mark.parametrize("engine", ["pybids", "native"])
+    def test_missing_component_does_not_trigger_reindex(
+        self,
+        bids_dir: Path,
+        engine: Literal["pybids", "native"],
+        mocker: MockerFixture,
+    ):
+        spy = mocker.spy(input_generation, "_gen_index")
+        dataset = generate_inputs(
+            bids_dir,
+            {
+                **self.CONFIG,
+                "t2w": {"filters": {"suffix": "T2w"}, "wildcards": ["subject"]},
+            },
+            participant_label=["001"],
+            exclude_participant_label=["002"],
+            engine=engine,
+        )
+        assert set(dataset) == {"t1w"}
+        assert spy.call_count == 1
+
+    @pytest.mark.parametrize("engine", ["pybids", "native"])
+    def test_excluded_component_found_in_single_index(
+        self,
+        bids_dir: Path,
+        engine: Literal["pybids", "native"],
+        mocker: MockerFixture,
+    ):
+        spy = mocker.spy(input_generation, "_gen_index")
+        (bids_dir / "sub-002/ses-01/anat/sub-002_ses-01_T2w.nii.gz").touch()
+        dataset = generate_inputs(
+            bids_dir,
+            {
+                **self.CONFIG,
+                "t2w": {
+                    "filters": {"suffix": "T2w", "session": "01"},
+                    "wildcards": ["subject", "session"],
+                },
+            },
+            participant_label=["001", "002"],
+            exclude_participant_label=["002"],
+            engine=engine,
+        )
+        assert list(dataset) == ["t1w", "t2w"]
+        assert dataset["t2w"].zip_lists == {"subject": [], "session": []}
+        assert spy.call_count == 1
+        prune = spy.call_args.kwargs["prune"]
+        assert prune({"subject": "003"})
+        assert not prune({"subject": "002"})
+        assert not prune({"subject": "002", "session": "01"})
+
+    def test_no_directories_skipped_with_database(
+        self, bids_dir: Path, scanned: Callable[[], set[str]]
+    ):
+        dataset = generate_inputs(
+            bids_dir,
+            self.CONFIG,
+            participant_label="001",
+            pybidsdb_dir=bids_dir / ".db",
+            engine="native",
+        )
+        assert set(dataset["t1w"].entities["subject"]) == {"001"}
+        assert {"sub-001", "sub-002", "sub-003"} <= scanned()
+
+    def test_custom_path_skips_directories_not_matching_prefix(
+        self, bids_dir: Path, scanned: Callable[[], set[str]]
+    ):
+        # Unconstrained wildcards may span directories, so only directories not
+        # matching the text before them can be skipped
+        (bids_dir / "scratch/sub-004").mkdir(parents=True)
+        dataset = generate_inputs(
+            bids_dir,
+            {
+                "t1w": {
+                    "filters": {},
+                    "wildcards": ["subject", "session"],
+                    "custom_path": str(
+                        bids_dir
+                        / "sub-{subject}/ses-{session}/anat"
+                        / "sub-{subject}_ses-{session}_T1w.nii.gz"
+                    ),
+                }
+            },
+            participant_label="003",
+        )
+        assert set(dataset["t1w"].entities["subject"]) == {"003"}
+        assert "scratch" not in scanned()
+
+
+class TestNativeIndexDatabase:
+    config: ClassVar[InputsConfig] = {
+        "t1w": {"filters": {"suffix": "T1w"}, "wildcards": ["subject"]}
+    }
+
+    @pytest.fixture
+    def bids_dir(self, tmpdir: Path):
+        bids_dir = Path(tmpdir, "bids")
+        for sub in ["001", "002"]:
+            self.add_file(bids_dir / f"sub-{sub}/anat/sub-{sub}_T1w.nii.gz")
+        # Backdate everything so the mtimes are trusted on the next refresh
+        for path in [bids_dir, *bids_dir.rglob("*")]:
+            os.utime(path, ns=(0, 0))
+        return bids_dir
+
+    @pytest.fixture
+    def db_dir(self, tmpdir: Path):
+        return Path(tmpdir, "db")
+
+    @staticmethod
+    def add_file(path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    def index(self, bids_dir: Path, db_dir: Path, reset: bool = False):
+        return generate_inputs(
+            bids_dir,
+            self.config,
+            engine="native",
+            pybidsdb_dir=db_dir,
+            pybidsdb_reset=reset,
+        )
+
+    def test_index_saved_in_database_dir(self, bids_dir: Path, db_dir: Path):
+        self.index(bids_dir, db_dir)
+        assert (db_dir / INDEX_FILENAME).exists()
+
+    def test_only_modified_directories_relisted(
+        self, bids_dir: Path, db_dir: Path, mocker: MockerFixture
+    ):
+        self.index(bids_dir, db_dir)
+        self.add_file(bids_dir / "sub-003/anat/sub-003_T1w.nii.gz")
+        spy = mocker.spy(os, "scandir")
+        dataset = self.index(bids_dir, db_dir)
+        listed = {Path(call.args[0]) for call in spy.call_args_list}
+
+        assert dataset["t1w"].zip_lists == {"subject": ["001", "002", "003"]}
+        assert bids_dir in listed
+        assert bids_dir / "sub-003" / "anat" in listed
+        assert bids_dir / "sub-001" not in listed
+        assert bids_dir / "sub-001" / "anat" not in listed
+
+    def test_removed_files_dropped(self, bids_dir: Path, db_dir: Path):
+        self.index(bids_dir, db_dir)
+        shutil.rmtree(bids_dir / "sub-002")
+        dataset = self.index(bids_dir, db_dir)
+        assert dataset["t1w"].zip_lists == {"subject": ["001"]}
+
+    def test_reset_relists_everything(
+        self, bids_dir: Path, db_dir: Path, mocker: MockerFixture
+    ):
+        self.index(bids_dir, db_dir)
+        spy = mocker.spy(os, "scandir")
+        self.index(bids_dir, db_dir, reset=True)
+        listed = {Path(call.args[0]) for call in spy.call_args_list}
+        assert bids_dir / "sub-001" / "anat" in listed
+
+    def test_corrupt_index_is_rebuilt(self, bids_dir: Path, db_dir: Path):
+        self.index(bids_dir, db_dir)
+        (db_dir / INDEX_FILENAME).write_text("{")
+        dataset = self.index(bids_dir, db_dir)
+        assert dataset["t1w"].zip_lists == {"subject": ["001", "002"]}
+
+
+class TestSnapshots:
+    config: ClassVar[InputsConfig] = {
+        "t1w": {"filters": {"suffix": "T1w"}, "wildcards": ["subject"]}
+    }
+
+    @pytest.fixture
+    def bids_dir(self, tmpdir: Path):
+        bids_dir = Path(tmpdir, "bids")
+        for sub in ["001", "002"]:
+            self.add_file(bids_dir / f"sub-{sub}/anat/sub-{sub}_T1w.nii.gz")
+        # Backdate everything so changes are seen even with coarse mtimes
+        for path in [bids_dir, *bids_dir.rglob("*")]:
+            os.utime(path, ns=(0, 0))
+        return bids_dir
+
+    @pytest.fixture
+    def snapshot_dir(self, tmpdir: Path):
+        return Path(tmpdir, "snapshots")
+
+    @staticmethod
+    def add_file(path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    def test_snapshot_loaded_instead_of_indexing(
+        self, bids_dir: Path, snapshot_dir: Path, mocker: MockerFixture
+    ):
+        original = generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        assert len(list(snapshot_dir.iterdir())) == 1
+
+        spy = mocker.spy(input_generation, "_gen_bids_layout")
+        loaded = generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        spy.assert_not_called()
+        assert loaded == original
+        assert loaded.layout is None
+
+    def test_limit_to_may_be_an_iterator(self, bids_dir: Path, snapshot_dir: Path):
+        config: InputsConfig = {
+            **self.config,
+            "t2w": {"filters": {"suffix": "T2w"}, "wildcards": ["subject"]},
+        }
+        dataset = generate_inputs(
+            bids_dir,
+            config,
+            limit_to=iter(["t1w"]),
+            participant_label="001",
+            snapshot_dir=snapshot_dir,
+        )
+        assert list(dataset) == ["t1w"]
+        assert dataset["t1w"].zip_lists == {"subject": ["001"]}
+
+    def test_snapshot_not_loaded_when_dataset_changes(
+        self, bids_dir: Path, snapshot_dir: Path
+    ):
+        generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        (bids_dir / "sub-002/anat/sub-002_T1w.nii.gz").unlink()
+        dataset = generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        assert dataset["t1w"].zip_lists == {"subject": ["001"]}
+        assert len(list(snapshot_dir.iterdir())) == 2
+
+    @pytest.mark.parametrize("ignored", ["derivatives", "code", "sourcedata", ".git"])
+    def test_snapshot_loaded_after_writing_to_ignored_directories(
+        self, bids_dir: Path, snapshot_dir: Path, ignored: str
+    ):
+        generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        self.add_file(bids_dir / ignored / "app/sub-001/anat/sub-001_T1w.nii.gz")
+        generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        assert len(list(snapshot_dir.iterdir())) == 1
+
+        self.add_file(bids_dir / "sub-003/anat/sub-003_T1w.nii.gz")
+        dataset = generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        assert dataset["t1w"].zip_lists == {"subject": ["001", "002", "003"]}
+
+    def test_snapshot_keyed_on_arguments(self, bids_dir: Path, snapshot_dir: Path):
+        generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        dataset = generate_inputs(
+            bids_dir, self.config, snapshot_dir=snapshot_dir, participant_label="001"
+        )
+        assert dataset["t1w"].zip_lists == {"subject": ["001"]}
+        assert len(list(snapshot_dir.iterdir())) == 2
+
+    def test_snapshot_dir_read_from_environment(
+        self,
+        bids_dir: Path,
+        snapshot_dir: Path,
+        mocker: MockerFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setenv(SNAPSHOT_DIR_ENV, str(snapshot_dir))
+        original = generate_inputs(bids_dir, self.config, engine="native")
+        assert len(list(snapshot_dir.iterdir())) == 1
+
+        spy = mocker.spy(input_generation, "_gen_bids_index")
+        assert generate_inputs(bids_dir, self.config, engine="native") == original
+        spy.assert_not_called()
+
+    def test_environment_ignored_when_dataset_has_layout(
+        self, bids_dir: Path, snapshot_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setenv(SNAPSHOT_DIR_ENV, str(snapshot_dir))
+        for _ in range(2):
+            assert generate_inputs(bids_dir, self.config).layout is not None
+        assert not snapshot_dir.exists()
+
+    def test_failure_to_save_snapshot_is_logged(
+        self, bids_dir: Path, tmpdir: Path, caplog: pytest.LogCaptureFixture
+    ):
+        snapshot_dir = Path(tmpdir, "file")
+        snapshot_dir.touch()
+        dataset = generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        assert dataset["t1w"].zip_lists == {"subject": ["001", "002"]}
+        assert "Could not save dataset snapshot" in caplog.text
+
+    def test_explicit_snapshot_dir_overrides_environment(
+        self, bids_dir: Path, snapshot_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setenv(SNAPSHOT_DIR_ENV, str(snapshot_dir / "env"))
+        generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir / "arg")
+        assert list(snapshot_dir.iterdir()) == [snapshot_dir / "arg"]
+
+    def test_snapshot_returned_as_dict(self, bids_dir: Path, snapshot_dir: Path):
+        generate_inputs(bids_dir, self.config, snapshot_dir=snapshot_dir)
+        legacy = generate_inputs(
+            bids_dir, self.config, snapshot_dir=snapshot_dir, use_bids_inputs=False
+        )
+        assert set(legacy["input_lists"]["t1w"]["subject"]) == {"001", "002"}
+
+
 @st.composite
 def dataset_with_subject(draw: st.DrawFn):
     entities = draw(sb_st.bids_entity_lists(blacklist_entities=["subject"]))
@@ -1938,6 +2495,19 @@ def test_when_all_custom_paths_no_layout_indexed(
     spy.assert_not_called()
 
 
+def test_get_wildcard_constraints_covers_component_wildcards():
+    config: InputsConfig = {
+        "t1": {"filters": {"suffix": "T1w"}, "wildcards": ["subject", "session"]},
+        "bold": {"wildcards": ["subject", "acquisition", "run"]},
+    }
+    assert get_wildcard_constraints(config) == {
+        "subject": "[a-zA-Z0-9]+",
+        "session": "[a-zA-Z0-9]+",
+        "acq": "[a-zA-Z0-9]+",
+        "run": "[a-zA-Z0-9]+",
+    }
+
+
 class TestParseBidsPath:
     @given(
         component=sb_st.bids_components(max_values=1, restrict_patterns=True),
@@ -1989,6 +2559,53 @@ class TestParseBidsPath:
         assert err.value.entity == entity
 
 
+class TestBidsPathParser:
+    @given(
+        component=sb_st.bids_components(restrict_patterns=True),
+        scheme=sb_st.schemes() | st.none(),
+    )
+    def test_matches_parse_bids_path(
+        self, component: BidsComponent, scheme: str | None
+    ):
+        entities = [BidsEntity.normalize(e).entity for e in component.zip_lists]
+        parser = _BidsPathParser()
+        for path in component.expand():
+            full_path = path if scheme is None else f"{scheme}{path}"
+            assert parser.parse(full_path, entities) == _parse_bids_path(
+                full_path, entities
+            )
+
+    def test_reuses_learned_template(self, mocker: MockerFixture):
+        parser = _BidsPathParser()
+        entities = ["subject", "suffix", "extension"]
+        parser.parse("sub-001/anat/sub-001_T1w.nii.gz", entities)
+        spy = mocker.spy(input_generation, "_parse_bids_path")
+        for sub in ["002", "003"]:
+            assert parser.parse(f"sub-{sub}/anat/sub-{sub}_T1w.nii.gz", entities) == (
+                "sub-{subject}/anat/sub-{subject}_{suffix}{extension}",
+                {"subject": sub, "suffix": "T1w", "extension": ".nii.gz"},
+            )
+        spy.assert_not_called()
+
+    def test_falls_back_when_path_does_not_fit_template(self):
+        parser = _BidsPathParser()
+        entities = ["subject", "suffix", "extension"]
+        parser.parse("sub-001/anat/sub-001_T1w.nii.gz", entities)
+        assert parser.parse("sub-002/sub-002_T1w.nii.gz", entities) == (
+            "sub-{subject}/sub-{subject}_{suffix}{extension}",
+            {"subject": "002", "suffix": "T1w", "extension": ".nii.gz"},
+        )
+
+    def test_escaped_braces_are_not_compiled(self):
+        parser = _BidsPathParser()
+        entities = ["subject", "suffix", "extension"]
+        for sub in ["001", "002"]:
+            assert parser.parse(f"{{a}}/sub-{sub}_T1w.nii", entities) == (
+                "{{a}}/sub-{subject}_{suffix}{extension}",
+                {"subject": sub, "suffix": "T1w", "extension": ".nii"},
+            )
+
+
 class TestDB:
     @pytest.fixture(autouse=True)
     def _start(self, tmp_path: Path):
@@ -11,7 +11,8 @@ from hypothesis import assume, example, given
 from hypothesis import strategies as st
 from pathvalidate import Platform, is_valid_filename, is_valid_filepath
 
-from snakebids.paths import specs
+from snakebids import BidsComponent
+from snakebids.paths import _factory, specs
 from snakebids.paths._factory import bids_factory
 from snakebids.paths._utils import BidsPathSpec
 from snakebids.tests import strategies as sb_st
@@ -305,9 +306,144 @@ def make_bids_testsuite(spec: BidsPathSpec):
             ):
                 bids(**args)
 
+        @given(entities=_bids_args(), root=_roots())
+        def test_repeated_calls_give_same_path(
+            self, entities: dict[str, str], root: str
+        ):
+            assert bids(root=root, **entities) == bids(root=root, **entities)
+            assert bids(root=root, **entities) == bids_factory(spec)(
+                root=root, **entities
+            )
+
+        def test_equal_values_of_different_types_give_different_paths(self):
+            assert bids(foo=True, suffix="bar") != bids(foo=1, suffix="bar")  # type: ignore
+
+        @given(entities=_bids_args(), root=_roots(), data=st.data())
+        def test_many_matches_individual_paths(
+            self, entities: dict[str, str], root: str, data: st.DataObject
+        ):
+            assume("root" not in entities)
+            length = data.draw(st.integers(min_value=1, max_value=5))
+            # Empty entities are left out of the path
+            columns = {
+                key: data.draw(
+                    st.lists(
+                        _values()
+                        if key in {"datatype", "suffix", "extension"}
+                        else _values() | st.just(""),
+                        min_size=length,
+                        max_size=length,
+                    )
+                )
+                for key in entities
+            }
+            rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+            assert bids.many(root=root, **columns) == [
+                bids(root=root, **row) for row in rows
+            ]
+
+        @given(entities=_bids_args(), root=_roots())
+        def test_many_with_single_values_gives_one_path(
+            self, entities: dict[str, str], root: str
+        ):
+            assume("root" not in entities)
+            assert bids.many(root=root, **entities) == [bids(root=root, **entities)]
+
+        @given(
+            entities=_bids_args(nonstandard=False), suffix=_values(), root=_roots()
+        )
+        def test_parse_recovers_entities(
+            self, entities: dict[str, str], suffix: str, root: str
+        ):
+            assume("root" not in entities)
+            path = bids(root=root, suffix=suffix, **entities)
+            parsed = bids.parse(path)
+            assert parsed is not None
+            assert parsed.pop("suffix") + parsed.pop("extension", "") == suffix
+            assert {
+                BidsEntity.normalize(entity).tag: value
+                for entity, value in parsed.items()
+            } == {
+                BidsEntity.normalize(entity).tag: value
+                for entity, value in entities.items()
+            }
+
+        @given(entities=_bids_args(), root=_roots())
+        def test_parsed_entities_give_same_path(
+            self, entities: dict[str, str], root: str
+        ):
+            assume("root" not in entities)
+            assume("." not in "".join(entities.values()) or "suffix" in entities)
+            assume(entities.get("extension", ".").startswith("."))
+            path = bids(root=root, **entities)
+            parsed = bids.parse(path)
+            assert parsed is not None
+            assert bids(root=root, datatype=entities.get("datatype"), **parsed) == path
+
+        @given(paths=st.lists(_bids_args().map(lambda entities: bids(**entities))))
+        def test_parse_many_matches_parse(self, paths: list[str]):
+            assert bids.parse_many(paths) == [bids.parse(path) for path in paths]
+
     return BidsTests
 
 
+@given(
+    sb_st.bids_components(
+        whitelist_entities=["subject", "session", "run", "acquisition", "datatype"],
+        max_values=4,
+    )
+)
+def test_many_builds_path_for_each_entry_of_component(component: BidsComponent):
+    bids = bids_factory(specs.v0_0_0())
+    assert bids.many(component, root="root", suffix="T1w.nii.gz") == [
+        bids(root="root", suffix="T1w.nii.gz", **entry)
+        for entry in (
+            dict(zip(component.zip_lists, row))
+            for row in zip(*component.zip_lists.values())
+        )
+    ]
+
+
+def test_many_requires_sequences_of_equal_length():
+    bids = bids_factory(specs.v0_0_0())
+    with pytest.raises(ValueError, match="must have the same length"):
+        bids.many(subject=["1", "2"], session=["1"], suffix="T1w")
+
+
+class TestParse:
+    def test_parses_entities_suffix_and_extension(self):
+        bids = bids_factory(specs.v0_11_0())
+        assert bids.parse(
+            os.path.join("root", "sub-01", "anat", "sub-01_foo-x_desc-y_T1w.nii.gz")
+        ) == {
+            "subject": "01",
+            "foo": "x",
+            "description": "y",
+            "suffix": "T1w",
+            "extension": ".nii.gz",
+        }
+
+    def test_entities_in_wrong_order_are_not_parsed(self):
+        bids = bids_factory(specs.v0_0_0())
+        assert bids.parse("ses-1_sub-01_T1w.nii.gz") is None
+
+    def test_prefixes_are_not_parsed(self):
+        bids = bids_factory(specs.v0_0_0())
+        assert bids.parse("tpl_sub-01_T1w.nii.gz") is None
+
+    def test_empty_filename_is_not_parsed(self):
+        bids = bids_factory(specs.v0_0_0())
+        assert bids.parse(os.path.join("root", "")) is None
+
+
+def test_implicit_spec_warns_on_every_call(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(_factory, "in_interactive_session", lambda: False)
+    bids = bids_factory(specs.v0_0_0(), _implicit=True)
+    for _ in range(2):
+        with pytest.warns(UserWarning, match="unrecognized entities"):
+            bids(foo="bar", suffix="suffix")
+
+
 TestV0_0_0 = make_bids_testsuite(specs.v0_0_0())
 
 TestV0_10_1 = make_bids_testsuite(specs.v0_11_0())
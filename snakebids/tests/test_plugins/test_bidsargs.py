@@ -96,3 +96,62 @@ class TestAddCliArguments:
         bidsargs.add_cli_arguments(parser, {}, {})
         nspc = parser.parse_args(["...", "...", "participant"])
         assert nspc.derivatives is False
+
+
+class TestExcludeParticipantLabelFile:
+    def test_labels_read_from_file(self, tmp_path: Path):
+        label_file = tmp_path / "excluded.txt"
+        label_file.write_text("001 002\n# failed qc\n003  # motion\n\n004\n")
+        parser = ArgumentParser()
+        bidsargs = BidsArgs()
+        bidsargs.add_cli_arguments(parser, {}, {})
+        nspc = vars(
+            parser.parse_args(
+                [
+                    "...",
+                    "...",
+                    "participant",
+                    "--exclude-participant-label-file",
+                    str(label_file),
+                ]
+            )
+        )
+        bidsargs.update_cli_namespace(nspc, {})
+        assert nspc["exclude_participant_label"] == ["001", "002", "003", "004"]
+        assert "exclude_participant_label_file" not in nspc
+
+    def test_labels_combined_with_cli_labels(self, tmp_path: Path):
+        label_file = tmp_path / "excluded.txt"
+        label_file.write_text("002\n")
+        parser = ArgumentParser()
+        bidsargs = BidsArgs()
+        bidsargs.add_cli_arguments(parser, {}, {})
+        nspc = vars(
+            parser.parse_args(
+                [
+                    "...",
+                    "...",
+                    "participant",
+                    "--exclude-participant-label",
+                    "001",
+                    "--exclude-participant-label-file",
+                    str(label_file),
+                ]
+            )
+        )
+        bidsargs.update_cli_namespace(nspc, {})
+        assert nspc["exclude_participant_label"] == ["001", "002"]
+
+    def test_exclusions_unchanged_without_file(self):
+        parser = ArgumentParser()
+        bidsargs = BidsArgs()
+        bidsargs.add_cli_arguments(parser, {}, {})
+        nspc = vars(parser.parse_args(["...", "...", "participant"]))
+        bidsargs.update_cli_namespace(nspc, {})
+        assert nspc["exclude_participant_label"] is None
+
+    def test_missing_file_raises_error(self, tmp_path: Path):
+        bidsargs = BidsArgs()
+        nspc = {"exclude_participant_label_file": tmp_path / "missing.txt"}
+        with pytest.raises(ConfigError, match="Could not read participant labels"):
+            bidsargs.update_cli_namespace(nspc, {})
@@ -122,6 +122,22 @@ class TestUpdateNamespace:
             == f"{DEPRECATION_FLAG}{int(value)}{DEPRECATION_FLAG}"
         )
 
+    @pytest.mark.parametrize("workers", [None, 1, 8])
+    def test_index_workers_moved_to_config(self, workers: int | None):
+        pybidsdb = Pybidsdb()
+
+        namespace = {
+            f"{pybidsdb.PREFIX}.dir": None,
+            f"{pybidsdb.PREFIX}.reset": False,
+            f"{pybidsdb.PREFIX}.reset_db": False,
+            f"{pybidsdb.PREFIX}.index_workers": workers,
+        }
+        config: dict[str, Any] = {}
+        pybidsdb.update_cli_namespace(namespace, config)
+
+        assert config["index_workers"] == workers
+        assert namespace == {}
+
     def test_old_key_not_set_if_pybidsdb_not_set(self):
         pybidsdb = Pybidsdb()
 
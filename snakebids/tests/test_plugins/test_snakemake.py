@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import copy
+import os
 import tempfile
 from pathlib import Path
 from typing import Any, Mapping, Sequence
@@ -12,7 +13,9 @@ from hypothesis import strategies as st
 from pytest_mock import MockerFixture
 from pytest_mock.plugin import MockType
 
+import snakebids.plugins.snakemake as sn_app
 from snakebids import bidsapp
+from snakebids.core._snapshot import SNAPSHOT_DIR_ENV
 from snakebids.exceptions import ConfigError, RunError
 from snakebids.plugins import Version
 from snakebids.plugins.snakemake import (
@@ -436,6 +439,7 @@ def test_integration(
             "snakemake_dir": Path("app").resolve(),
             "pybidsdb_dir": Path(db_path),
             "pybidsdb_reset": True,
+            "index_workers": None,
             "pybids_db_dir": f"{DEPRECATION_FLAG}{db_path}{DEPRECATION_FLAG}",
             "pybids_db_reset": f"{DEPRECATION_FLAG}1{DEPRECATION_FLAG}",
             "snakefile": Path("app/Snakefile"),
@@ -508,3 +512,56 @@ def test_integration(
             "--unknown-arg",
         ]
     )
+
+
+class TestRunSharesSnapshots:
+    @pytest.fixture
+    def plugin(self, tmp_path: Path):
+        plugin = SnakemakeBidsApp.create_empty()
+        plugin.cwd = tmp_path
+        return plugin
+
+    @pytest.fixture
+    def config(self) -> dict[str, Any]:
+        return {"snakemake_target": "all", "snakemake_args": []}
+
+    def test_snapshot_dir_set_while_snakemake_runs(
+        self,
+        plugin: SnakemakeBidsApp,
+        config: dict[str, Any],
+        mocker: MockerFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.delenv(SNAPSHOT_DIR_ENV, raising=False)
+        seen: list[str | None] = []
+        mocker.patch.object(
+            sn_app,
+            "snakemake_main",
+            side_effect=lambda _: seen.append(os.environ.get(SNAPSHOT_DIR_ENV)),
+        )
+        plugin.run(config)
+        assert seen == [str(plugin.cwd / ".snakemake" / "snakebids" / "snapshots")]
+        assert SNAPSHOT_DIR_ENV not in os.environ
+
+    def test_previous_environment_restored_on_exit(
+        self,
+        plugin: SnakemakeBidsApp,
+        config: dict[str, Any],
+        mocker: MockerFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setenv(SNAPSHOT_DIR_ENV, "previous")
+        mocker.patch.object(sn_app, "snakemake_main", side_effect=SystemExit(1))
+        with pytest.raises(SystemExit):
+            plugin.run(config)
+        assert os.environ[SNAPSHOT_DIR_ENV] == "previous"
+
+    def test_snapshots_from_previous_runs_cleared(
+        self, plugin: SnakemakeBidsApp, config: dict[str, Any], mocker: MockerFixture
+    ):
+        snapshot = plugin.cwd / ".snakemake" / "snakebids" / "snapshots" / "old.json"
+        snapshot.parent.mkdir(parents=True)
+        snapshot.touch()
+        mocker.patch.object(sn_app, "snakemake_main")
+        plugin.run(config)
+        assert not snapshot.exists()
@@ -1,5 +1,10 @@
 """Tests for snakemake_io"""
 
+import os
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
 from snakebids.utils import snakemake_io
 
 
@@ -38,3 +43,116 @@ def test_glob_wildcards():
         snakemake_io.glob_wildcards(both_wildcard_path, files=[file_path])
         in both_wildcards_one_file
     )
+
+
+def test_glob_wildcards_skips_directories_not_matching_pattern(
+    tmp_path: Path, mocker: MockerFixture
+):
+    for path in [
+        "sub-001/anat/sub-001_T1w.nii.gz",
+        "sub-001/func/sub-001_bold.nii.gz",
+        "sub-002/anat/sub-002_T1w.nii.gz",
+        "scratch/sub-003/anat/sub-003_T1w.nii.gz",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    spy = mocker.spy(os, "scandir")
+
+    wildcards = snakemake_io.glob_wildcards(
+        tmp_path / "sub-{subject}/anat/sub-{subject}_{suffix}.nii.gz"
+    )
+
+    assert sorted(zip(wildcards["subject"], wildcards["suffix"])) == [
+        ("001", "T1w"),
+        ("002", "T1w"),
+    ]
+    assert tmp_path / "scratch" not in {
+        Path(call.args[0]) for call in spy.call_args_list
+    }
+
+
+def test_glob_wildcards_with_spanning_constraint_descends_all_directories(
+    tmp_path: Path,
+):
+    (tmp_path / "a/b").mkdir(parents=True)
+    (tmp_path / "a/b/c.txt").touch()
+    assert snakemake_io.glob_wildcards(tmp_path / "{path,.*/.*}.txt") == {
+        "path": ["a/b/c"]
+    }
+
+
+def test_glob_wildcards_skips_pruned_directories(tmp_path: Path, mocker: MockerFixture):
+    for sub in ["001", "002"]:
+        (tmp_path / f"sub-{sub}/anat").mkdir(parents=True)
+        (tmp_path / f"sub-{sub}/anat/sub-{sub}_T1w.nii.gz").touch()
+    spy = mocker.spy(os, "scandir")
+
+    wildcards = snakemake_io.glob_wildcards(
+        tmp_path / "sub-{subject,[^/]+}/anat/sub-{subject}_T1w.nii.gz",
+        prune=lambda values: values.get("subject") == "002",
+    )
+
+    assert wildcards == {"subject": ["001"]}
+    assert tmp_path / "sub-002" not in {
+        Path(call.args[0]) for call in spy.call_args_list
+    }
+
+
+def test_glob_wildcards_prunes_with_constraints_excluding_separators(
+    tmp_path: Path, mocker: MockerFixture
+):
+    for path in ["sub-001/anat/sub-001_T1w.nii.gz", "scratch/sub-002_T1w.nii.gz"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    spy = mocker.spy(os, "scandir")
+
+    wildcards = snakemake_io.glob_wildcards(
+        tmp_path / "sub-{subject,[^/]+}/anat/sub-{subject}_T1w.nii.gz"
+    )
+
+    assert wildcards == {"subject": ["001"]}
+    assert tmp_path / "scratch" not in {
+        Path(call.args[0]) for call in spy.call_args_list
+    }
+
+
+def test_glob_wildcards_finds_repeated_wildcards_split_differently_by_directory(
+    tmp_path: Path,
+):
+    (tmp_path / "01_a_b/01").mkdir(parents=True)
+    (tmp_path / "01_a_b/01/file.txt").touch()
+
+    wildcards = snakemake_io.glob_wildcards(
+        tmp_path / "{subject,[^/]+}_{session,[^/]+}/{subject}/file.txt",
+        prune=lambda values: values.get("subject") == "01_a",
+    )
+
+    assert wildcards == {"subject": ["01"], "session": ["a_b"]}
+
+
+def test_glob_wildcards_unconstrained_wildcards_span_directories(tmp_path: Path):
+    for path in ["sub01/anat/x_T1w.nii.gz", "sub02/y_T1w.nii.gz", "z_T1w.nii.gz"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+
+    wildcards = snakemake_io.glob_wildcards(
+        tmp_path / "{path}_T1w.nii.gz", prune=lambda _: False
+    )
+
+    assert sorted(wildcards["path"]) == ["sub01/anat/x", "sub02/y", "z"]
+
+
+def test_glob_wildcards_unconstrained_wildcards_span_directories_after_prefix(
+    tmp_path: Path, mocker: MockerFixture
+):
+    for path in ["sub-01/anat/sub-01_T1w.nii.gz", "scratch/sub-02_T1w.nii.gz"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    spy = mocker.spy(os, "scandir")
+
+    wildcards = snakemake_io.glob_wildcards(tmp_path / "sub-{path}_T1w.nii.gz")
+
+    assert wildcards == {"path": ["01/anat/sub-01"]}
+    assert tmp_path / "scratch" not in {
+        Path(call.args[0]) for call in spy.call_args_list
+    }
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import operator as op
+import os
 import re
 import string
 import sys
+from pathlib import Path
 from typing import Any
 
 import more_itertools as itx
@@ -12,8 +14,14 @@ from hypothesis import assume, given
 from hypothesis import strategies as st
 
 import snakebids.tests.strategies as sb_st
-from snakebids.utils.containers import ImmutableList, MultiSelectDict, RegexContainer
-from snakebids.utils.utils import get_wildcard_dict, matches_any
+from snakebids.utils.containers import (
+    CategoricalList,
+    ColumnView,
+    ImmutableList,
+    MultiSelectDict,
+    RegexContainer,
+)
+from snakebids.utils.utils import get_wildcard_dict, matches_any, trie_regex, walk
 
 
 @st.composite
@@ -310,6 +318,113 @@ class TestImmutableListsAreEquivalentToTuples:
         assert bool(iml) == bool(items)
 
 
+class TestCategoricalListsAreEquivalentToLists:
+    values = st.lists(st.sampled_from(["a", "b", "c", "d"]) | st.text(max_size=3))
+
+    @given(values)
+    def test_equal_to_list(self, items: list[str]):
+        cl = CategoricalList(items)
+        assert cl == items
+        assert items == cl
+        assert list(cl) == items
+        assert list(reversed(cl)) == items[::-1]
+        assert len(cl) == len(items)
+
+    @given(values, values)
+    def test_equality_matches_lists(self, items1: list[str], items2: list[str]):
+        cl1 = CategoricalList(items1)
+        cl2 = CategoricalList(items2)
+        assert (cl1 == cl2) == (items1 == items2)
+        assert (cl1 == items2) == (items1 == items2)
+
+    @given(values)
+    def test_each_value_stored_once(self, items: list[str]):
+        cl = CategoricalList(items)
+        assert sorted(cl.categories) == sorted(set(items))
+        assert [cl.categories[code] for code in cl.codes] == items
+
+    @given(values, st.slices(10))
+    def test_slices_share_categories(self, items: list[str], index: slice):
+        cl = CategoricalList(items)
+        assert cl[index] == items[index]
+        assert cl[index].categories is cl.categories
+
+    @given(values, st.text(max_size=3))
+    def test_contains_count_and_index(self, items: list[str], value: str):
+        cl = CategoricalList(items)
+        assert (value in cl) == (value in items)
+        assert cl.count(value) == items.count(value)
+        if value in items:
+            assert cl.index(value) == items.index(value)
+        else:
+            with pytest.raises(ValueError, match="is not in list"):
+                cl.index(value)
+
+    def test_index_within_bounds(self):
+        items = ["a", "b", "a", "c"]
+        cl = CategoricalList(items)
+        assert cl.index("a", 1) == items.index("a", 1)
+        assert cl.index("a", -2) == items.index("a", -2)
+        with pytest.raises(ValueError, match="is not in list"):
+            cl.index("c", 0, 3)
+
+    def test_take_selects_by_position(self):
+        cl = CategoricalList(["a", "b", "a", "c"])
+        assert cl.take([3, 0, 1]) == ["c", "a", "b"]
+
+    def test_codes_use_smallest_integer_type(self):
+        assert CategoricalList(["a"] * 10).codes.typecode == "B"
+        assert CategoricalList(map(str, range(1000))).codes.typecode == "H"
+
+    def test_is_not_hashable(self):
+        with pytest.raises(TypeError):
+            hash(CategoricalList(["a"]))
+
+
+class TestColumnViewsAreEquivalentToLists:
+    @st.composite
+    @staticmethod
+    def selections(draw: st.DrawFn) -> tuple[list[str], list[int]]:
+        items = draw(st.lists(st.text(max_size=3)))
+        indices = draw(
+            st.lists(st.integers(0, len(items) - 1)) if items else st.just([])
+        )
+        return items, indices
+
+    @given(selections())
+    def test_equal_to_selected_items(self, selection: tuple[list[str], list[int]]):
+        items, indices = selection
+        selected = [items[i] for i in indices]
+        view = ColumnView(items, indices)
+        assert view == selected
+        assert selected == view
+        assert list(view) == selected
+        assert list(reversed(view)) == selected[::-1]
+        assert len(view) == len(selected)
+
+    @given(selections(), st.slices(10))
+    def test_slices_and_views_of_views_refer_to_source(
+        self, selection: tuple[list[str], list[int]], index: slice
+    ):
+        items, indices = selection
+        view = ColumnView(items, indices)
+        assert view[index] == [items[i] for i in indices][index]
+        assert view[index].source is items
+        nested = view.take(reversed(range(len(view))))
+        assert nested == list(view)[::-1]
+        assert nested.source is items
+
+    def test_source_is_not_copied(self):
+        items = ["a", "b", "c"]
+        view = ColumnView(items, [2, 0])
+        items[0] = "d"
+        assert view == ["c", "d"]
+
+    def test_is_not_hashable(self):
+        with pytest.raises(TypeError):
+            hash(ColumnView(["a"], [0]))
+
+
 @given(
     st.dictionaries(
         sb_st.bids_entity().map(lambda e: e.wildcard),
@@ -325,6 +440,20 @@ def test_get_wildcard_dict(zip_list: dict[str, str]):
     assert set(second.split(".")) == set(zip_list.values())
 
 
+class TestTrieRegex:
+    @given(st.lists(st.text(), min_size=1), st.text())
+    def test_matches_exactly_the_given_values(self, values: list[str], other: str):
+        regex = re.compile(trie_regex(values))
+        assert all(regex.fullmatch(value) for value in values)
+        assert bool(regex.fullmatch(other)) == (other in values)
+
+    def test_shared_prefixes_are_merged(self):
+        assert trie_regex([f"{i:03}" for i in range(1, 13)]) == "0(?:0[1-9]|1[0-2])"
+
+    def test_values_that_are_prefixes_are_optional(self):
+        assert trie_regex(["a", "ab", "abc"]) == "a(?:bc?)?"
+
+
 class TestRegexContainer:
     DDWW = r"^\d{3}[a-zA-Z]{3}$"
     bDDWW = rb"^\d{3}[a-zA-Z]{3}$"  # noqa: N815
@@ -345,3 +474,47 @@ class TestRegexContainer:
     @given(sample=st.from_regex(bDDWW))
     def test_container_specific_to_type(self, sample: str):
         assert sample not in RegexContainer(self.DDWW)
+
+
+class TestWalk:
+    @pytest.fixture
+    def tree(self, tmp_path: Path):
+        for path in [
+            "top.txt",
+            "sub-001/ses-01/anat/sub-001_ses-01_T1w.nii.gz",
+            "sub-001/ses-02/anat/sub-001_ses-02_T1w.nii.gz",
+            "sub-002/anat/sub-002_T1w.nii.gz",
+            "sub-002/.hidden/file.txt",
+            "code/script.py",
+        ]:
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / path).touch()
+        return tmp_path
+
+    @staticmethod
+    def normalize(entries: Any):
+        return sorted(
+            (dirpath, sorted(dirnames), sorted(filenames))
+            for dirpath, dirnames, filenames in entries
+        )
+
+    @pytest.mark.parametrize("workers", [None, 1, 2, 8])
+    def test_same_results_as_os_walk(self, tree: Path, workers: int | None):
+        assert self.normalize(walk(tree, workers=workers)) == self.normalize(
+            os.walk(tree)
+        )
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_ignored_directories_are_not_walked(self, tree: Path, workers: int | None):
+        entries = self.normalize(
+            walk(
+                tree,
+                workers=workers,
+                ignore=lambda p: os.path.basename(p) in {".hidden", "code"},
+            )
+        )
+        dirpaths = {entry[0] for entry in entries}
+        assert str(tree / "sub-002" / ".hidden") not in dirpaths
+        assert str(tree / "code") not in dirpaths
+        assert all(".hidden" not in entry[1] for entry in entries)
+        assert str(tree / "sub-001" / "ses-02" / "anat") in dirpaths
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import array
 import re
 import sys
 from typing import (
@@ -146,6 +147,232 @@ class ImmutableList(Sequence[_T_co], Generic[_T_co]):
         return self._data.index(value, start, stop)
 
 
+def _code_typecode(n_categories: int) -> str:
+    """Get the smallest unsigned array typecode able to index ``n_categories``."""
+    for typecode in ("B", "H", "I", "L", "Q"):
+        if n_categories <= 1 << (8 * array.array(typecode).itemsize):
+            return typecode
+    msg = f"Too many categories to encode: {n_categories}"
+    raise ValueError(msg)
+
+
+class CategoricalList(Sequence[str]):
+    """Immutable, dictionary-encoded sequence of strings.
+
+    Each unique value is stored once in :attr:`categories`, and the sequence itself is
+    stored as an :class:`array.array` of integer :attr:`codes` indexing into the
+    categories. For columns with many repeated values, such as the entity columns of a
+    large ``zip_list``, this takes a fraction of the memory of a list of strings::
+
+        >>> col = CategoricalList(["01", "01", "02", "01"])
+        >>> col
+        CategoricalList(['01', '01', '02', '01'])
+        >>> col.categories
+        ('01', '02')
+        >>> list(col.codes)
+        [0, 0, 1, 0]
+
+    ``CategoricalList`` compares equal to any sequence of the same strings, so it can be
+    used in place of a list::
+
+        >>> col == ["01", "01", "02", "01"]
+        True
+        >>> col[1:3]
+        CategoricalList(['01', '02'])
+
+    Slices and other derived lists share the categories of their source.
+    """
+
+    __slots__ = ("_index", "categories", "codes")
+
+    categories: tuple[str, ...]
+    """Unique values of the sequence, indexed by :attr:`codes`"""
+
+    codes: array.array[int]
+    """Position in :attr:`categories` of each item in the sequence"""
+
+    def __init__(self, iterable: Iterable[str] = (), /):
+        index: dict[str, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in iterable]
+        self.categories = tuple(index)
+        self.codes = array.array(_code_typecode(len(index)), codes)
+        self._index: dict[str, int] | None = index
+
+    @classmethod
+    def from_codes(
+        cls, codes: Iterable[int], categories: Sequence[str]
+    ) -> CategoricalList:
+        """Construct directly from integer codes and their categories.
+
+        Categories must be unique. No check is made that codes are valid indices of
+        ``categories``.
+        """
+        self = cls.__new__(cls)
+        self.categories = tuple(categories)
+        self.codes = array.array(_code_typecode(len(self.categories)), codes)
+        self._index = None
+        return self
+
+    @property
+    def category_index(self) -> dict[str, int]:
+        """Mapping from each category to its code."""
+        if self._index is None:
+            self._index = {cat: code for code, cat in enumerate(self.categories)}
+        return self._index
+
+    def take(self, indices: Iterable[int]) -> CategoricalList:
+        """Select items by position, sharing the categories of this list."""
+        codes = self.codes
+        return self.from_codes((codes[i] for i in indices), self.categories)
+
+    @override
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)})"
+
+    @override
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return map(self.categories.__getitem__, self.codes)
+
+    @override
+    def __reversed__(self) -> Iterator[str]:
+        return map(self.categories.__getitem__, reversed(self.codes))
+
+    @override
+    def __contains__(self, value: object) -> bool:
+        code = self.category_index.get(value) if isinstance(value, str) else None
+        return code is not None and code in self.codes
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> CategoricalList: ...
+
+    @override
+    def __getitem__(self, index: int | slice) -> str | CategoricalList:
+        if isinstance(index, slice):
+            return self.from_codes(self.codes[index], self.categories)
+        return self.categories[self.codes[index]]
+
+    @override
+    def __eq__(self, value: object, /) -> bool:
+        if isinstance(value, CategoricalList):
+            if self.categories == value.categories:
+                return self.codes == value.codes
+        elif not isinstance(value, Sequence) or isinstance(value, str):
+            return NotImplemented
+        return len(self) == len(value) and all(a == b for a, b in zip(self, value))
+
+    __hash__ = None  # type: ignore
+
+    @override
+    def count(self, value: Any) -> int:
+        code = self.category_index.get(value) if isinstance(value, str) else None
+        return 0 if code is None else self.codes.count(code)
+
+    @override
+    def index(
+        self, value: Any, start: SupportsIndex = 0, stop: SupportsIndex = sys.maxsize
+    ) -> int:
+        code = self.category_index.get(value) if isinstance(value, str) else None
+        if code is not None:
+            lo, hi, _ = slice(start, stop).indices(len(self))
+            try:
+                return self.codes[lo:hi].index(code) + lo
+            except ValueError:
+                pass
+        msg = f"{value!r} is not in list"
+        raise ValueError(msg)
+
+
+class ColumnView(Sequence[str]):
+    """Read-only view of selected items of another sequence of strings.
+
+    Holds a reference to the ``source`` sequence and an array of the ``indices`` of the
+    selected items, without copying the items themselves::
+
+        >>> view = ColumnView(["01", "02", "03", "04"], [1, 3])
+        >>> view
+        ColumnView(['02', '04'])
+        >>> view[1:]
+        ColumnView(['04'])
+
+    Views of views, including slices, refer directly to the original source. Like
+    :class:`CategoricalList`, ``ColumnView`` compares equal to any sequence of the same
+    strings. Use ``list()`` to get an independent copy of the items.
+    """
+
+    __slots__ = ("indices", "source")
+
+    source: Sequence[str]
+    """Sequence from which items are selected"""
+
+    indices: array.array[int]
+    """Position in :attr:`source` of each item in the view"""
+
+    def __init__(self, source: Sequence[str], indices: Iterable[int], /):
+        if isinstance(source, ColumnView):
+            outer = source.indices
+            indices = (outer[i] for i in indices)
+            source = source.source
+        self.source = source
+        self.indices = (
+            indices
+            if isinstance(indices, array.array) and indices.typecode == "q"
+            else array.array("q", indices)
+        )
+
+    def take(self, indices: Iterable[int]) -> ColumnView:
+        """Select items by position, referring to the source of this view."""
+        return self.__class__(self, indices)
+
+    @override
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)})"
+
+    @override
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return map(self.source.__getitem__, self.indices)
+
+    @override
+    def __reversed__(self) -> Iterator[str]:
+        return map(self.source.__getitem__, reversed(self.indices))
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ColumnView: ...
+
+    @override
+    def __getitem__(self, index: int | slice) -> str | ColumnView:
+        if isinstance(index, slice):
+            return self.__class__(self.source, self.indices[index])
+        return self.source[self.indices[index]]
+
+    @override
+    def __eq__(self, value: object, /) -> bool:
+        if (
+            isinstance(value, ColumnView)
+            and value.source is self.source
+            and value.indices == self.indices
+        ):
+            return True
+        if not isinstance(value, Sequence) or isinstance(value, str):
+            return NotImplemented
+        return len(self) == len(value) and all(a == b for a, b in zip(self, value))
+
+    __hash__ = None  # type: ignore
+
+
 class RegexContainer(Generic[AnyStr], Container[AnyStr]):
     """Container that tests if a string matches a regex using the ``in`` operator.
 
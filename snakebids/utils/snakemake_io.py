@@ -5,12 +5,19 @@ from __future__ import annotations
 import collections
 import os
 import re
+import sys
 from itertools import chain
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Callable, Mapping, Sequence, cast
 
 from snakebids.types import ZipList
 from snakebids.utils.containers import MultiSelectDict
+from snakebids.utils.utils import walk
+
+if sys.version_info >= (3, 11):
+    from re import _parser as sre_parse  # type: ignore
+else:
+    import sre_parse
 
 
 def regex(filepattern: str) -> str:
@@ -60,10 +67,206 @@ _wildcard_regex = re.compile(
 )
 
 
+def _segment_regex(segment: str, constraints: dict[str, str]) -> re.Pattern[str]:
+    """Compile a single path segment of a pattern."""
+    regex_list: list[str] = []
+    last = 0
+    wildcards: set[str] = set()
+    for match in _wildcard_regex.finditer(segment):
+        regex_list.append(re.escape(segment[last : match.start()]))
+        wildcard = match.group("name")
+        if wildcard in wildcards:
+            regex_list.append(f"(?P={wildcard})")
+        else:
+            wildcards.add(wildcard)
+            regex_list.append(f"(?P<{wildcard}>{constraints[wildcard]})")
+        last = match.end()
+    regex_list.append(re.escape(segment[last:]))
+    return re.compile("".join(regex_list))
+
+
+_CATEGORY_ESCAPES = {
+    av[0][1]: escape
+    for escape, (op, av) in sre_parse.CATEGORIES.items()
+    if op == sre_parse.IN
+}
+
+
+def _set_contains(items: list[tuple[Any, Any]], char: str) -> bool:
+    """Check if a parsed character set (as in ``[a-z]``) contains ``char``."""
+    negate = False
+    found = False
+    for op, av in items:
+        name = op.name
+        if name == "NEGATE":
+            negate = True
+        elif name == "LITERAL":
+            found = found or av == ord(char)
+        elif name == "RANGE":
+            found = found or av[0] <= ord(char) <= av[1]
+        elif name == "CATEGORY":
+            found = found or re.match(_CATEGORY_ESCAPES[av], char) is not None
+        else:
+            # Unknown items, such as case-insensitive ranges, might contain anything
+            return True
+    return found != negate
+
+
+def _may_consume(parsed: Any, char: str) -> bool:
+    """Check if any part of a parsed regex could consume ``char``.
+
+    Errs on the side of True for constructs not understood.
+    """
+    for op, av in parsed:
+        name = op.name
+        if name in {"AT", "ASSERT", "ASSERT_NOT"}:
+            continue
+        if name == "LITERAL":
+            found = av == ord(char)
+        elif name == "NOT_LITERAL":
+            found = av != ord(char)
+        elif name == "IN":
+            found = _set_contains(av, char)
+        elif name == "BRANCH":
+            found = any(_may_consume(branch, char) for branch in av[1])
+        elif name == "SUBPATTERN":
+            found = _may_consume(av[-1], char)
+        elif name in {"MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"}:
+            found = _may_consume(av[2], char)
+        elif name == "ATOMIC_GROUP":
+            found = _may_consume(av, char)
+        else:
+            # ANY, back-references, conditionals, etc.
+            found = True
+        if found:
+            return True
+    return False
+
+
+def _may_span_dirs(constraint: str) -> bool:
+    """Check if a wildcard constraint could match a path separator."""
+    try:
+        parsed = sre_parse.parse(constraint)
+    except re.error:
+        return True
+    return any(_may_consume(parsed, sep) for sep in {"/", os.sep})
+
+
+def _split_segments(pattern: str) -> list[str]:
+    """Split a pattern on path separators found outside of wildcards."""
+    segments = [""]
+    last = 0
+    for match in chain(_wildcard_regex.finditer(pattern), [None]):
+        start = len(pattern) if match is None else match.start()
+        first, *rest = pattern[last:start].split(os.sep)
+        segments[-1] += first
+        segments.extend(rest)
+        if match is not None:
+            segments[-1] += match.group(0)
+            last = match.end()
+    return segments
+
+
+def _get_dir_pruner(
+    pattern: str,
+    top: str,
+    prune: Callable[[Mapping[str, str]], bool] | None = None,
+) -> Callable[[str], bool]:
+    """Get a function testing if a directory under top cannot contain pattern matches.
+
+    The part of ``pattern`` below ``top`` is split into path segments, and each
+    directory is matched against the segment at its own depth. Pruning stops at the
+    first segment with a wildcard that could match a path separator, including
+    unconstrained wildcards, since such a wildcard may span several directory levels.
+    Only directories that cannot hold any match of the full pattern are pruned.
+
+    If given, ``prune`` is called with the wildcard values matched by each directory
+    and its parents, and directories for which it returns True are also skipped.
+    """
+    constraints: dict[str, str] = {}
+    spanning_names: set[str] = set()
+    for match in _wildcard_regex.finditer(pattern):
+        name, constraint = match.group("name", "constraint")
+        if name in constraints:
+            continue
+        constraints[name] = constraint or ".+"
+        if _may_span_dirs(constraints[name]):
+            spanning_names.add(name)
+
+    prefix = top if top.endswith(os.sep) else top + os.sep
+    rel_pattern = pattern[len(prefix) :] if pattern.startswith(prefix) else pattern
+    all_segments = _split_segments(rel_pattern)
+    all_names = [
+        {match.group("name") for match in _wildcard_regex.finditer(segment)}
+        for segment in all_segments
+    ]
+    segments: list[re.Pattern[str]] = []
+    # Directories at the depth of the first spanning wildcard must still start with
+    # the part of the segment before it
+    spanning_prefix: re.Pattern[str] | None = None
+    for segment in all_segments:
+        spanning_match = next(
+            (
+                match
+                for match in _wildcard_regex.finditer(segment)
+                if match.group("name") in spanning_names
+            ),
+            None,
+        )
+        if spanning_match is not None:
+            spanning_prefix = _segment_regex(
+                segment[: spanning_match.start()], constraints
+            )
+            break
+        segments.append(_segment_regex(segment, constraints))
+
+    # A segment with several wildcards is split greedily when matched on its own.
+    # If one of them reappears in another segment, the full path regex may choose a
+    # different split, so the values read from such segments cannot be trusted
+    repeated = {
+        name
+        for i, names in enumerate(all_names)
+        for name in names
+        if any(name in other for j, other in enumerate(all_names) if i != j)
+    }
+    exact = [
+        len(names) <= 1 or not repeated.intersection(names)
+        for names in all_names[: len(segments)]
+    ]
+
+    def ignore(path: str) -> bool:
+        parts = path[len(prefix) :].split(os.sep)
+        depth = len(parts)
+        if depth > len(segments):
+            if spanning_prefix is None:
+                return True
+            return depth == len(segments) + 1 and not spanning_prefix.match(parts[-1])
+        # Parent directories have already been checked
+        if not segments[depth - 1].fullmatch(parts[-1]):
+            return True
+        if prune is None:
+            return False
+        values: dict[str, str] = {}
+        for segment, part, is_exact in zip(segments, parts, exact):
+            if not is_exact:
+                continue
+            for name, value in (
+                cast("re.Match[str]", segment.fullmatch(part)).groupdict().items()
+            ):
+                # Leave any disagreement between segments for the full path regex
+                if values.setdefault(name, value) != value:
+                    return False
+        return bool(values) and prune(values)
+
+    return ignore
+
+
 def glob_wildcards(
     pattern: str | Path,
     files: Sequence[str | Path] | None = None,
     followlinks: bool = False,
+    workers: int | None = None,
+    prune: Callable[[Mapping[str, str]], bool] | None = None,
 ) -> ZipList:
     """Glob the values of wildcards by matching a pattern to the filesystem.
 
@@ -76,9 +279,22 @@ def glob_wildcards(
     files
         Files from which to glob wildcards. If None (default), the directory
         corresponding to the first wildcard in the pattern is walked, and
-        wildcards are globbed from all files.
+        wildcards are globbed from all files. Only directories matching the
+        corresponding component of the pattern are descended into, so wildcards in
+        directory components match a single directory level.
     followlinks
         Whether to follow links when globbing wildcards.
+    workers
+        Number of threads used to walk the directory tree. See
+        :func:`~snakebids.utils.utils.walk`
+    prune
+        Called with the wildcard values matched by each directory walked (along with
+        those matched by its parents). Directories for which this returns True are not
+        descended into. Should only return True for directories that cannot contain
+        any wanted paths, as files already found are not checked. Unconstrained
+        wildcards may span several directories, so only the directories above the
+        first such wildcard are passed to ``prune``. Give wildcards a constraint
+        excluding path separators (e.g. ``{subject,[^/]+}``) to prune below them.
     """
     pattern = os.path.normpath(pattern)
     first_wildcard = re.search("{[^{]", pattern)
@@ -88,7 +304,7 @@ def glob_wildcards(
         else os.path.dirname(pattern)
     )
     if not dirname:
-        dirname = Path(".")
+        dirname = "."
 
     names = [match.group("name") for match in _wildcard_regex.finditer(pattern)]
 
@@ -102,8 +318,11 @@ def glob_wildcards(
     file_iter = (
         (
             Path(dirpath, f)
-            for dirpath, dirnames, filenames in os.walk(
-                dirname, followlinks=followlinks
+            for dirpath, dirnames, filenames in walk(
+                dirname,
+                workers=workers,
+                followlinks=followlinks,
+                ignore=_get_dir_pruner(pattern, dirname, prune),
             )
             for f in chain(filenames, dirnames)
         )
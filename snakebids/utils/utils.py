@@ -6,9 +6,23 @@ import operator as op
 import os
 import re
 import textwrap
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
 from pathlib import Path
-from typing import Any, Callable, Iterable, Mapping, Protocol, Sequence, TypeVar, cast
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import attrs
 import importlib_resources as impr
@@ -16,6 +30,7 @@ import more_itertools as itx
 from typing_extensions import NotRequired, TypeAlias, TypedDict
 
 from snakebids import resources, types
+from snakebids.utils.containers import CategoricalList
 from snakebids.utils.user_property import UserProperty
 
 _T = TypeVar("_T")
@@ -304,7 +319,42 @@ def zip_list_eq(first: types.ZipListLike, second: types.ZipListLike, /):
     first_items = get_values(first)
     second_items = get_values(second)
 
-    return sorted(zip(*first_items)) == sorted(zip(*second_items))
+    if all(
+        isinstance(a, CategoricalList)
+        and isinstance(b, CategoricalList)
+        and a.categories == b.categories
+        for a, b in zip(first_items, second_items)
+    ):
+        # Encoded with the same categories, so the integer codes can be compared
+        first_items = [col.codes for col in first_items]  # type: ignore
+        second_items = [col.codes for col in second_items]  # type: ignore
+
+    return Counter(zip(*first_items)) == Counter(zip(*second_items))
+
+
+def zip_list_fingerprint(zip_list: types.ZipListLike, /) -> int:
+    """Get a hash of a zip list that does not depend on the order of its columns.
+
+    Equal zip lists, as defined by :func:`zip_list_eq`, always have the same
+    fingerprint. Zip lists with different fingerprints are therefore never equal.
+    Computed in a single pass, using the hash of each value once per column.
+    """
+    entities = sorted(zip_list)
+    columns: list[Iterable[int]] = []
+    for entity in entities:
+        values = zip_list[entity]
+        if isinstance(values, CategoricalList):
+            hashes = [hash(category) for category in values.categories]
+            columns.append(map(hashes.__getitem__, values.codes))
+        else:
+            columns.append(map(hash, values))
+    # Summing the row hashes makes the result independent of row order while
+    # counting duplicate rows
+    total = sum(map(hash, zip(*columns))) if columns else 0
+    return hash((tuple(entities), total & _HASH_MASK))
+
+
+_HASH_MASK = (1 << 64) - 1
 
 
 def get_first_dir(path: str) -> str:
@@ -326,6 +376,81 @@ def to_resolved_path(path: str | PathLike[str]):
     return Path(path).resolve()
 
 
+WalkEntry: TypeAlias = Tuple[str, List[str], List[str]]
+
+
+def _walk_serial(
+    top: str, *, followlinks: bool, ignore: Callable[[str], bool] | None
+) -> Iterator[WalkEntry]:
+    for dirpath, dirnames, filenames in os.walk(top, followlinks=followlinks):
+        if ignore is not None:
+            dirnames[:] = [d for d in dirnames if not ignore(os.path.join(dirpath, d))]
+        yield dirpath, dirnames, filenames
+
+
+def walk(
+    top: str | PathLike[str],
+    *,
+    workers: int | None = None,
+    followlinks: bool = False,
+    ignore: Callable[[str], bool] | None = None,
+) -> Iterator[WalkEntry]:
+    """Walk a directory tree, optionally listing subtrees on a thread pool.
+
+    Yields ``(dirpath, dirnames, filenames)`` tuples in the same format as
+    :func:`os.walk`. When ``workers`` is greater than 1, the top two levels of the tree
+    (e.g. the ``sub-*`` and ``ses-*`` directories of a BIDS dataset) are listed
+    concurrently, and the subtrees beneath them are walked concurrently. This speeds up
+    traversal of filesystems where listing directories is bound by latency (e.g. network
+    filesystems). Results are merged in directory listing order, so the output is the
+    same regardless of the number of workers.
+
+    Parameters
+    ----------
+    top
+        Root of the tree to walk
+    workers
+        Number of threads used to list directories. If None or 1, the tree is walked
+        serially with :func:`os.walk`
+    followlinks
+        Descend into symbolic links pointing to directories
+    ignore
+        Called with the path of every directory encountered. Directories for which this
+        returns True are not descended into, and are removed from ``dirnames``.
+    """
+    top = os.fspath(top)
+    if workers is None or workers <= 1:
+        yield from _walk_serial(top, followlinks=followlinks, ignore=ignore)
+        return
+
+    def list_dir(path: str) -> list[WalkEntry]:
+        return list(
+            itx.take(1, _walk_serial(path, followlinks=followlinks, ignore=ignore))
+        )
+
+    def walk_subtree(path: str) -> list[WalkEntry]:
+        return list(_walk_serial(path, followlinks=followlinks, ignore=ignore))
+
+    def descend(entry: WalkEntry) -> Iterator[str]:
+        dirpath, dirnames, _ = entry
+        for dirname in dirnames:
+            path = os.path.join(dirpath, dirname)
+            # os.walk lists symlinks to directories without descending into them
+            if followlinks or not os.path.islink(path):
+                yield path
+
+    with ThreadPoolExecutor(workers) as pool:
+        frontier = [top]
+        for _ in range(2):
+            listings = [
+                entry for entries in pool.map(list_dir, frontier) for entry in entries
+            ]
+            yield from listings
+            frontier = [path for entry in listings for path in descend(entry)]
+        for entries in pool.map(walk_subtree, frontier):
+            yield from entries
+
+
 def get_wildcard_dict(entities: str | Iterable[str], /) -> dict[str, str]:
     """Turn entity strings into wildcard dicts as {"entity": "{entity}"}."""
     return {entity: f"{{{entity}}}" for entity in itx.always_iterable(entities)}
@@ -336,6 +461,68 @@ def entity_to_wildcard(entities: str | Iterable[str], /):
     return {entity: f"{{{entity}}}" for entity in itx.always_iterable(entities)}
 
 
+def trie_regex(values: Iterable[str], /) -> str:
+    """Compile strings into a regex matching exactly those strings.
+
+    Values are merged into a prefix tree, so shared prefixes are only matched once
+    (e.g. ``["001", "002", "010"]`` gives ``0(?:0[12]|10)``).
+    """
+    trie: dict[str | None, Any] = {}
+    for value in set(values):
+        node = trie
+        for char in value:
+            node = node.setdefault(char, {})
+        # None marks the end of a value
+        node[None] = {}
+    return _trie_node_regex(trie)
+
+
+def _trie_node_regex(node: dict[str | None, Any]) -> str:
+    chars: list[str] = []
+    branches: list[str] = []
+    for char, child in sorted((char, child) for char, child in node.items() if char):
+        # Values ending after this character can share a character class
+        if list(child) == [None]:
+            chars.append(char)
+        else:
+            branches.append(re.escape(char) + _trie_node_regex(child))
+    if chars:
+        branches.insert(
+            0, re.escape(chars[0]) if len(chars) == 1 else _char_class(chars)
+        )
+
+    if not branches:
+        return ""
+    if len(branches) > 1:
+        return f"(?:{'|'.join(branches)})" + ("?" if None in node else "")
+    if None not in node:
+        return branches[0]
+    # A lone character or character class can be made optional without a group
+    return f"{branches[0]}?" if chars else f"(?:{branches[0]})?"
+
+
+def _char_class(chars: Sequence[str]) -> str:
+    """Get a character class matching any of the sorted ``chars``."""
+    ranges: list[list[str]] = []
+    for char in chars:
+        if ranges and ord(char) == ord(ranges[-1][-1]) + 1:
+            ranges[-1].append(char)
+        else:
+            ranges.append([char])
+
+    def escape(char: str) -> str:
+        return f"\\{char}" if char in "\\]^-[" else char
+
+    return "[{}]".format(
+        "".join(
+            f"{escape(run[0])}-{escape(run[-1])}"
+            if len(run) > 2  # noqa: PLR2004
+            else "".join(map(escape, run))
+            for run in ranges
+        )
+    )
+
+
 def text_fold(text: str):
     """Fold a block of text into a single line as in yaml folded multiline string."""
     return " ".join(textwrap.dedent(text).strip().splitlines())